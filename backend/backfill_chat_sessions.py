@@ -0,0 +1,30 @@
+"""
+Backfill chat session owners
+
+Chat sessions saved before conversations were listed through user-updated-index have no
+user_id (nor title, message_count, last_message) and so are missing from every conversation
+list. Sets them, filing sessions without a known owner as anonymous. Safe to run again.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.append(str(backend_dir))
+
+from config.dynamodb import init_dynamodb
+from services.chatbot_service_enhanced import enhanced_chatbot_service
+
+
+async def main():
+    if not await init_dynamodb():
+        print("Could not connect to DynamoDB")
+        return 1
+    updated = await enhanced_chatbot_service.backfill_conversation_list_fields()
+    print(f"Backfilled {updated} chat sessions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
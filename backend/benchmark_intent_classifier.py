@@ -0,0 +1,119 @@
+"""
+Benchmark: chat intent classifier against the keyword rules
+
+Reports cross-validated accuracy of the hashed n-gram classifier (each example is predicted by
+a model that did not see it) next to the accuracy of the keyword rules EnhancedChatbotService
+used to route messages, per intent and overall, with the messages the two disagree on, and the
+latency of both routes per message.
+"""
+import argparse
+import asyncio
+import random
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.append(str(backend_dir))
+
+from config.settings import settings
+from utils.intent_classifier import INTENTS, IntentClassifier, load_examples
+
+
+def rule_service():
+    """Chatbot service with the countries and areas of the fine-tuning export as its cache"""
+    from services.chatbot_service_enhanced import EnhancedChatbotService
+
+    service = EnhancedChatbotService()
+    text = Path(backend_dir / "policy_training_data.jsonl").read_text(encoding="utf-8")
+    countries = re.search(r"\d+ Countries: ([^\\]+)", text)
+    areas = re.search(r"\d+ Policy Areas: ([^\\]+)", text)
+    service.countries_cache = countries.group(1).split(", ") if countries else []
+    service.areas_cache = areas.group(1).split(", ") if areas else []
+    return service
+
+
+def cross_validated_predictions(examples, folds: int):
+    from sklearn.model_selection import StratifiedKFold
+
+    labels = [intent for _, intent in examples]
+    predictions = [None] * len(examples)
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=7)
+    for train_rows, test_rows in splitter.split(examples, labels):
+        classifier = IntentClassifier.train([examples[row] for row in train_rows])
+        for row in test_rows:
+            predictions[row] = classifier.predict(examples[row][0])[0]
+    return predictions
+
+
+def accuracy_report(name: str, examples, predictions):
+    correct = sum(predicted == intent for (_, intent), predicted in zip(examples, predictions))
+    print(f"\n{name}: {correct}/{len(examples)} correct ({correct / len(examples):.1%})")
+    print(f"  {'intent':14s} {'precision':>9s} {'recall':>7s} {'support':>8s}")
+    for intent in INTENTS:
+        true_positive = sum(p == intent and i == intent for (_, i), p in zip(examples, predictions))
+        predicted = sum(p == intent for p in predictions)
+        support = sum(i == intent for _, i in examples)
+        precision = true_positive / predicted if predicted else 0.0
+        recall = true_positive / support if support else 0.0
+        print(f"  {intent:14s} {precision:9.2f} {recall:7.2f} {support:8d}")
+    return correct / len(examples)
+
+
+def time_per_message(function, messages, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for message in messages:
+            function(message)
+        samples.append((time.perf_counter() - started) / len(messages))
+    return statistics.median(samples) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labeled", nargs="*", default=[], metavar="FILE", help="extra labeled JSONL files")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--show", type=int, default=15, help="disagreements to print")
+    args = parser.parse_args()
+
+    examples = load_examples(settings.INTENT_TRAINING_FILES + args.labeled)
+    counts = Counter(intent for _, intent in examples)
+    print(f"{len(examples)} labeled messages: " + ", ".join(f"{intent} {counts[intent]}" for intent in INTENTS))
+
+    service = rule_service()
+    loop = asyncio.new_event_loop()
+    rule = lambda message: loop.run_until_complete(service._rule_intent(message, {}))
+    rule_predictions = [rule(text) for text, _ in examples]
+    model_predictions = cross_validated_predictions(examples, args.folds)
+
+    rule_accuracy = accuracy_report("Keyword rules", examples, rule_predictions)
+    model_accuracy = accuracy_report(f"Classifier ({args.folds}-fold cross-validated)", examples, model_predictions)
+    print(f"\nAccuracy: {rule_accuracy:.1%} -> {model_accuracy:.1%}")
+
+    disagreements = [
+        (text, intent, ruled, predicted)
+        for (text, intent), ruled, predicted in zip(examples, rule_predictions, model_predictions)
+        if ruled != predicted
+    ]
+    print(f"\nMessages routed differently ({len(disagreements)}), label / rules / classifier:")
+    for text, intent, ruled, predicted in random.Random(7).sample(disagreements, min(args.show, len(disagreements))):
+        print(f"  {text[:60]!r:64s} {intent:13s} {ruled:13s} {predicted}")
+
+    classifier = IntentClassifier.train(examples)
+    messages = [text for text, _ in examples]
+    rule_micros = time_per_message(rule, messages, args.rounds)
+    model_micros = time_per_message(classifier.predict, messages, args.rounds)
+    print(f"\nLatency per message (median of {args.rounds} passes over {len(messages)} messages):")
+    print(f"  keyword rules: {rule_micros:8.1f} us")
+    print(f"  classifier:    {model_micros:8.1f} us")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
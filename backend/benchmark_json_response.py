@@ -0,0 +1,119 @@
+"""
+Benchmark: serializing a ~10 MB policy catalog response
+
+Builds synthetic submissions shaped like DynamoDB items (numbers as Decimal, timestamps,
+string sets) and compares FastAPI's default pipeline (jsonable_encoder + stdlib json) with
+FastJSONResponse, both after jsonable_encoder (default response class) and without it
+(hot routes returning FastJSONResponse directly).
+"""
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.append(str(backend_dir))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from utils.json_response import FastJSONResponse
+
+TARGET_BYTES = 10 * 1024 * 1024
+ROUNDS = 5
+
+COUNTRIES = ["United States", "Germany", "India", "Brazil", "Japan", "Kenya", "Canada", "France",
+             "Bangladesh", "Australia", "Nigeria", "Singapore", "Mexico", "Sweden", "Egypt"]
+AREAS = ["AI Safety", "Cyber Safety", "Digital Education", "Digital Inclusion", "Digital Leisure",
+         "Disinformation", "Digital Work", "Mental Health", "Physical Health", "Social Media Gaming Regulation"]
+WORDS = ("artificial intelligence transparency accountability framework regulation national strategy "
+         "privacy protection children online safety cybersecurity resilience infrastructure education "
+         "literacy workforce inclusion accessibility broadband misinformation platform moderation").split()
+
+
+def make_policy(rng: random.Random, area: str, created: datetime) -> dict:
+    return {
+        "policyId": f"pol-{rng.getrandbits(48):012x}",
+        "policyName": " ".join(rng.choices(WORDS, k=4)).title(),
+        "policyDescription": " ".join(rng.choices(WORDS, k=60)),
+        "status": rng.choice(["approved", "pending", "rejected"]),
+        "implementation": {"yearOfImplementation": Decimal(rng.randint(2015, 2025)),
+                           "deploymentYear": Decimal(rng.randint(2015, 2025))},
+        "evaluation": {"isEvaluated": rng.random() < 0.5, "riskAssessment": rng.random() < 0.5,
+                       "score": Decimal(str(round(rng.uniform(0, 10), 2)))},
+        "participation": {"hasConsultation": rng.random() < 0.5, "consultationStartDate": created.isoformat()},
+        "policyFile": {"file_id": f"file-{rng.getrandbits(32):08x}", "name": "policy.pdf",
+                       "type": "application/pdf", "size": Decimal(rng.randint(10_000, 5_000_000))},
+        "tags": set(rng.sample(WORDS, 3)),
+        "score": Decimal(str(round(rng.uniform(0, 30), 2))),
+        "area": area
+    }
+
+
+def make_catalog(rng: random.Random) -> dict:
+    submissions = []
+    size = 0
+    started = datetime(2023, 1, 1)
+    while size < TARGET_BYTES:
+        created = started + timedelta(minutes=rng.randint(0, 900_000))
+        areas = rng.sample(AREAS, rng.randint(1, 4))
+        submission = {
+            "policy_id": f"sub-{rng.getrandbits(48):012x}",
+            "user_id": f"user-{rng.randint(1, 5000)}",
+            "user_email": f"user{rng.randint(1, 5000)}@example.org",
+            "country": rng.choice(COUNTRIES),
+            "status": rng.choice(["pending_review", "approved", "rejected"]),
+            "created_at": created,
+            "updated_at": created.isoformat(),
+            "version": Decimal(rng.randint(1, 5)),
+            "policy_areas": [
+                {"area_id": area.lower().replace(" ", "-"), "area_name": area,
+                 "policies": [make_policy(rng, area, created) for _ in range(rng.randint(1, 3))]}
+                for area in areas
+            ]
+        }
+        submissions.append(submission)
+        size += len(json.dumps(jsonable_encoder(submission)))
+    return {"success": True, "data": submissions, "count": len(submissions)}
+
+
+def measure(render) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    rng = random.Random(39)
+    catalog = make_catalog(rng)
+
+    baseline = JSONResponse(jsonable_encoder(catalog)).body
+    fast = FastJSONResponse(catalog).body
+    assert json.loads(baseline) == json.loads(fast), "serializers disagree"
+    print(f"Catalog: {catalog['count']} submissions, {len(baseline) / 1024 / 1024:.1f} MB "
+          f"(orjson body {len(fast) / 1024 / 1024:.1f} MB)")
+
+    encode_ms = measure(lambda: jsonable_encoder(catalog))
+    results = [
+        ("jsonable_encoder + JSONResponse (before)", measure(lambda: JSONResponse(jsonable_encoder(catalog)))),
+        ("jsonable_encoder + FastJSONResponse (default class)",
+         measure(lambda: FastJSONResponse(jsonable_encoder(catalog)))),
+        ("FastJSONResponse directly (hot routes)", measure(lambda: FastJSONResponse(catalog)))
+    ]
+
+    print(f"jsonable_encoder alone: {encode_ms:8.1f} ms")
+    before = results[0][1]
+    for name, elapsed in results:
+        print(f"{name:55s} {elapsed:8.1f} ms  ({before / elapsed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark: policy search over 100k submissions
+
+Builds the full-text index from synthetic submissions and compares query latency with the
+old approach of lowercasing every submission and running substring tests in nested loops.
+"""
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.append(str(backend_dir))
+
+SUBMISSIONS = 100_000
+QUERY_ROUNDS = 20
+
+COUNTRIES = ["United States", "Germany", "India", "Brazil", "Japan", "Kenya", "Canada", "France",
+             "Bangladesh", "Australia", "Nigeria", "Singapore", "Mexico", "Sweden", "Egypt"]
+AREAS = ["AI Safety", "Cyber Safety", "Digital Education", "Digital Inclusion", "Digital Leisure",
+         "Disinformation", "Digital Work", "Mental Health", "Physical Health", "Social Media Gaming Regulation"]
+DOMAIN_WORDS = ("artificial intelligence transparency accountability framework regulation national strategy "
+         "privacy protection children online safety cybersecurity resilience infrastructure education "
+         "literacy workforce inclusion accessibility broadband misinformation platform moderation health "
+         "wellbeing gaming audit oversight governance risk assessment innovation data sharing standards").split()
+
+
+def make_vocabulary(rng: random.Random, size: int = 20000) -> list:
+    """Domain words plus synthetic filler words, so common terms do not match every document"""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    filler = {"".join(rng.choices(letters, k=rng.randint(4, 10))) for _ in range(size)}
+    return DOMAIN_WORDS + sorted(filler)
+
+
+def zipf_words(rng: random.Random, vocabulary: list, k: int) -> list:
+    """Words drawn with a Zipf-like skew, like natural text"""
+    return [vocabulary[min(len(vocabulary) - 1, int(rng.paretovariate(1.1)) - 1)] for _ in range(k)]
+
+def make_submission(i: int, rng: random.Random, vocabulary: list) -> dict:
+    areas = []
+    for area_name in rng.sample(AREAS, rng.randint(1, 3)):
+        areas.append({
+            "area_name": area_name,
+            "policies": [{
+                "policyName": " ".join(zipf_words(rng, vocabulary, 3)).title(),
+                "policyDescription": " ".join(zipf_words(rng, vocabulary, 25)),
+                "policyId": f"P{i}-{j}"
+            } for j in range(rng.randint(1, 3))]
+        })
+    return {
+        "policy_id": f"{i:08x}-bench",
+        "user_email": f"user{i % 5000}@example.org",
+        "country": rng.choice(COUNTRIES),
+        "status": rng.choice(["approved", "pending_review", "rejected"]),
+        "created_at": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "policy_areas": areas
+    }
+
+
+def substring_search(submissions: list, query: str) -> list:
+    """The previous implementation: substring tests over every submission"""
+    query_lower = query.lower()
+    matches = []
+    for submission in submissions:
+        text = f"{submission.get('country', '')} {submission.get('policy_id', '')} {submission.get('user_email', '')} "
+        for area in submission.get("policy_areas", []):
+            text += f"{area.get('area_name', '')} "
+            for policy in area.get("policies", []):
+                text += f"{policy.get('policyName', '')} {policy.get('policyDescription', '')} {policy.get('policyId', '')} "
+        if query_lower in text.lower():
+            matches.append(submission)
+    return matches
+
+
+def timed(func, rounds: int) -> dict:
+    samples = []
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {"p50": statistics.median(samples), "p95": samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+            "result": result}
+
+
+def main():
+    from utils.text_index import TextIndex
+    from services.search_index_service import FIELD_WEIGHTS, submission_document
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+    rng.shuffle(vocabulary)
+    submissions = [make_submission(i, rng, vocabulary) for i in range(SUBMISSIONS)]
+    # Query terms of varying frequency from the generated corpus
+    common, rare = vocabulary[3], vocabulary[400]
+    queries = {
+        "common term": common,
+        "rare term": rare,
+        "two terms": f"{common} {vocabulary[10]}",
+        "prefix": rare[:4],
+        "fuzzy": rare[:-1] + ("a" if rare[-1] != "a" else "e") if len(rare) >= 4 else rare,
+        "country + area": "kenya cyber"
+    }
+
+    started = time.perf_counter()
+    index = TextIndex(FIELD_WEIGHTS)
+    for submission in submissions:
+        index.add(submission["policy_id"], *submission_document(submission))
+    build_seconds = time.perf_counter() - started
+
+    update_started = time.perf_counter()
+    for submission in submissions[:1000]:
+        submission["status"] = "approved"
+        index.add(submission["policy_id"], *submission_document(submission))
+    update_ms = (time.perf_counter() - update_started) * 1000 / 1000
+
+    print(f"Search index: {SUBMISSIONS:,} submissions, {index.vocabulary_size:,} terms")
+    print(f"build {build_seconds:.1f}s | incremental update {update_ms:.3f} ms/submission")
+    print("=" * 92)
+    print(f"{'query':<30}{'index p50':>12}{'index p95':>12}{'matches':>10}{'scan p50':>12}{'scan matches':>14}")
+
+    for label, query in queries.items():
+        indexed = timed(lambda: index.search(query, limit=20), QUERY_ROUNDS)
+        scanned = timed(lambda: substring_search(submissions, query), 3)
+        print(f"{label + ' (' + query + ')':<30}{indexed['p50']:>10.2f}ms{indexed['p95']:>10.2f}ms{indexed['result'][0]:>10,}"
+              f"{scanned['p50']:>10.0f}ms{len(scanned['result']):>14,}")
+
+    filtered = timed(lambda: index.search("digital", limit=20, doc_filter=lambda meta: meta["status"] == "approved"),
+                     QUERY_ROUNDS)
+    print(f"{'status filter':<30}{filtered['p50']:>10.2f}ms{filtered['p95']:>10.2f}ms{filtered['result'][0]:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: import time of the application at startup
+
+Runs `python -X importtime -c "import main"` in fresh interpreters and reports the
+cumulative import time, the heaviest top-level packages, and which of the heavy optional
+dependencies were loaded before the first request. With --compare REF the same measurement
+is taken on the backend directory of another git revision (e.g. --compare HEAD~1).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+backend_dir = Path(__file__).parent
+
+HEAVY_MODULES = ["numpy", "faiss", "openai", "PyPDF2", "docx", "PIL", "redis", "google.auth", "google.oauth2"]
+
+
+def measure_once(directory: Path):
+    env = {**os.environ, "LAZY_IMPORT_WARMUP": "false", "PYTHONDONTWRITEBYTECODE": "1"}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=directory, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    self_times = {}
+    imported = set()
+    cumulative_main = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        imported.add(module)
+        package = module.split(".")[0]
+        self_times[package] = self_times.get(package, 0) + int(self_us)
+        if module == "main":
+            cumulative_main = int(cumulative_us)
+    return wall, cumulative_main / 1e6, self_times, imported
+
+
+def measure(directory: Path, rounds: int):
+    walls, imports, runs = [], [], []
+    for _ in range(rounds):
+        wall, cumulative, self_times, imported = measure_once(directory)
+        walls.append(wall)
+        imports.append(cumulative)
+        runs.append((self_times, imported))
+    return statistics.median(walls), statistics.median(imports), runs[-1]
+
+
+def export_revision(ref: str, target: Path) -> Path:
+    repo_root = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=backend_dir,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    prefix = backend_dir.resolve().relative_to(repo_root).as_posix()
+    archive = target / "revision.tar"
+    subprocess.run(["git", "archive", "--format=tar", "-o", str(archive), ref, prefix],
+                   cwd=repo_root, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(target)
+    return target / prefix
+
+
+def report(label: str, directory: Path, rounds: int):
+    wall, cumulative, (self_times, imported) = measure(directory, rounds)
+    print(f"\n{label}")
+    print(f"  process wall time (median of {rounds}): {wall * 1000:8.1f} ms")
+    print(f"  import main (cumulative):            {cumulative * 1000:8.1f} ms")
+    print("  heaviest packages (self time):")
+    for package, micros in sorted(self_times.items(), key=lambda item: item[1], reverse=True)[:12]:
+        print(f"    {package:28s} {micros / 1000:8.1f} ms")
+    # A package counts as loaded when it or any of its submodules was imported
+    loaded = [name for name in HEAVY_MODULES
+              if any(module == name or module.startswith(name + ".") for module in imported)]
+    print(f"  heavy modules loaded at startup: {', '.join(loaded) or 'none'}")
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--compare", metavar="REF", help="git revision to measure as the baseline")
+    args = parser.parse_args()
+
+    current = report("Working tree", backend_dir, args.rounds)
+    if args.compare:
+        with tempfile.TemporaryDirectory() as temp:
+            baseline = report(f"Revision {args.compare}", export_revision(args.compare, Path(temp)), args.rounds)
+        print(f"\nimport main: {baseline * 1000:.0f} ms -> {current * 1000:.0f} ms "
+              f"({(1 - current / baseline) * 100:.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
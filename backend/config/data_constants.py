@@ -130,3 +130,23 @@ POLICY_STATUSES = [
     "rejected",
     "needs_revision"
 ]
+
+# Policy data-quality rules, checked when a policy is submitted, approved or loaded into the
+# chatbot cache. A policy is flagged when its name or description contains one of the terms
+# and its submission's country is listed (no countries: any country). Terms match anywhere
+# in the lowercased text. Override with POLICY_QUALITY_RULES_FILE (a JSON list like this one).
+POLICY_QUALITY_RULES = [
+    {
+        "id": "foreign_policy_in_bangladesh",
+        "reason": "Describes a German, UK or Algerian policy but is filed under Bangladesh",
+        "countries": ["Bangladesh"],
+        "terms": ["german federal government", "germany", "turing institute", "uk", "britain",
+                  "algeria", "algerian"]
+    },
+    {
+        "id": "foreign_policy_in_united_states",
+        "reason": "Describes a German or UK policy but is filed under the United States",
+        "countries": ["United States"],
+        "terms": ["german federal government", "germany", "turing institute", "uk", "britain"]
+    }
+]
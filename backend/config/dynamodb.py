@@ -2,12 +2,15 @@
 DynamoDB Database Configuration
 Replaces MongoDB with AWS DynamoDB for better AWS integration
 """
+import asyncio
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.types import TypeSerializer
 from botocore.exceptions import ClientError
 from config.settings import settings
+from config.schema import CORE_TABLES, SCHEMA, ensure_schema
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 import json
 from datetime import datetime
 import uuid
@@ -16,6 +19,27 @@ import uuid
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def projection_params(fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """
+    ProjectionExpression and ExpressionAttributeNames that read only the given attributes.
+    Every name is aliased, so reserved words (status, name, date, ...) need no care; dotted
+    paths such as 'policyFile.size' read nested attributes.
+    """
+    if not fields:
+        return {}
+    names = {}
+    paths = []
+    for field in dict.fromkeys(fields):
+        aliases = []
+        for part in field.split('.'):
+            alias = f"#p{len(names)}"
+            names[alias] = part
+            aliases.append(alias)
+        paths.append('.'.join(aliases))
+    return {'ProjectionExpression': ', '.join(paths), 'ExpressionAttributeNames': names}
+
+
 class DynamoDBClient:
     """DynamoDB client for managing database operations"""
     
@@ -38,29 +62,9 @@ class DynamoDBClient:
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
             )
             
-            # Table references
-            self.tables = {
-                'users': None,
-                'policies': None,
-                'chat_messages': None,
-                'chat_sessions': None,
-                'admin_data': None,
-                'file_metadata': None,
-                'map_policies': None,
-                'visits': None
-            }
-            
-            # Table name mapping - using ai_policy_database as base name
-            self.table_names = {
-                'users': 'ai_policy_database_users',
-                'policies': 'ai_policy_database_policies', 
-                'chat_messages': 'ai_policy_database_chat_messages',
-                'chat_sessions': 'ai_policy_database_chat_sessions',
-                'admin_data': 'ai_policy_database_admin_data',
-                'file_metadata': 'ai_policy_database_file_metadata',
-                'map_policies': 'ai_policy_database_map_policies',
-                'visits': 'ai_policy_database_visits'
-            }
+            # Table references and names, from the schema manifest
+            self.tables = {spec.key: None for spec in CORE_TABLES}
+            self.table_names = {spec.key: spec.name for spec in CORE_TABLES}
             
             logger.info("DynamoDB client initialized successfully")
             
@@ -71,8 +75,8 @@ class DynamoDBClient:
     async def connect(self):
         """Connect to DynamoDB and create tables if they don't exist"""
         try:
-            # Create tables
-            await self._create_tables()
+            # Create missing tables (RAG and conversation memory tables included) in one pass
+            await ensure_schema(self.client, SCHEMA)
             
             # Initialize table references
             for table_key in self.tables.keys():
@@ -90,289 +94,6 @@ class DynamoDBClient:
                 return False
             return False
     
-    async def _create_tables(self):
-        """Create DynamoDB tables if they don't exist"""
-        tables_to_create = [
-            {
-                'name': 'users',
-                'key_schema': [
-                    {'AttributeName': 'user_id', 'KeyType': 'HASH'},
-                ],
-                'attribute_definitions': [
-                    {'AttributeName': 'user_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'email', 'AttributeType': 'S'},
-                ],
-                'global_secondary_indexes': [
-                    {
-                        'IndexName': 'email-index',
-                        'KeySchema': [
-                            {'AttributeName': 'email', 'KeyType': 'HASH'},
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'ProvisionedThroughput': {
-                            'ReadCapacityUnits': 5,
-                            'WriteCapacityUnits': 5
-                        }
-                    }
-                ]
-            },
-            {
-                'name': 'policies',
-                'key_schema': [
-                    {'AttributeName': 'policy_id', 'KeyType': 'HASH'},
-                ],
-                'attribute_definitions': [
-                    {'AttributeName': 'policy_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'user_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'created_at', 'AttributeType': 'S'},
-                ],
-                'global_secondary_indexes': [
-                    {
-                        'IndexName': 'user-created-index',
-                        'KeySchema': [
-                            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
-                            {'AttributeName': 'created_at', 'KeyType': 'RANGE'},
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'ProvisionedThroughput': {
-                            'ReadCapacityUnits': 5,
-                            'WriteCapacityUnits': 5
-                        }
-                    }
-                ]
-            },
-            {
-                'name': 'chat_messages',
-                'key_schema': [
-                    {'AttributeName': 'message_id', 'KeyType': 'HASH'},
-                ],
-                'attribute_definitions': [
-                    {'AttributeName': 'message_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'session_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'user_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'created_at', 'AttributeType': 'S'},
-                ],
-                'global_secondary_indexes': [
-                    {
-                        'IndexName': 'session-created-index',
-                        'KeySchema': [
-                            {'AttributeName': 'session_id', 'KeyType': 'HASH'},
-                            {'AttributeName': 'created_at', 'KeyType': 'RANGE'},
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'ProvisionedThroughput': {
-                            'ReadCapacityUnits': 5,
-                            'WriteCapacityUnits': 5
-                        }
-                    },
-                    {
-                        'IndexName': 'user-created-index',
-                        'KeySchema': [
-                            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
-                            {'AttributeName': 'created_at', 'KeyType': 'RANGE'},
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'ProvisionedThroughput': {
-                            'ReadCapacityUnits': 5,
-                            'WriteCapacityUnits': 5
-                        }
-                    }
-                ]
-            },
-            {
-                'name': 'chat_sessions',
-                'key_schema': [
-                    {'AttributeName': 'session_id', 'KeyType': 'HASH'},
-                ],
-                'attribute_definitions': [
-                    {'AttributeName': 'session_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'user_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'updated_at', 'AttributeType': 'S'},
-                ],
-                'global_secondary_indexes': [
-                    {
-                        'IndexName': 'user-updated-index',
-                        'KeySchema': [
-                            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
-                            {'AttributeName': 'updated_at', 'KeyType': 'RANGE'},
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'ProvisionedThroughput': {
-                            'ReadCapacityUnits': 5,
-                            'WriteCapacityUnits': 5
-                        }
-                    }
-                ]
-            },
-            {
-                'name': 'admin_data',
-                'key_schema': [
-                    {'AttributeName': 'admin_id', 'KeyType': 'HASH'},
-                ],
-                'attribute_definitions': [
-                    {'AttributeName': 'admin_id', 'AttributeType': 'S'},
-                ],
-            },
-            {
-                'name': 'file_metadata',
-                'key_schema': [
-                    {'AttributeName': 'file_id', 'KeyType': 'HASH'},
-                ],
-                'attribute_definitions': [
-                    {'AttributeName': 'file_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'user_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'created_at', 'AttributeType': 'S'},
-                ],
-                'global_secondary_indexes': [
-                    {
-                        'IndexName': 'user-created-index',
-                        'KeySchema': [
-                            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
-                            {'AttributeName': 'created_at', 'KeyType': 'RANGE'},
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'ProvisionedThroughput': {
-                            'ReadCapacityUnits': 5,
-                            'WriteCapacityUnits': 5
-                        }
-                    }
-                ]
-            },
-            {
-                'name': 'map_policies',
-                'key_schema': [
-                    {'AttributeName': 'map_policy_id', 'KeyType': 'HASH'},
-                ],
-                'attribute_definitions': [
-                    {'AttributeName': 'map_policy_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'country', 'AttributeType': 'S'},
-                    {'AttributeName': 'approved_at', 'AttributeType': 'S'},
-                    {'AttributeName': 'policy_area', 'AttributeType': 'S'},
-                ],
-                'global_secondary_indexes': [
-                    {
-                        'IndexName': 'country-approved-index',
-                        'KeySchema': [
-                            {'AttributeName': 'country', 'KeyType': 'HASH'},
-                            {'AttributeName': 'approved_at', 'KeyType': 'RANGE'},
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'ProvisionedThroughput': {
-                            'ReadCapacityUnits': 5,
-                            'WriteCapacityUnits': 5
-                        }
-                    },
-                    {
-                        'IndexName': 'policy-area-approved-index',
-                        'KeySchema': [
-                            {'AttributeName': 'policy_area', 'KeyType': 'HASH'},
-                            {'AttributeName': 'approved_at', 'KeyType': 'RANGE'},
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'ProvisionedThroughput': {
-                            'ReadCapacityUnits': 5,
-                            'WriteCapacityUnits': 5
-                        }
-                    }
-                ]
-            },
-            {
-                'name': 'visits',
-                'key_schema': [
-                    {'AttributeName': 'visit_id', 'KeyType': 'HASH'},
-                ],
-                'attribute_definitions': [
-                    {'AttributeName': 'visit_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'date', 'AttributeType': 'S'},
-                    {'AttributeName': 'user_type', 'AttributeType': 'S'},
-                ],
-                'global_secondary_indexes': [
-                    {
-                        'IndexName': 'date-index',
-                        'KeySchema': [
-                            {'AttributeName': 'date', 'KeyType': 'HASH'},
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'ProvisionedThroughput': {
-                            'ReadCapacityUnits': 5,
-                            'WriteCapacityUnits': 5
-                        }
-                    },
-                    {
-                        'IndexName': 'user-type-date-index',
-                        'KeySchema': [
-                            {'AttributeName': 'user_type', 'KeyType': 'HASH'},
-                            {'AttributeName': 'date', 'KeyType': 'RANGE'},
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'ProvisionedThroughput': {
-                            'ReadCapacityUnits': 5,
-                            'WriteCapacityUnits': 5
-                        }
-                    }
-                ]
-            }
-        ]
-        
-        for table_config in tables_to_create:
-            await self._create_table(table_config)
-    
-    async def _create_table(self, table_config: Dict):
-        """Create a single DynamoDB table"""
-        table_key = table_config['name']
-        table_name = self.table_names[table_key]
-        
-        try:
-            # Check if table exists
-            try:
-                existing_tables = self.client.list_tables()['TableNames']
-                if table_name in existing_tables:
-                    logger.info(f"Table {table_name} already exists")
-                    return
-            except ClientError as e:
-                if "AccessDeniedException" in str(e):
-                    logger.warning(f"Cannot list tables due to permissions - skipping {table_name}")
-                    return
-                raise
-            
-            # Prepare table creation parameters
-            create_params = {
-                'TableName': table_name,
-                'KeySchema': table_config['key_schema'],
-                'AttributeDefinitions': table_config['attribute_definitions'],
-                'ProvisionedThroughput': {
-                    'ReadCapacityUnits': 5,
-                    'WriteCapacityUnits': 5
-                }
-            }
-            
-            # Add Global Secondary Indexes if specified
-            if 'global_secondary_indexes' in table_config:
-                create_params['GlobalSecondaryIndexes'] = table_config['global_secondary_indexes']
-            
-            # Create table
-            response = self.client.create_table(**create_params)
-            
-            # Wait for table to be created
-            waiter = self.client.get_waiter('table_exists')
-            waiter.wait(TableName=table_name)
-            
-            logger.info(f"Table {table_name} created successfully")
-            
-        except ClientError as e:
-            error_code = e.response['Error']['Code']
-            if error_code == 'ResourceInUseException':
-                logger.info(f"Table {table_name} already exists")
-            elif error_code == 'AccessDeniedException':
-                logger.warning(f"Access denied for DynamoDB table {table_name} - skipping creation")
-            else:
-                logger.error(f"Error creating table {table_name}: {str(e)}")
-        except Exception as e:
-            if "AccessDeniedException" in str(e):
-                logger.warning(f"Access denied for DynamoDB table {table_name} - skipping creation")
-            else:
-                logger.error(f"Error creating table {table_name}: {str(e)}")
-    
     # CRUD Operations
     async def insert_item(self, table_name: str, item: Dict) -> bool:
         """Insert an item into DynamoDB table"""
@@ -393,14 +114,16 @@ class DynamoDBClient:
             logger.error(f"Error inserting item into {table_name}: {str(e)}")
             return False
     
-    async def get_item(self, table_name: str, key: Dict) -> Optional[Dict]:
-        """Get an item from DynamoDB table"""
+    async def get_item(self, table_name: str, key: Dict, raise_errors: bool = False) -> Optional[Dict]:
+        """Get an item from DynamoDB table. With raise_errors a failed read raises instead of returning None"""
         try:
             table = self.tables[table_name]
             response = table.get_item(Key=key)
             return response.get('Item')
             
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error getting item from {table_name}: {str(e)}")
             return None
     
@@ -435,26 +158,88 @@ class DynamoDBClient:
             logger.error(f"Error updating item in {table_name}: {str(e)}")
             return False
     
-    async def delete_item(self, table_name: str, key: Dict) -> bool:
-        """Delete an item from DynamoDB table"""
+    async def increment_counter(self, table_name: str, key: Dict, field: str, amount: int = 1,
+                                condition_expression: Optional[Any] = None) -> Optional[int]:
+        """Atomically add to a numeric attribute and return its new value (None on failure)"""
         try:
             table = self.tables[table_name]
-            table.delete_item(Key=key)
+            update_params = {
+                'Key': key,
+                'UpdateExpression': "ADD #field :amount SET updated_at = :updated_at",
+                'ExpressionAttributeNames': {'#field': field},
+                'ExpressionAttributeValues': {
+                    ':amount': amount,
+                    ':updated_at': datetime.utcnow().isoformat()
+                },
+                'ReturnValues': 'UPDATED_NEW'
+            }
+            if condition_expression is not None:
+                update_params['ConditionExpression'] = condition_expression
+            
+            response = table.update_item(**update_params)
+            return int(response['Attributes'][field])
+            
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return None
+            logger.error(f"Error incrementing {field} in {table_name}: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Error incrementing {field} in {table_name}: {str(e)}")
+            return None
+    
+    async def transact_write(self, operations: List[Dict]):
+        """
+        Apply Put/Update/Delete/ConditionCheck operations atomically in one TransactWriteItems call.
+        Operations take plain Python values ({'Put': {'TableName': 'users', 'Item': {...}}}); keys of
+        self.tables resolve to their table names, other names are used as given. Runs in a worker
+        thread; errors are raised so callers can tell a cancelled transaction from success.
+        """
+        serializer = TypeSerializer()
+        transact_items = []
+        for operation in operations:
+            (action, params), = operation.items()
+            params = dict(params, TableName=self.table_names.get(params['TableName'], params['TableName']))
+            for field in ('Item', 'Key', 'ExpressionAttributeValues'):
+                if field in params:
+                    params[field] = {name: serializer.serialize(value) for name, value in params[field].items()}
+            transact_items.append({action: params})
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: self.client.transact_write_items(TransactItems=transact_items))
+    
+    async def delete_item(self, table_name: str, key: Dict, condition_expression: Optional[Any] = None) -> bool:
+        """Delete an item from DynamoDB table, optionally only when a condition holds"""
+        try:
+            table = self.tables[table_name]
+            delete_params = {'Key': key}
+            if condition_expression is not None:
+                delete_params['ConditionExpression'] = condition_expression
+            
+            table.delete_item(**delete_params)
             logger.info(f"Item deleted from {table_name}")
             return True
             
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            logger.error(f"Error deleting item from {table_name}: {str(e)}")
+            return False
         except Exception as e:
             logger.error(f"Error deleting item from {table_name}: {str(e)}")
             return False
     
     async def query_items(self, table_name: str, key_condition: Any, 
-                         index_name: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
-        """Query items from DynamoDB table"""
+                         index_name: Optional[str] = None, limit: Optional[int] = None,
+                         scan_index_forward: bool = True, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Query items from DynamoDB table, reading only `fields` when given"""
         try:
             table = self.tables[table_name]
             
             query_params = {
-                'KeyConditionExpression': key_condition
+                'KeyConditionExpression': key_condition,
+                'ScanIndexForward': scan_index_forward,
+                **projection_params(fields)
             }
             
             if index_name:
@@ -471,12 +256,12 @@ class DynamoDBClient:
             return []
     
     async def scan_items(self, table_name: str, filter_expression: Optional[Any] = None,
-                        limit: Optional[int] = None) -> List[Dict]:
-        """Scan items from DynamoDB table"""
+                        limit: Optional[int] = None, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Scan items from DynamoDB table, reading only `fields` when given"""
         try:
             table = self.tables[table_name]
             
-            scan_params = {}
+            scan_params = projection_params(fields)
             
             if filter_expression:
                 scan_params['FilterExpression'] = filter_expression
@@ -491,15 +276,57 @@ class DynamoDBClient:
             logger.error(f"Error scanning items from {table_name}: {str(e)}")
             return []
 
-    async def scan_table(self, table_name: str) -> List[Dict]:
-        """Scan all items from a table"""
+    async def query_page(self, table_name: str, key_condition: Any, index_name: Optional[str] = None,
+                         limit: Optional[int] = None, exclusive_start_key: Optional[Dict] = None,
+                         scan_forward: bool = True, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Query one page of items. Returns {'items': [...], 'last_evaluated_key': key or None}.
+        Errors are raised so callers can fall back when an index is not available yet.
+        """
+        table = self.tables[table_name]
+        
+        query_params = {
+            'KeyConditionExpression': key_condition,
+            'ScanIndexForward': scan_forward,
+            **projection_params(fields)
+        }
+        if index_name:
+            query_params['IndexName'] = index_name
+        if limit:
+            query_params['Limit'] = limit
+        if exclusive_start_key:
+            query_params['ExclusiveStartKey'] = exclusive_start_key
+        
+        response = table.query(**query_params)
+        return {
+            'items': response.get('Items', []),
+            'last_evaluated_key': response.get('LastEvaluatedKey')
+        }
+    
+    async def scan_page(self, table_name: str, fields: Optional[Iterable[str]] = None,
+                        exclusive_start_key: Optional[Dict] = None) -> Dict[str, Any]:
+        """Scan one page of items. Returns {'items': [...], 'last_evaluated_key': key or None}"""
+        table = self.tables[table_name]
+        
+        scan_params = projection_params(fields)
+        if exclusive_start_key:
+            scan_params['ExclusiveStartKey'] = exclusive_start_key
+        
+        response = table.scan(**scan_params)
+        return {
+            'items': response.get('Items', []),
+            'last_evaluated_key': response.get('LastEvaluatedKey')
+        }
+
+    async def scan_table(self, table_name: str, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Scan all items from a table, reading only `fields` when given"""
         try:
             table = self.tables[table_name]
             if not table:
                 logger.error(f"Table {table_name} not initialized")
                 return []
             
-            response = table.scan()
+            response = table.scan(**projection_params(fields))
             return response.get('Items', [])
             
         except Exception as e:
@@ -509,11 +336,16 @@ class DynamoDBClient:
 # Global DynamoDB client instance
 dynamodb_client = DynamoDBClient()
 
+# Requests arriving while the startup warmup is still connecting wait for it instead of connecting again
+_connect_lock = asyncio.Lock()
+
 async def get_dynamodb():
     """Get DynamoDB client instance"""
     try:
         if not dynamodb_client.tables['users']:
-            await dynamodb_client.connect()
+            async with _connect_lock:
+                if not dynamodb_client.tables['users']:
+                    await dynamodb_client.connect()
         return dynamodb_client
     except Exception as e:
         logger.error(f"Error getting DynamoDB client: {e}")
@@ -524,4 +356,5 @@ async def get_dynamodb():
 # Helper functions for backward compatibility
 async def init_dynamodb():
     """Initialize DynamoDB connection"""
-    return await dynamodb_client.connect()
+    async with _connect_lock:
+        return await dynamodb_client.connect()
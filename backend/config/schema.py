@@ -0,0 +1,357 @@
+"""
+DynamoDB Schema Manifest
+Every table and global secondary index the backend uses, declared in one place, and the
+bootstrap that brings the account in line with it on startup.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from botocore.exceptions import ClientError
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PROVISIONED_THROUGHPUT = {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+
+# Non-key attributes copied into the list-view indexes (table and index keys are always projected)
+SESSION_LIST_ATTRIBUTES = ('title', 'created_at', 'message_count', 'last_message')
+MAP_POLICY_LIST_ATTRIBUTES = (
+    'parent_submission_id', 'policy_name', 'policy_description', 'policy_area', 'status', 'visible_on_map'
+)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """A global secondary index. Projects ALL attributes unless `include` names the non-key ones to copy"""
+    name: str
+    hash_key: str
+    range_key: Optional[str] = None
+    include: Tuple[str, ...] = ()
+
+    @property
+    def key_attributes(self) -> List[str]:
+        return [self.hash_key] + ([self.range_key] if self.range_key else [])
+
+    def definition(self, on_demand: bool) -> Dict:
+        key_schema = [{'AttributeName': self.hash_key, 'KeyType': 'HASH'}]
+        if self.range_key:
+            key_schema.append({'AttributeName': self.range_key, 'KeyType': 'RANGE'})
+        if self.include:
+            projection = {'ProjectionType': 'INCLUDE', 'NonKeyAttributes': list(self.include)}
+        else:
+            projection = {'ProjectionType': 'ALL'}
+        index = {'IndexName': self.name, 'KeySchema': key_schema, 'Projection': projection}
+        if not on_demand:
+            index['ProvisionedThroughput'] = dict(PROVISIONED_THROUGHPUT)
+        return index
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """A table, keyed in code by `key`. Every key attribute (table or index) is a string"""
+    key: str
+    name: str
+    hash_key: str
+    range_key: Optional[str] = None
+    indexes: Tuple[IndexSpec, ...] = ()
+    ttl_attribute: Optional[str] = None
+    on_demand: bool = False
+
+    def attribute_definitions(self, names: Optional[Iterable[str]] = None) -> List[Dict]:
+        if names is None:
+            names = [self.hash_key] + ([self.range_key] if self.range_key else [])
+            for index in self.indexes:
+                names += index.key_attributes
+        return [{'AttributeName': name, 'AttributeType': 'S'} for name in dict.fromkeys(names)]
+
+    def create_params(self) -> Dict:
+        key_schema = [{'AttributeName': self.hash_key, 'KeyType': 'HASH'}]
+        if self.range_key:
+            key_schema.append({'AttributeName': self.range_key, 'KeyType': 'RANGE'})
+        params = {
+            'TableName': self.name,
+            'KeySchema': key_schema,
+            'AttributeDefinitions': self.attribute_definitions()
+        }
+        if self.on_demand:
+            params['BillingMode'] = 'PAY_PER_REQUEST'
+        else:
+            params['ProvisionedThroughput'] = dict(PROVISIONED_THROUGHPUT)
+        if self.indexes:
+            params['GlobalSecondaryIndexes'] = [index.definition(self.on_demand) for index in self.indexes]
+        return params
+
+    def fingerprint(self) -> str:
+        payload = json.dumps([settings.AWS_DYNAMODB_REGION, asdict(self)], sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+# Core application tables (DynamoDBClient.tables)
+CORE_TABLES: Tuple[TableSpec, ...] = (
+    TableSpec('users', 'ai_policy_database_users', 'user_id', indexes=(
+        IndexSpec('email-index', 'email'),
+        IndexSpec('google-id-index', 'google_id'),
+    )),
+    TableSpec('policies', 'ai_policy_database_policies', 'policy_id', indexes=(
+        IndexSpec('user-created-index', 'user_id', 'created_at'),
+        IndexSpec('status-created-index', 'status', 'created_at'),
+    )),
+    TableSpec('chat_messages', 'ai_policy_database_chat_messages', 'message_id', indexes=(
+        IndexSpec('session-created-index', 'session_id', 'created_at'),
+        IndexSpec('user-created-index', 'user_id', 'created_at'),
+    )),
+    TableSpec('chat_sessions', 'ai_policy_database_chat_sessions', 'session_id', indexes=(
+        IndexSpec('user-updated-index', 'user_id', 'updated_at', include=SESSION_LIST_ATTRIBUTES),
+    )),
+    TableSpec('admin_data', 'ai_policy_database_admin_data', 'admin_id'),
+    TableSpec('file_metadata', 'ai_policy_database_file_metadata', 'file_id', indexes=(
+        IndexSpec('user-created-index', 'user_id', 'created_at'),
+    )),
+    TableSpec('map_policies', 'ai_policy_database_map_policies', 'map_policy_id', indexes=(
+        IndexSpec('country-approved-index', 'country', 'approved_at', include=MAP_POLICY_LIST_ATTRIBUTES),
+        IndexSpec('policy-area-approved-index', 'policy_area', 'approved_at'),
+    )),
+    TableSpec('visits', 'ai_policy_database_visits', 'visit_id', indexes=(
+        IndexSpec('date-index', 'date'),
+        IndexSpec('user-type-date-index', 'user_type', 'date'),
+    )),
+    TableSpec('analysis_cache', 'ai_policy_database_analysis_cache', 'cache_key', ttl_attribute='expires_at'),
+    TableSpec('auth_tokens', 'ai_policy_database_auth_tokens', 'email', 'purpose', ttl_attribute='expires_at'),
+    TableSpec('map_aggregates', 'ai_policy_database_map_aggregates', 'country'),
+)
+
+# RAG chatbot tables (RAGDatabaseManager)
+RAG_TABLES: Tuple[TableSpec, ...] = (
+    TableSpec('conversation_embeddings', 'conversation_embeddings', 'conversation_id', on_demand=True, indexes=(
+        IndexSpec('user-timestamp-index', 'user_id', 'timestamp'),
+    )),
+    TableSpec('keyword_index', 'keyword_index', 'keyword', 'conversation_id', on_demand=True),
+)
+
+# Conversation memory tables (ConversationMemoryService)
+MEMORY_TABLES: Tuple[TableSpec, ...] = (
+    TableSpec('conversation_messages', 'conversation_messages', 'message_id', indexes=(
+        IndexSpec('conversation-timestamp-index', 'conversation_id', 'timestamp'),
+    )),
+    TableSpec('conversation_threads', 'conversation_threads', 'conversation_id', indexes=(
+        IndexSpec('user-updated-index', 'user_id', 'updated_at'),
+    )),
+)
+
+SCHEMA: Tuple[TableSpec, ...] = CORE_TABLES + RAG_TABLES + MEMORY_TABLES
+
+# Tables found in line with the manifest by this process
+_verified: Set[str] = set()
+
+schema_status: Dict = {}
+
+
+def _same_projection(declared: Dict, existing: Dict) -> bool:
+    return (declared.get('ProjectionType') == existing.get('ProjectionType') and
+            set(declared.get('NonKeyAttributes', [])) == set(existing.get('NonKeyAttributes', [])))
+
+
+def _load_fingerprints() -> Dict[str, Dict]:
+    try:
+        with open(settings.DYNAMODB_SCHEMA_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _cached(spec: TableSpec, fingerprints: Dict[str, Dict]) -> bool:
+    entry = fingerprints.get(spec.name) or {}
+    max_age = settings.DYNAMODB_SCHEMA_CACHE_TTL_HOURS * 3600
+    return entry.get('fingerprint') == spec.fingerprint() and time.time() - entry.get('verified_at', 0) < max_age
+
+
+def _store_fingerprints(specs: List[TableSpec]):
+    fingerprints = _load_fingerprints()
+    now = time.time()
+    for spec in specs:
+        fingerprints[spec.name] = {'fingerprint': spec.fingerprint(), 'verified_at': now}
+    try:
+        with open(settings.DYNAMODB_SCHEMA_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(fingerprints, f, indent=2, sort_keys=True)
+    except OSError as e:
+        logger.warning(f"Could not write schema fingerprint cache: {str(e)}")
+
+
+def _list_table_names(client) -> Set[str]:
+    names = set()
+    for page in client.get_paginator('list_tables').paginate():
+        names.update(page['TableNames'])
+    return names
+
+
+def _create_table(client, spec: TableSpec) -> bool:
+    """Create a table, wait until it is active and enable TTL. True once the table matches the manifest"""
+    try:
+        client.create_table(**spec.create_params())
+        client.get_waiter('table_exists').wait(TableName=spec.name, WaiterConfig={'Delay': 2, 'MaxAttempts': 90})
+        if spec.ttl_attribute:
+            client.update_time_to_live(
+                TableName=spec.name,
+                TimeToLiveSpecification={'Enabled': True, 'AttributeName': spec.ttl_attribute}
+            )
+        logger.info(f"Table {spec.name} created successfully")
+        return True
+    except ClientError as e:
+        error_code = e.response['Error']['Code']
+        if error_code == 'ResourceInUseException':
+            # Created by another instance in the meantime; check it on the next cold start
+            logger.info(f"Table {spec.name} already exists")
+        elif error_code == 'AccessDeniedException':
+            logger.warning(f"Access denied for DynamoDB table {spec.name} - skipping creation")
+        else:
+            logger.error(f"Error creating table {spec.name}: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error creating table {spec.name}: {str(e)}")
+    return False
+
+
+def _index_drift(client, spec: TableSpec) -> Tuple[List[IndexSpec], List[IndexSpec]]:
+    """Declared indexes the table is missing, and those whose projection changed"""
+    description = client.describe_table(TableName=spec.name)['Table']
+    existing = {index['IndexName']: index for index in description.get('GlobalSecondaryIndexes', [])}
+    missing = [index for index in spec.indexes if index.name not in existing]
+    outdated = [
+        index for index in spec.indexes
+        if index.name in existing
+        and not _same_projection(index.definition(spec.on_demand)['Projection'],
+                                 existing[index.name].get('Projection', {}))
+    ]
+    return missing, outdated
+
+
+def _sync_indexes(client, spec: TableSpec) -> bool:
+    """
+    Bring an existing table's GSIs in line with the manifest: create missing indexes, and drop
+    indexes whose projection changed so a later startup recreates them (only with
+    DYNAMODB_REPROVISION_INDEXES, since queries on the index fail meanwhile).
+    True when nothing was left to change.
+    """
+    if not spec.indexes:
+        return True
+
+    try:
+        missing, outdated = _index_drift(client, spec)
+
+        # DynamoDB accepts one GSI change per UpdateTable call; the rest happen on later startups
+        if not missing:
+            if outdated:
+                _drop_outdated_index(client, spec, outdated[0])
+                return False
+            return True
+
+        index = missing[0]
+        client.update_table(
+            TableName=spec.name,
+            AttributeDefinitions=spec.attribute_definitions(index.key_attributes),
+            GlobalSecondaryIndexUpdates=[{'Create': index.definition(spec.on_demand)}]
+        )
+        logger.info(f"Creating index {index.name} on {spec.name}")
+    except ClientError as e:
+        error_code = e.response['Error']['Code']
+        if error_code in ('ResourceInUseException', 'LimitExceededException'):
+            logger.info(f"Index update already in progress on {spec.name}")
+        else:
+            logger.warning(f"Could not add indexes to {spec.name}: {str(e)}")
+    except Exception as e:
+        logger.warning(f"Could not add indexes to {spec.name}: {str(e)}")
+    return False
+
+
+def _drop_outdated_index(client, spec: TableSpec, index: IndexSpec):
+    if not settings.DYNAMODB_REPROVISION_INDEXES:
+        logger.warning(f"Index {index.name} on {spec.name} has an outdated projection; "
+                       f"set DYNAMODB_REPROVISION_INDEXES=true to rebuild it")
+        return
+    client.update_table(
+        TableName=spec.name,
+        GlobalSecondaryIndexUpdates=[{'Delete': {'IndexName': index.name}}]
+    )
+    logger.info(f"Dropping index {index.name} on {spec.name} to rebuild it with the declared projection")
+
+
+def _verify_indexes(client, spec: TableSpec) -> bool:
+    """Report index drift without changing anything"""
+    if not spec.indexes:
+        return True
+    try:
+        missing, outdated = _index_drift(client, spec)
+    except Exception as e:
+        logger.error(f"Could not describe table {spec.name}: {str(e)}")
+        return False
+    for index in missing:
+        logger.error(f"Index {index.name} is missing on {spec.name}")
+    for index in outdated:
+        logger.error(f"Index {index.name} on {spec.name} has an outdated projection")
+    return not missing and not outdated
+
+
+async def ensure_schema(client, tables: Iterable[TableSpec] = SCHEMA, mode: Optional[str] = None) -> Dict:
+    """
+    Bring the given tables in line with the manifest with a single ListTables call: missing
+    tables are created concurrently and existing ones get their indexes synced. Tables already
+    verified by this process, or recorded in the fingerprint cache by a recent startup, are
+    skipped. In 'verify' mode (DYNAMODB_SCHEMA_MODE) drift is only reported.
+    """
+    mode = mode or settings.DYNAMODB_SCHEMA_MODE
+    requested = [spec for spec in tables if spec.name not in _verified]
+    fingerprints = _load_fingerprints()
+    pending = [spec for spec in requested if not _cached(spec, fingerprints)]
+    _verified.update(spec.name for spec in requested if spec not in pending)
+
+    status = {'mode': mode, 'checked': [spec.name for spec in pending], 'created': [], 'missing': [], 'drifted': []}
+    if not pending:
+        logger.info("DynamoDB schema unchanged since the last verified startup - skipping table checks")
+        schema_status.update(status)
+        return status
+
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    try:
+        existing = await loop.run_in_executor(None, _list_table_names, client)
+    except ClientError as e:
+        if "AccessDeniedException" in str(e):
+            logger.warning("Cannot list tables due to permissions - skipping schema bootstrap")
+            status['error'] = 'access_denied'
+            schema_status.update(status)
+            return status
+        raise
+
+    absent = [spec for spec in pending if spec.name not in existing]
+    present = [spec for spec in pending if spec.name in existing]
+
+    if mode == 'verify':
+        status['missing'] = [spec.name for spec in absent]
+        for spec in absent:
+            logger.error(f"Table {spec.name} is missing (DYNAMODB_SCHEMA_MODE=verify, not creating it)")
+        synced = await asyncio.gather(*(loop.run_in_executor(None, _verify_indexes, client, spec) for spec in present))
+        created = [False] * len(absent)
+    else:
+        created, synced = await asyncio.gather(
+            asyncio.gather(*(loop.run_in_executor(None, _create_table, client, spec) for spec in absent)),
+            asyncio.gather(*(loop.run_in_executor(None, _sync_indexes, client, spec) for spec in present))
+        )
+        status['created'] = [spec.name for spec, ok in zip(absent, created) if ok]
+
+    status['drifted'] = [spec.name for spec, ok in zip(present, synced) if not ok]
+    in_line = [spec for spec, ok in zip(absent, created) if ok] + [spec for spec, ok in zip(present, synced) if ok]
+    _verified.update(spec.name for spec in in_line)
+    if in_line:
+        _store_fingerprints(in_line)
+
+    status['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(f"DynamoDB schema checked in {status['elapsed_seconds']}s: {len(pending)} tables, "
+                f"{len(status['created'])} created, {len(status['missing'])} missing, "
+                f"{len(status['drifted'])} with index changes pending")
+    schema_status.update(status)
+    return status
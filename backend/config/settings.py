@@ -34,6 +34,17 @@ class Settings:
     SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
     SMTP_FROM_EMAIL = os.getenv("SMTP_FROM_EMAIL")
     FROM_EMAIL = os.getenv("FROM_EMAIL")  # Legacy alias
+    SMTP_SECURITY = os.getenv("SMTP_SECURITY", "")  # ssl, starttls or none (default: by port)
+    SMTP_TIMEOUT_SECONDS = int(os.getenv("SMTP_TIMEOUT_SECONDS", "10"))
+    
+    # Email Outbox
+    EMAIL_OUTBOX_QUEUE_SIZE = int(os.getenv("EMAIL_OUTBOX_QUEUE_SIZE", "1000"))
+    EMAIL_SMTP_POOL_SIZE = int(os.getenv("EMAIL_SMTP_POOL_SIZE", "2"))
+    EMAIL_SMTP_IDLE_SECONDS = int(os.getenv("EMAIL_SMTP_IDLE_SECONDS", "60"))
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+    EMAIL_BATCH_WINDOW_MS = int(os.getenv("EMAIL_BATCH_WINDOW_MS", "50"))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_BASE_SECONDS = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", "2"))
     
     # Frontend Configuration
     FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
@@ -47,6 +58,13 @@ class Settings:
     # DynamoDB Configuration
     DYNAMODB_TABLE_PREFIX = os.getenv("DYNAMODB_TABLE_PREFIX", "")
     AWS_DYNAMODB_REGION = os.getenv("AWS_DYNAMODB_REGION", "us-east-1")
+    # Drop and rebuild GSIs whose declared projection changed (the index is unavailable while it rebuilds)
+    DYNAMODB_REPROVISION_INDEXES = os.getenv("DYNAMODB_REPROVISION_INDEXES", "false").lower() == "true"
+    # create: create missing tables and indexes on startup; verify: only report drift (production)
+    DYNAMODB_SCHEMA_MODE = os.getenv("DYNAMODB_SCHEMA_MODE", "create").lower()
+    # Tables verified by a recent startup are not checked again until the manifest changes or this expires
+    DYNAMODB_SCHEMA_CACHE_FILE = os.getenv("DYNAMODB_SCHEMA_CACHE_FILE", ".dynamodb_schema_cache.json")
+    DYNAMODB_SCHEMA_CACHE_TTL_HOURS = int(os.getenv("DYNAMODB_SCHEMA_CACHE_TTL_HOURS", "24"))
     
     # CORS
     ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:3001").split(",")
@@ -63,12 +81,93 @@ class Settings:
     # Environment
     ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
     
+    # Startup
+    LAZY_IMPORT_WARMUP = os.getenv("LAZY_IMPORT_WARMUP", "true").lower() == "true"
+    LAZY_IMPORT_WARMUP_DELAY_SECONDS = int(os.getenv("LAZY_IMPORT_WARMUP_DELAY_SECONDS", "10"))
+    # Per-step limit for background startup tasks (the DynamoDB step may create tables)
+    WARMUP_TIMEOUT_SECONDS = int(os.getenv("WARMUP_TIMEOUT_SECONDS", "60"))
+    WARMUP_DYNAMODB_TIMEOUT_SECONDS = int(os.getenv("WARMUP_DYNAMODB_TIMEOUT_SECONDS", "300"))
+    
     # AI Analysis
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     GROQ_API_URL = os.getenv("GROQ_API_URL")
     MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "10"))
     SUPPORTED_FILE_TYPES = os.getenv("SUPPORTED_FILE_TYPES", ".pdf,.doc,.docx,.txt").split(",")
     
+    # Password Hashing and Login Throttling
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS = int(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS", "5"))
+    LOGIN_ACCOUNT_MAX_FAILURES = int(os.getenv("LOGIN_ACCOUNT_MAX_FAILURES", "5"))
+    LOGIN_ACCOUNT_WINDOW_SECONDS = int(os.getenv("LOGIN_ACCOUNT_WINDOW_SECONDS", "900"))
+    LOGIN_IP_MAX_FAILURES = int(os.getenv("LOGIN_IP_MAX_FAILURES", "30"))
+    LOGIN_IP_WINDOW_SECONDS = int(os.getenv("LOGIN_IP_WINDOW_SECONDS", "60"))
+    # Reverse proxies in front of the app (addresses or CIDR ranges, as uvicorn's --forwarded-allow-ips).
+    # Only their X-Forwarded-For is trusted, and a proxy address is never IP-throttled
+    FORWARDED_ALLOW_IPS = [host.strip() for host in os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1").split(",") if host.strip()]
+    
+    # One-time Codes
+    OTP_EXPIRY_MINUTES = int(os.getenv("OTP_EXPIRY_MINUTES", "10"))
+    OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+    
+    # Authenticated Principal Cache
+    PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+    PRINCIPAL_CACHE_NEGATIVE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_NEGATIVE_TTL_SECONDS", "15"))
+    PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+    
+    # Admin Listings
+    SUBMISSION_COUNTS_TTL_SECONDS = int(os.getenv("SUBMISSION_COUNTS_TTL_SECONDS", "300"))
+    
+    # Map Aggregates
+    MAP_AGGREGATE_RELOAD_SECONDS = int(os.getenv("MAP_AGGREGATE_RELOAD_SECONDS", "30"))
+    MAP_TOP_POLICIES_PER_AREA = int(os.getenv("MAP_TOP_POLICIES_PER_AREA", "5"))
+    
+    # Response Cache
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+    RESPONSE_CACHE_MAX_BODY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BODY_BYTES", "2000000"))
+    
+    # Search Index
+    SEARCH_INDEX_REFRESH_SECONDS = int(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", "600"))
+    
+    # Analysis Cache
+    ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "256"))
+    ANALYSIS_CACHE_TTL_DAYS = int(os.getenv("ANALYSIS_CACHE_TTL_DAYS", "90"))
+    
+    # Analysis Jobs
+    ANALYSIS_JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "2"))
+    ANALYSIS_JOB_QUEUE_SIZE = int(os.getenv("ANALYSIS_JOB_QUEUE_SIZE", "100"))
+    ANALYSIS_JOB_TIMEOUT_SECONDS = int(os.getenv("ANALYSIS_JOB_TIMEOUT_SECONDS", "300"))
+    ANALYSIS_JOB_TTL_SECONDS = int(os.getenv("ANALYSIS_JOB_TTL_SECONDS", "86400"))
+    
+    # Conversation Summaries
+    CHAT_SUMMARY_ENABLED = os.getenv("CHAT_SUMMARY_ENABLED", "true").lower() == "true"
+    # Messages always sent verbatim; older ones are folded into the summary once this many more pile up
+    CHAT_CONTEXT_RECENT_MESSAGES = int(os.getenv("CHAT_CONTEXT_RECENT_MESSAGES", "4"))
+    CHAT_SUMMARY_TRIGGER_MESSAGES = int(os.getenv("CHAT_SUMMARY_TRIGGER_MESSAGES", "6"))
+    CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+    
+    # Chat Intent Classifier
+    INTENT_CLASSIFIER_ENABLED = os.getenv("INTENT_CLASSIFIER_ENABLED", "true").lower() == "true"
+    # Written by train_intent_classifier.py; without it the model is trained from the files below at startup
+    INTENT_MODEL_FILE = os.getenv("INTENT_MODEL_FILE", "intent_model.npz")
+    INTENT_TRAINING_FILES = os.getenv("INTENT_TRAINING_FILES", "policy_training_data.jsonl,intent_training_data.jsonl").split(",")
+    # Less confident predictions fall back to the keyword rules
+    INTENT_MIN_CONFIDENCE = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.6"))
+    
+    # Policy Quality
+    # JSON list of rules replacing POLICY_QUALITY_RULES in config/data_constants.py
+    POLICY_QUALITY_RULES_FILE = os.getenv("POLICY_QUALITY_RULES_FILE")
+    
+    # Model Routing
+    MODEL_ROUTER_NEGATIVE_TTL_SECONDS = int(os.getenv("MODEL_ROUTER_NEGATIVE_TTL_SECONDS", "300"))
+    MODEL_ROUTER_HEDGE_PERCENTILE = float(os.getenv("MODEL_ROUTER_HEDGE_PERCENTILE", "0.95"))
+    
+    # Chunked TEA Scoring
+    TEA_CHUNK_SIZE_CHARS = int(os.getenv("TEA_CHUNK_SIZE_CHARS", "8000"))
+    TEA_CHUNK_CONCURRENCY = int(os.getenv("TEA_CHUNK_CONCURRENCY", "3"))
+    TEA_MAX_CHUNKS = int(os.getenv("TEA_MAX_CHUNKS", "20"))
+    
     # AWS Configuration
     AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
@@ -3,7 +3,7 @@ Admin Controller
 Handles HTTP requests for admin operations
 """
 from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 import time
 import uuid
@@ -14,22 +14,35 @@ from datetime import datetime
 from middleware.auth import get_admin_user, get_current_user
 from services.admin_service_dynamodb import admin_service
 from services.policy_service_dynamodb import policy_service
+from services.search_index_service import policy_search_index, submission_highlights
+from services.map_aggregate_service import map_aggregates
+from services.policy_quality_service import policy_quality
 from utils.helpers import convert_objectid
+from utils.json_response import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
+# Attributes the dashboard statistics read
+STATISTICS_USER_FIELDS = ('user_id', 'role', 'verified')
+STATISTICS_POLICY_FIELDS = ('policy_id', 'status', 'policy_areas')
+
 
 @router.get("/submissions")
 async def get_admin_submissions(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     status: str = Query("all"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_counts: bool = Query(True),
     admin_user: dict = Depends(get_admin_user)
 ):
     """Get all submissions for admin review with pagination"""
     try:
-        return await admin_service.get_submissions(page=page, limit=limit, status=status)
+        return FastJSONResponse(await admin_service.get_submissions(page=page, limit=limit, status=status,
+                                                                    cursor=cursor, include_counts=include_counts))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting admin submissions: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get submissions: {str(e)}")
@@ -41,95 +54,12 @@ async def get_admin_dashboard_data():
         logger.info("Getting comprehensive admin dashboard data")
         
         # Get submissions with user data and enhanced country status
-        submissions_result = await get_submissions_with_country_status(page=1, limit=50, status="all")
+        submissions_result = await get_submissions_with_country_status(page=1, limit=50, status="all",
+                                                                       cursor=None, include_counts=True)
         
         # Get map visualization data with area-based point system (only approved policies)
         try:
-            from config.dynamodb import get_dynamodb
-            db = await get_dynamodb()
-            
-            # Get only approved policies from map_policies table
-            map_policies = await db.scan_table('map_policies')
-            approved_map_policies = [p for p in map_policies if p.get('status') == 'approved']
-            
-            # Group by country and calculate area points
-            country_data = {}
-            
-            for policy in approved_map_policies:
-                country = policy.get('country', 'Unknown')
-                area = policy.get('policy_area', 'Unknown Area')
-                
-                if country not in country_data:
-                    country_data[country] = {
-                        'country': country,
-                        'areas': {},  # Track areas with approved policies
-                        'total_approved_policies': 0
-                    }
-                
-                # Track this area (each area gets max 1 point regardless of policy count)
-                if area not in country_data[country]['areas']:
-                    country_data[country]['areas'][area] = {
-                        'area_name': area,
-                        'approved_policies': []
-                    }
-                
-                # Add policy to area
-                country_data[country]['areas'][area]['approved_policies'].append({
-                    'policy_name': policy.get('policy_name', ''),
-                    'policy_description': policy.get('policy_description', ''),
-                    'approved_at': policy.get('approved_at', '')
-                })
-                
-                country_data[country]['total_approved_policies'] += 1
-            
-            # Calculate final country statistics with area-based coloring
-            countries_list = []
-            
-            for country, data in country_data.items():
-                area_points = len(data['areas'])  # Number of areas with approved policies
-                
-                # Updated color system: 1-3 red, 4-7 yellow, 8-10 green
-                if area_points == 0:
-                    color = 'gray'
-                    level = 'no_approved_areas'
-                elif area_points <= 3:
-                    color = 'red'
-                    level = 'low'
-                elif area_points <= 7:
-                    color = 'yellow'
-                    level = 'medium'
-                else:
-                    color = 'green'
-                    level = 'high'
-                
-                countries_list.append({
-                    'country': country,
-                    'area_points': area_points,  # Key metric for coloring
-                    'total_approved_policies': data['total_approved_policies'],
-                    'areas_with_approved_policies': list(data['areas'].keys()),
-                    'areas_detail': list(data['areas'].values()),
-                    'color': color,
-                    'level': level,
-                    'status': 'approved' if area_points > 0 else 'no_approved_policies'
-                })
-            
-            map_data = {
-                "success": True,
-                "countries": countries_list,
-                "total_countries": len(countries_list),
-                "total_approved_policies": sum(c['total_approved_policies'] for c in countries_list),
-                "area_point_system": {
-                    "explanation": "Each area gets 1 point if it has at least one approved policy",
-                    "color_coding": "Based on total area points per country"
-                },
-                "color_legend": {
-                    "gray": "No approved areas (0 points)",
-                    "red": "Low: 1-3 approved areas", 
-                    "yellow": "Medium: 4-7 approved areas",
-                    "green": "High: 8-10 approved areas"
-                },
-                "data_source": "Only approved policies from map_policies table"
-            }
+            map_data = await map_aggregates.get_area_point_view()
         except Exception as e:
             logger.warning(f"Could not get map data: {e}")
             map_data = {"countries": [], "total_countries": 0, "total_policies": 0}
@@ -149,7 +79,7 @@ async def get_admin_dashboard_data():
             }
             
             # Count users
-            all_users = await db.scan_table('users')
+            all_users = await db.scan_table('users', fields=STATISTICS_USER_FIELDS)
             statistics["users"]["total"] = len(all_users)
             for user in all_users:
                 if user.get("role") == "admin":
@@ -158,7 +88,7 @@ async def get_admin_dashboard_data():
                     statistics["users"]["verified"] += 1
             
             # Count submissions and their statuses
-            all_submissions = await db.scan_table('policies')
+            all_submissions = await db.scan_table('policies', fields=STATISTICS_POLICY_FIELDS)
             statistics["submissions"]["total"] = len(all_submissions)
             
             for submission in all_submissions:
@@ -263,7 +193,7 @@ async def get_dynamic_statistics():
         }
         
         # Count users
-        all_users = await db.scan_table('users')
+        all_users = await db.scan_table('users', fields=STATISTICS_USER_FIELDS)
         stats["users"]["total"] = len(all_users)
         
         for user in all_users:
@@ -273,7 +203,7 @@ async def get_dynamic_statistics():
                 stats["users"]["verified"] += 1
         
         # Count submissions
-        all_submissions = await db.scan_table('policies')
+        all_submissions = await db.scan_table('policies', fields=STATISTICS_POLICY_FIELDS)
         stats["submissions"]["total"] = len(all_submissions)
         
         # Count individual policies within submissions
@@ -314,16 +244,11 @@ async def get_dynamic_statistics():
         
         # Get map data
         try:
-            map_policies = await db.scan_table('map_policies')
-            approved_map_policies = [p for p in map_policies if p.get('status') == 'approved']
-            
-            countries = set()
-            for policy in approved_map_policies:
-                countries.add(policy.get('country', 'Unknown'))
+            map_payload, _ = await map_aggregates.get_payload()
             
-            stats["map_data"]["total_approved_policies"] = len(approved_map_policies)
-            stats["map_data"]["total_countries"] = len(countries)
-            stats["countries_with_policies"] = len(countries)
+            stats["map_data"]["total_approved_policies"] = map_payload["total_approved_policies"]
+            stats["map_data"]["total_countries"] = map_payload["total_countries"]
+            stats["countries_with_policies"] = map_payload["total_countries"]
         except Exception as e:
             logger.warning(f"Could not get map data: {e}")
             stats["countries_with_policies"] = 0
@@ -358,7 +283,7 @@ async def get_dynamic_statistics():
 
 @router.get("/search")
 async def search_submissions(
-    query: str = Query("", description="Search query for country, policy name, or policy ID"),
+    query: str = Query("", description="Search query for country, area, policy name, description, email, or policy ID"),
     status: str = Query("all", description="Filter by status"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100)
@@ -370,11 +295,18 @@ async def search_submissions(
         from config.dynamodb import get_dynamodb
         db = await get_dynamodb()
         
-        # Get all submissions from DynamoDB
-        all_submissions = await db.scan_table('policies')
+        # Rank matches from the full-text index, then load only the requested page
+        total, hits = await policy_search_index.search(query, status=status, page=page, limit=limit)
         
-        # Enhance with user data
-        for submission in all_submissions:
+        paginated_submissions = []
+        for hit in hits:
+            submission = await db.get_item('policies', {'policy_id': hit["id"]})
+            if not submission:
+                continue
+            submission["search_score"] = hit["score"]
+            submission["search_highlights"] = submission_highlights(submission, hit["terms"])
+            
+            # Enhance with user data
             user_id = submission.get("user_id")
             if user_id:
                 try:
@@ -390,54 +322,8 @@ async def search_submissions(
                 except Exception as e:
                     submission["user_name"] = "Unknown User"
                     submission["user_full_name"] = "Unknown User"
-        
-        # Apply search filters
-        filtered_submissions = []
-        
-        for submission in all_submissions:
-            # Status filter
-            if status != "all" and submission.get("status", "").lower() != status.lower():
-                continue
-                
-            # Search query filter
-            if query:
-                query_lower = query.lower()
-                match = False
-                
-                # Search in submission fields
-                if (query_lower in submission.get("country", "").lower() or
-                    query_lower in submission.get("policy_id", "").lower() or
-                    query_lower in submission.get("user_email", "").lower() or
-                    query_lower in submission.get("user_name", "").lower()):
-                    match = True
-                
-                # Search in policy areas and individual policies
-                if not match:
-                    for area in submission.get("policy_areas", []):
-                        if query_lower in area.get("area_name", "").lower():
-                            match = True
-                            break
-                            
-                        for policy in area.get("policies", []):
-                            if (query_lower in policy.get("policyName", "").lower() or
-                                query_lower in policy.get("policyDescription", "").lower() or
-                                query_lower in policy.get("policyId", "").lower()):
-                                match = True
-                                break
-                        
-                        if match:
-                            break
-                
-                if not match:
-                    continue
             
-            filtered_submissions.append(submission)
-        
-        # Apply pagination
-        total = len(filtered_submissions)
-        start = (page - 1) * limit
-        end = start + limit
-        paginated_submissions = filtered_submissions[start:end]
+            paginated_submissions.append(submission)
         
         return {
             "status": "success",
@@ -464,14 +350,17 @@ async def search_submissions(
 async def get_submissions_with_country_status(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    status: str = Query("all")
+    status: str = Query("all"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_counts: bool = Query(True)
 ):
     """Get submissions with proper country and individual policy status calculation"""
     try:
         logger.info("Getting submissions with country status calculation")
         
         # Get base submissions with user data
-        result = await get_admin_submissions_debug(page=page, limit=limit, status=status)
+        result = await get_admin_submissions_debug(page=page, limit=limit, status=status,
+                                                   cursor=cursor, include_counts=include_counts)
         
         # Calculate both individual policy status and country-level status
         for submission in result.get("data", []):
@@ -550,6 +439,8 @@ async def get_submissions_with_country_status(
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting submissions with country status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get submissions: {str(e)}")
@@ -558,14 +449,17 @@ async def get_submissions_with_country_status(
 async def get_submissions_with_area_status(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    status: str = Query("all")
+    status: str = Query("all"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_counts: bool = Query(True)
 ):
     """Get submissions with proper policy area status calculation"""
     try:
         logger.info("Getting submissions with calculated area status")
         
         # Get base submissions with user data
-        result = await get_admin_submissions_debug(page=page, limit=limit, status=status)
+        result = await get_admin_submissions_debug(page=page, limit=limit, status=status,
+                                                   cursor=cursor, include_counts=include_counts)
         
         # Calculate policy area statuses based on individual policy statuses
         for submission in result.get("data", []):
@@ -663,6 +557,9 @@ async def clean_map_duplicates():
             else:
                 kept_count += 1
         
+        if deleted_count:
+            await map_aggregates.rebuild()
+        
         return {
             "success": True,
             "message": f"Cleaned map duplicates: deleted {deleted_count}, kept {kept_count}",
@@ -741,6 +638,8 @@ async def sync_map_with_approved_policies():
                 if area_has_approved and area_name not in area_points[country]:
                     area_points[country][area_name] = 1
         
+        await map_aggregates.rebuild()
+        
         # Step 3: Calculate country colors based on area points
         logger.info("Step 3: Calculating area-based colors...")
         country_stats = []
@@ -798,93 +697,7 @@ async def get_map_visualization_with_area_points():
     try:
         logger.info("🗺️ Getting map visualization with area point system")
         
-        from config.dynamodb import get_dynamodb
-        db = await get_dynamodb()
-        
-        # Get only approved policies from map_policies table
-        map_policies = await db.scan_table('map_policies')
-        approved_map_policies = [p for p in map_policies if p.get('status') == 'approved']
-        
-        # Group by country and calculate area points
-        country_data = {}
-        
-        for policy in approved_map_policies:
-            country = policy.get('country', 'Unknown')
-            area = policy.get('policy_area', 'Unknown Area')
-            
-            if country not in country_data:
-                country_data[country] = {
-                    'country': country,
-                    'areas': {},  # Track areas with approved policies
-                    'total_approved_policies': 0,
-                    'area_points': 0
-                }
-            
-            # Track this area (each area gets max 1 point regardless of policy count)
-            if area not in country_data[country]['areas']:
-                country_data[country]['areas'][area] = {
-                    'area_name': area,
-                    'approved_policies': [],
-                    'has_approved': True  # This area has at least one approved policy
-                }
-            
-            # Add policy to area
-            country_data[country]['areas'][area]['approved_policies'].append({
-                'policy_name': policy.get('policy_name', ''),
-                'policy_description': policy.get('policy_description', ''),
-                'approved_at': policy.get('approved_at', '')
-            })
-            
-            country_data[country]['total_approved_policies'] += 1
-        
-        # Calculate final country statistics with area-based coloring
-        countries_list = []
-        
-        for country, data in country_data.items():
-            area_points = len(data['areas'])  # Number of areas with approved policies
-            
-            # Updated color system: 1-3 red, 4-7 yellow, 8-10 green
-            if area_points == 0:
-                color = 'gray'
-                level = 'no_approved_areas'
-            elif area_points <= 3:
-                color = 'red'
-                level = 'low'
-            elif area_points <= 7:
-                color = 'yellow'
-                level = 'medium'
-            else:
-                color = 'green'
-                level = 'high'
-            
-            countries_list.append({
-                'country': country,
-                'area_points': area_points,  # Number of areas with approved policies
-                'total_approved_policies': data['total_approved_policies'],
-                'areas_with_approved_policies': list(data['areas'].keys()),
-                'areas_detail': list(data['areas'].values()),
-                'color': color,
-                'level': level,
-                'status': 'approved' if area_points > 0 else 'no_approved_policies'
-            })
-        
-        return {
-            "success": True,
-            "countries": countries_list,
-            "total_countries": len(countries_list),
-            "total_approved_policies": sum(c['total_approved_policies'] for c in countries_list),
-            "area_point_system": {
-                "explanation": "Each area gets 1 point if it has at least one approved policy",
-                "color_coding": "Based on total area points per country"
-            },
-            "color_legend": {
-                "gray": "No approved areas (0 points)",
-                "red": "Low: 1-3 approved areas", 
-                "yellow": "Medium: 4-7 approved areas",
-                "green": "High: 8-10 approved areas"
-            },
-            "data_source": "Only approved policies from map_policies table"
-        }
+        return await map_aggregates.get_area_point_view()
         
     except Exception as e:
         logger.error(f"❌ Map visualization failed: {str(e)}")
@@ -948,12 +761,15 @@ async def demo_mixed_status(submission_id: str):
 async def get_admin_submissions_debug(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    status: str = Query("all")
+    status: str = Query("all"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_counts: bool = Query(True)
 ):
     """Debug endpoint: Get all submissions without authentication (TEMPORARY)"""
     try:
         logger.info("DEBUG: Getting submissions without authentication")
-        result = await admin_service.get_submissions(page=page, limit=limit, status=status)
+        result = await admin_service.get_submissions(page=page, limit=limit, status=status,
+                                                     cursor=cursor, include_counts=include_counts)
         
         # Enhance submissions with user data
         from config.dynamodb import get_dynamodb
@@ -987,6 +803,8 @@ async def get_admin_submissions_debug(
         }
         
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting admin submissions (debug): {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get submissions: {str(e)}")
@@ -1065,6 +883,8 @@ async def debug_approval(
                     await db.insert_item('map_policies', map_policy_entry)
                     map_entries.append(map_policy_entry["map_policy_id"])
                     logger.info(f"✅ Created map policy: {map_policy_entry['map_policy_id']}")
+            
+            await map_aggregates.refresh_country(policy["country"])
         
         return {
             "success": True,
@@ -1576,16 +1396,41 @@ async def delete_policy_completely(
 async def get_approved_policies(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_counts: bool = Query(True),
     admin_user: dict = Depends(get_admin_user)
 ):
     """Get all approved policies for map visualization"""
     try:
-        return await admin_service.get_approved_policies(page=page, limit=limit)
+        return FastJSONResponse(await admin_service.get_approved_policies(page=page, limit=limit, cursor=cursor,
+                                                                          include_counts=include_counts))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting approved policies: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get approved policies: {str(e)}")
 
 
+@router.get("/policy-quality")
+async def get_policy_quality_report(admin_user: dict = Depends(get_admin_user)):
+    """Policies flagged by the data-quality rules, with counts per rule"""
+    try:
+        return FastJSONResponse({"success": True, **await policy_quality.report()})
+    except Exception as e:
+        logger.error(f"Error building policy quality report: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to build policy quality report: {str(e)}")
+
+
+@router.post("/policy-quality/recheck")
+async def recheck_policy_quality(admin_user: dict = Depends(get_admin_user)):
+    """Store quality flags on policies checked under older rules (or never), then report"""
+    try:
+        return FastJSONResponse({"success": True, **await policy_quality.report(recheck=True)})
+    except Exception as e:
+        logger.error(f"Error re-checking policy quality: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to re-check policy quality: {str(e)}")
+
+
 @router.get("/policy-files/{policy_id}")
 async def get_policy_files(
     policy_id: str,
@@ -1784,7 +1629,10 @@ async def get_all_files(
         
         # Get files from file_metadata table
         try:
-            file_metadata_items = await db.scan_table('file_metadata')
+            file_metadata_items = await db.scan_table(
+                'file_metadata',
+                fields=('file_id', 'filename', 'content_type', 'file_size', 'created_at', 'policy_id')
+            )
             for file_meta in file_metadata_items:
                 all_files.append({
                     "file_id": file_meta.get("file_id"),
@@ -1799,7 +1647,7 @@ async def get_all_files(
             logger.warning(f"Could not fetch file metadata: {e}")
         
         # Get files embedded in policies
-        all_policies = await db.scan_table('policies')
+        all_policies = await db.scan_table('policies', fields=('policy_id', 'policy_areas'))
         for policy in all_policies:
             for area in policy.get("policy_areas", []):
                 for individual_policy in area.get("policies", []):
@@ -1818,7 +1666,7 @@ async def get_all_files(
                                 "source": "embedded_in_policy"
                             })
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "files": all_files,
             "total_files": len(all_files),
@@ -1826,7 +1674,7 @@ async def get_all_files(
                 "metadata_table": len([f for f in all_files if f["source"] == "metadata_table"]),
                 "embedded_in_policies": len([f for f in all_files if f["source"] == "embedded_in_policy"])
             }
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error getting all files: {str(e)}")
@@ -2,7 +2,7 @@
 DynamoDB-based AI Analysis controller.
 """
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import os
 from pathlib import Path
 from fastapi import APIRouter, HTTPException, Depends, status, File, UploadFile, Form
@@ -10,6 +10,9 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from middleware.auth import get_current_user, get_admin_user
 from services.ai_analysis_service_dynamodb import ai_analysis_service
+from services.analysis_cache_service import analysis_cache
+from services.bedrock_service import bedrock_service
+from services.analysis_job_service import analysis_job_service, JOB_TYPE_TEA_SCORES
 
 logger = logging.getLogger(__name__)
 
@@ -111,35 +114,18 @@ async def analyze_uploaded_file(
         if not file_metadata:
             raise HTTPException(status_code=404, detail="File not found")
         
-        # Read file content from S3
-        file_content = None
         filename = file_metadata.filename or 'unknown'
-        
-        try:
-            from services.aws_service import aws_service
-            s3_result = await aws_service.get_file(file_metadata.s3_key)
-            file_content = s3_result['content']
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to retrieve file from S3: {str(e)}")
-        
-        if not file_content:
-            raise HTTPException(status_code=404, detail="File content could not be retrieved")
-
         logger.info(f"Processing uploaded file: {filename} (file_id: {file_id})")
         
-        # Extract text from file
-        try:
-            text_content = ai_analysis_service.extract_text_from_file(file_content, filename)
-        except Exception as e:
-            logger.error(f"Text extraction failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Failed to extract text from document: {str(e)}")
+        # Extract text from file (reuses text stored on the file metadata)
+        text_content = await ai_analysis_service.get_stored_file_text(file_metadata)
         
         if not text_content.strip():
             raise HTTPException(status_code=400, detail="No readable text found in the document")
         
         # Analyze with AI
         try:
-            extracted_data = ai_analysis_service.analyze_policy_document(text_content)
+            extracted_data = await ai_analysis_service.analyze_policy_document_cached(text_content)
         except Exception as e:
             logger.error(f"AI analysis failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"AI analysis failed: {str(e)}")
@@ -216,7 +202,7 @@ async def analyze_policy_document(
         
         # Extract text from file - we need to import the service
         try:
-            text_content = ai_analysis_service.extract_text_from_file(file_content, file.filename)
+            text_content = await ai_analysis_service.extract_text_cached(file_content, file.filename)
         except Exception as e:
             logger.error(f"Text extraction failed: {str(e)}")
             raise HTTPException(status_code=400, detail=f"Failed to extract text from document: {str(e)}")
@@ -226,7 +212,7 @@ async def analyze_policy_document(
         
         # Analyze with AI
         try:
-            extracted_data = ai_analysis_service.analyze_policy_document(text_content)
+            extracted_data = await ai_analysis_service.analyze_policy_document_cached(text_content)
         except Exception as e:
             logger.error(f"AI analysis failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"AI analysis failed: {str(e)}")
@@ -293,7 +279,7 @@ async def calculate_tea_scores(
         
         # Extract text from file
         try:
-            text_content = ai_analysis_service.extract_text_from_file(file_content, file.filename)
+            text_content = await ai_analysis_service.extract_text_cached(file_content, file.filename)
         except Exception as e:
             logger.error(f"Text extraction failed: {str(e)}")
             raise HTTPException(status_code=400, detail=f"Failed to extract text from document: {str(e)}")
@@ -303,7 +289,7 @@ async def calculate_tea_scores(
         
         # Calculate TEA scores using Bedrock
         try:
-            tea_results = ai_analysis_service.calculate_tea_scores(text_content)
+            tea_results = await ai_analysis_service.calculate_tea_scores_cached(text_content)
         except Exception as e:
             logger.error(f"TEA scores calculation failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"TEA scores calculation failed: {str(e)}")
@@ -335,7 +321,10 @@ async def calculate_tea_scores(
                     "filename": file.filename,
                     "file_size": len(file_content),
                     "text_length": len(text_content),
-                    "analysis_method": "aws_bedrock_claude"
+                    "analysis_method": "aws_bedrock_claude",
+                    "chunked": tea_results.get("chunked", False),
+                    "chunk_metrics": tea_results.get("chunk_metrics", []),
+                    "token_usage": tea_results.get("usage", {})
                 },
                 "form_data": {
                     "transparency_score": scores.get('transparency_score', 0),
@@ -374,39 +363,18 @@ async def calculate_tea_scores_by_file_id(
         if not file_metadata:
             raise HTTPException(status_code=404, detail="File not found")
         
-        # Read file content from S3
-        file_content = None
         filename = file_metadata.filename or 'unknown'
-        
-        try:
-            from services.aws_service import aws_service
-            s3_result = await aws_service.get_file(file_metadata.s3_key)
-            file_content = s3_result['content']
-            
-            if not file_content:
-                raise HTTPException(status_code=404, detail="File content is empty")
-                
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"S3 retrieval failed for file_id {file_id}, s3_key {file_metadata.s3_key}: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Failed to retrieve file from S3: {str(e)}")
-
         logger.info(f"Calculating TEA scores for uploaded file: {filename} (file_id: {file_id})")
         
-        # Extract text from file
-        try:
-            text_content = ai_analysis_service.extract_text_from_file(file_content, filename)
-        except Exception as e:
-            logger.error(f"Text extraction failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Failed to extract text from document: {str(e)}")
+        # Extract text from file (reuses text stored on the file metadata)
+        text_content = await ai_analysis_service.get_stored_file_text(file_metadata)
         
         if not text_content.strip():
             raise HTTPException(status_code=400, detail="No readable text found in the document")
         
         # Calculate TEA scores using Bedrock
         try:
-            tea_results = ai_analysis_service.calculate_tea_scores(text_content)
+            tea_results = await ai_analysis_service.calculate_tea_scores_cached(text_content)
         except Exception as e:
             logger.error(f"TEA scores calculation failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"TEA scores calculation failed: {str(e)}")
@@ -439,7 +407,10 @@ async def calculate_tea_scores_by_file_id(
                     "file_id": file_id,
                     "text_length": len(text_content),
                     "storage_type": "s3",
-                    "analysis_method": "aws_bedrock_claude"
+                    "analysis_method": "aws_bedrock_claude",
+                    "chunked": tea_results.get("chunked", False),
+                    "chunk_metrics": tea_results.get("chunk_metrics", []),
+                    "token_usage": tea_results.get("usage", {})
                 },
                 "form_data": {
                     "transparency_score": scores.get('transparency_score', 0),
@@ -455,6 +426,78 @@ async def calculate_tea_scores_by_file_id(
         logger.error(f"Unexpected error calculating TEA scores for file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+def _is_admin(user: Dict[str, Any]) -> bool:
+    return user.get("role") in ["admin", "super_admin"]
+
+async def _check_job_targets(file_id: str, policy_id: Optional[str], current_user: Dict[str, Any]):
+    """The caller must own the file and the policy the result is stored on (admins may use any)"""
+    from models.file_metadata_dynamodb import FileMetadata
+    from models.policy_dynamodb import Policy
+    
+    file_metadata = await FileMetadata.find_by_id(file_id)
+    if not file_metadata:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not _is_admin(current_user) and file_metadata.user_id != current_user["user_id"]:
+        raise HTTPException(status_code=403, detail="Not allowed to analyze this file")
+    
+    if policy_id:
+        policy = await Policy.find_by_id(policy_id)
+        if not policy:
+            raise HTTPException(status_code=404, detail="Policy not found")
+        if not _is_admin(current_user) and policy.user_id != current_user["user_id"]:
+            raise HTTPException(status_code=403, detail="Not allowed to update this policy")
+
+@router.post("/jobs", status_code=202)
+async def submit_analysis_job(
+    file_id: str = Form(...),
+    job_type: str = Form(JOB_TYPE_TEA_SCORES),
+    policy_id: Optional[str] = Form(None),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Queue TEA scoring or document analysis for an uploaded file.
+    Returns a job id immediately; poll /jobs/{job_id} for the result.
+    """
+    try:
+        if not file_id or len(file_id.strip()) == 0:
+            raise HTTPException(
+                status_code=400, 
+                detail="Invalid file ID format. Please upload the file first."
+            )
+        
+        await _check_job_targets(file_id.strip(), policy_id, current_user)
+        job = await analysis_job_service.submit(job_type, file_id.strip(), policy_id=policy_id,
+                                                submitted_by=current_user["user_id"])
+        
+        return {
+            "success": True,
+            "message": "Analysis job queued",
+            "job_id": job['job_id'],
+            "status": job['status'],
+            "status_url": f"/api/ai-analysis/jobs/{job['job_id']}"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing analysis job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str, current_user: Dict[str, Any] = Depends(get_current_user)):
+    """
+    Get the status of a queued analysis job, including its result once completed.
+    Only the user who submitted the job (or an admin) can read it.
+    """
+    job = await analysis_job_service.get_job(job_id)
+    if not job or (not _is_admin(current_user) and job.get('submitted_by') != current_user["user_id"]):
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    
+    return {
+        "success": True,
+        "data": job
+    }
+
 @router.get("/status")
 async def get_ai_analysis_status():
     """
@@ -473,6 +516,9 @@ async def get_ai_analysis_status():
                 "supported_formats": [".pdf", ".doc", ".docx", ".txt"],
                 "max_file_size_mb": MAX_FILE_SIZE // (1024 * 1024),
                 "ai_model": "llama3-70b-8192",
+                "analysis_cache": analysis_cache.get_stats(),
+                "analysis_jobs": analysis_job_service.get_stats(),
+                "bedrock_models": bedrock_service.model_router.get_stats(),
                 "message": "AI analysis service is ready" if is_configured else "Please configure GROQ_API_KEY to enable AI analysis"
             }
         )
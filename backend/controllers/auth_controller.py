@@ -2,7 +2,7 @@
 Authentication Controller
 Handles HTTP requests for authentication operations
 """
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from fastapi.responses import JSONResponse
 
 from services.auth_service_dynamodb import auth_service
@@ -15,21 +15,35 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
+def _client_ip(request: Request) -> str:
+    """
+    Client address for login throttling. X-Forwarded-For is client-controlled, so it is not read
+    here: uvicorn's --proxy-headers sets request.client from it only for the proxies listed in
+    --forwarded-allow-ips (settings.FORWARDED_ALLOW_IPS). A proxy address that still gets here
+    is not IP-throttled.
+    """
+    return request.client.host if request.client else "unknown"
+
+
 @router.post("/register")
 async def register_user(user_data: UserRegistration):
     """Register a new user"""
     try:
         return await auth_service.register_user(user_data)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Registration error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/login")
-async def login_user(login_data: UserLogin):
+async def login_user(login_data: UserLogin, request: Request):
     """Authenticate user login"""
     try:
-        return await auth_service.login_user(login_data)
+        return await auth_service.login_user(login_data, client_ip=_client_ip(request))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         raise HTTPException(status_code=401, detail=str(e))
@@ -88,16 +102,20 @@ async def reset_password(reset_data: PasswordReset):
     """Reset user password with OTP"""
     try:
         return await auth_service.reset_password(reset_data)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Password reset error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/admin-login")
-async def admin_login(login_data: AdminLogin):
+async def admin_login(login_data: AdminLogin, request: Request):
     """Admin login with special admin privileges"""
     try:
-        return await auth_service.admin_login(login_data)
+        return await auth_service.admin_login(login_data, client_ip=_client_ip(request))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Admin login error: {str(e)}")
         raise HTTPException(status_code=401, detail=str(e))
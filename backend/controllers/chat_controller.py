@@ -2,8 +2,8 @@
 Chat Controller
 Handles HTTP requests for chatbot and conversation operations
 """
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
 from datetime import datetime
 
 from models.chat import ChatRequest, ChatResponse, ChatMessage
@@ -24,6 +24,9 @@ async def chat(
     """Chat with the AI assistant for policy queries (works for both authenticated and public access)"""
     try:
         logger.info(f"💬 Chat request: {request.message[:50]}...")
+        # Conversations are listed per owner: record them under the signed-in user, and never
+        # under a user_id an anonymous caller put in the body
+        request.user_id = current_user.get('user_id') if current_user else None
         response = await enhanced_chatbot_service.chat(request)
         logger.info(f"✅ Chat response generated: {len(response.response)} chars")
         return response
@@ -38,6 +41,7 @@ async def public_chat(request: ChatRequest):
     """Public chat endpoint that doesn't require authentication"""
     try:
         logger.info(f"🌐 Public chat request: {request.message[:50]}...")
+        request.user_id = None  # Unauthenticated: file the conversation as anonymous
         response = await enhanced_chatbot_service.chat(request)
         logger.info(f"✅ Public chat response generated: {len(response.response)} chars")
         return response
@@ -84,13 +88,17 @@ async def delete_conversation(
 
 @router.get("/conversations")
 async def get_conversations(
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: dict = Depends(get_optional_user)
 ):
     """Get conversations list endpoint (works for both authenticated and public access)"""
     try:
-        conversations = await enhanced_chatbot_service.get_user_conversations(limit)
-        return {"conversations": convert_objectid(conversations)}
+        user_id = current_user.get('user_id') if current_user else None
+        page = await enhanced_chatbot_service.get_user_conversations(limit, user_id=user_id, cursor=cursor)
+        return {"conversations": convert_objectid(page['conversations']), "next_cursor": page['next_cursor']}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Get conversations error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error getting conversations: {str(e)}")
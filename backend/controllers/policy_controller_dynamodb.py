@@ -5,13 +5,17 @@ import logging
 import os
 import uuid
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Request
 from pydantic import BaseModel, Field
 from middleware.auth import get_current_user, get_admin_user
 from services.policy_service_dynamodb import policy_service
 from services.aws_service import aws_service
+from services.map_aggregate_service import map_aggregates
+from services.analysis_job_service import analysis_job_service, JOB_TYPE_DOCUMENT_ANALYSIS
 from models.file_metadata_dynamodb import FileMetadata
 from models.policy import EnhancedSubmission
+from utils.http_cache import conditional_json
+from utils.json_response import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -255,11 +259,11 @@ async def get_all_policies():
             submission["totalScore"] = avg_score
             submission["completeness_score"] = calculate_completeness_score({"score": avg_score})
 
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": policies,
             "count": len(policies)
-        }
+        })
     except Exception as e:
         logger.error(f"Error getting all policies: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get all policies: {str(e)}")
@@ -270,48 +274,7 @@ async def get_map_visualization():
     try:
         logger.info("Getting map visualization data")
         
-        # Get all approved policies
-        policies = await policy_service.get_approved_policies_for_map()
-        
-        # Group by country and count
-        country_counts = {}
-        for policy in policies:
-            country = policy.get('country', 'Unknown')
-            if country not in country_counts:
-                country_counts[country] = {
-                    'country': country,
-                    'policy_count': 0,
-                    'policies': []
-                }
-            country_counts[country]['policy_count'] += 1
-            country_counts[country]['policies'].append({
-                'policy_name': policy.get('policy_name', ''),
-                'policy_area': policy.get('policy_area', ''),
-                'approved_at': policy.get('approved_at', '')
-            })
-        
-        # Add color coding based on policy counts
-        for country_data in country_counts.values():
-            count = country_data['policy_count']
-            if 1 <= count <= 3:
-                country_data['color'] = 'green'
-                country_data['level'] = 'low'
-            elif 4 <= count <= 7:
-                country_data['color'] = 'yellow'
-                country_data['level'] = 'medium'
-            elif 8 <= count <= 10:
-                country_data['color'] = 'red'
-                country_data['level'] = 'high'
-            else:
-                country_data['color'] = 'blue'  # For counts > 10
-                country_data['level'] = 'very_high'
-        
-        return {
-            "success": True,
-            "countries": list(country_counts.values()),
-            "total_countries": len(country_counts),
-            "total_policies": len(policies)
-        }
+        return await map_aggregates.get_policy_count_view()
         
     except Exception as e:
         logger.error(f"Error getting approved policies for map: {str(e)}")
@@ -321,6 +284,23 @@ async def get_map_visualization():
         )
 
 
+@router.get("/map-aggregate")
+async def get_map_aggregate(request: Request):
+    """
+    Compact per-country map payload (counts per area, area points, color level, top policies).
+    Send the ETag back as If-None-Match to get 304 when nothing changed.
+    """
+    try:
+        payload, etag = await map_aggregates.get_payload()
+        return conditional_json(request, payload, etag)
+    except Exception as e:
+        logger.error(f"Error getting map aggregate: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get map aggregate"
+        )
+
+
 @router.get("/statistics")
 async def get_policy_statistics():
     """Get policy statistics"""
@@ -348,9 +328,13 @@ async def upload_policy_file(
     policy_area: str = Form(...),
     country: str = Form(...),
     description: Optional[str] = Form(None),
+    async_analysis: bool = Form(False),
     current_user: dict = Depends(get_current_user)
 ):
-    """Upload policy file to AWS S3 and perform AI analysis"""
+    """
+    Upload policy file to AWS S3 and perform AI analysis.
+    With async_analysis the analysis is queued as a background job and the job id is returned.
+    """
     try:
         # Validate file type
         allowed_types = [
@@ -387,11 +371,13 @@ async def upload_policy_file(
         result = await aws_service.upload_file(file, metadata)
         logger.info(f"Policy file uploaded to S3 by {current_user.get('email')}: {file.filename}")
         
+        is_text_document = file.content_type in ['application/pdf', 'application/msword', 
+                                                 'application/vnd.openxmlformats-officedocument.wordprocessingml.document', 
+                                                 'text/plain']
+        
         # Perform AI analysis if it's a text-based document
         ai_analysis_data = None
-        if file.content_type in ['application/pdf', 'application/msword', 
-                                'application/vnd.openxmlformats-officedocument.wordprocessingml.document', 
-                                'text/plain']:
+        if is_text_document and not async_analysis:
             try:
                 # Get file content for analysis
                 file_content = await file.read()
@@ -399,10 +385,10 @@ async def upload_policy_file(
                 
                 # Import AI service and analyze
                 from services.ai_analysis_service import ai_analysis_service
-                text_content = ai_analysis_service.extract_text_from_file(file_content, file.filename)
+                text_content = await ai_analysis_service.extract_text_cached(file_content, file.filename)
                 
                 if text_content.strip():
-                    ai_analysis_data = ai_analysis_service.analyze_policy_document(text_content)
+                    ai_analysis_data = await ai_analysis_service.analyze_policy_document_cached(text_content)
                     logger.info(f"AI analysis completed for file: {file.filename}")
                 
             except Exception as ai_error:
@@ -437,6 +423,14 @@ async def upload_policy_file(
         if ai_analysis_data:
             response_data["ai_analysis"] = ai_analysis_data
             response_data["message"] = "File uploaded and analyzed successfully"
+        elif is_text_document and async_analysis:
+            job = await analysis_job_service.submit(
+                JOB_TYPE_DOCUMENT_ANALYSIS,
+                file_metadata.file_id,
+                submitted_by=current_user.get('email')
+            )
+            response_data["analysis_job_id"] = job['job_id']
+            response_data["message"] = "File uploaded successfully, analysis queued"
         
         return response_data
         
@@ -463,6 +457,7 @@ async def submit_policy_with_file(
             policy_area=policy_area,
             country=country,
             description=description,
+            async_analysis=False,
             current_user=current_user
         )
         
@@ -7,6 +7,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 import logging
 from config.dynamodb import get_dynamodb
+from utils.json_response import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,17 @@ _map_policy_cache = None
 _last_cache_update = None
 _cache_duration = 300  # 5 minutes
 
+# Attributes the public policy endpoints render; the rest of each item is never read
+PUBLIC_POLICY_FIELDS = (
+    'policy_id', 'country', 'status', 'submission_type', 'policy_areas', 'total_policies',
+    'score', 'completeness_score', 'created_at', 'updated_at'
+)
+MAP_POLICY_FIELDS = (
+    'map_policy_id', 'parent_submission_id', 'policy_name', 'policy_description', 'country', 'policy_area',
+    'status', 'visible_on_map', 'target_groups', 'policy_link', 'implementation', 'evaluation',
+    'participation', 'alignment', 'approved_at', 'created_at', 'user_email'
+)
+
 async def get_cached_policies():
     """Get cached policies or refresh if needed"""
     global _policy_cache, _last_cache_update
@@ -33,7 +45,7 @@ async def get_cached_policies():
         
         logger.info("🔄 Refreshing policy cache...")
         dynamodb = await get_dynamodb()
-        _policy_cache = await dynamodb.scan_table('policies')
+        _policy_cache = await dynamodb.scan_table('policies', fields=PUBLIC_POLICY_FIELDS)
         _last_cache_update = current_time
         logger.info(f"✅ Policy cache refreshed: {len(_policy_cache)} policies")
     
@@ -51,7 +63,7 @@ async def get_cached_map_policies():
         
         logger.info("🔄 Refreshing map policy cache...")
         dynamodb = await get_dynamodb()
-        _map_policy_cache = await dynamodb.scan_table('map_policies')
+        _map_policy_cache = await dynamodb.scan_table('map_policies', fields=MAP_POLICY_FIELDS)
         logger.info(f"✅ Map policy cache refreshed: {len(_map_policy_cache)} policies")
     
     return _map_policy_cache
@@ -63,7 +75,7 @@ async def get_statistics():
         dynamodb = await get_dynamodb()
         
         # Get user count
-        users = await dynamodb.scan_table('users')
+        users = await dynamodb.scan_table('users', fields=('user_id',))
         user_count = len(users)
         
         # Get policy count using cache
@@ -121,11 +133,11 @@ async def get_master_policies(
         # Limit results
         policies = policies[:limit]
         
-        return {
+        return FastJSONResponse({
             "status": "success",
             "data": policies,
             "total": len(policies)
-        }
+        })
     except Exception as e:
         logger.error(f"Error getting master policies: {e}")
         raise HTTPException(status_code=500, detail="Failed to get master policies")
@@ -209,12 +221,12 @@ async def get_master_policies_fast(
         # Apply limit
         filtered_policies = filtered_policies[:limit]
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "policies": filtered_policies,
             "total_count": len(filtered_policies),
             "filters": {"country": country}
-        }
+        })
     except Exception as e:
         logger.error(f"Error getting fast master policies: {e}")
         raise HTTPException(status_code=500, detail="Failed to get master policies")
@@ -306,7 +318,7 @@ async def get_master_policies_no_dedup(
         
         logger.info(f"✅ Found {len(filtered_policies)} policies for popup display")
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "policies": filtered_policies,
             "total_count": len(filtered_policies),
@@ -314,7 +326,7 @@ async def get_master_policies_no_dedup(
             "area_filter": area,
             "data_source": "map_policies (approved only)",
             "cache_bust": _t
-        }
+        })
         
     except Exception as e:
         logger.error(f"❌ Error getting policies for popup: {str(e)}")
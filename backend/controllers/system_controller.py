@@ -7,6 +7,10 @@ from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from middleware.auth import get_current_user, get_admin_user
 from services.policy_service_dynamodb import policy_service
+from services.email_outbox_service import email_outbox
+from services.data_version_service import data_versions
+from middleware.response_cache import response_cache_stats
+from services.conversation_summary_service import conversation_summaries
 import os
 
 logger = logging.getLogger(__name__)
@@ -26,6 +30,21 @@ async def health_check():
         logger.error(f"Health check failed: {str(e)}")
         raise HTTPException(status_code=500, detail="System unhealthy")
 
+@router.get("/email/metrics")
+async def email_metrics(admin_user: dict = Depends(get_admin_user)):
+    """Email outbox delivery metrics"""
+    return {"success": True, "email_outbox": email_outbox.get_stats()}
+
+@router.get("/response-cache/metrics")
+async def response_cache_metrics(admin_user: dict = Depends(get_admin_user)):
+    """Public response cache hit rates and data versions"""
+    return {"success": True, "response_cache": response_cache_stats, "data_versions": data_versions.get_all()}
+
+@router.get("/conversation-summaries/metrics")
+async def conversation_summary_metrics(admin_user: dict = Depends(get_admin_user)):
+    """Chat prompt tokens sent with rolling summaries versus the raw conversation history"""
+    return {"success": True, "conversation_summaries": conversation_summaries.get_stats()}
+
 @router.get("/debug/routes")
 async def debug_routes():
     """Debug endpoint to show available routes"""
@@ -11,12 +11,18 @@ from contextlib import asynccontextmanager
 
 # Import configuration and setup
 from config.settings import settings
-from config.dynamodb import get_dynamodb, init_dynamodb
+from config.dynamodb import init_dynamodb
 from middleware.cors import add_cors_middleware
+from middleware.response_cache import add_response_cache_middleware
 from routes.main import setup_routes
+from utils.json_response import FastJSONResponse
+from utils.lazy_imports import warm_lazy_imports
 
 # Import AWS service for initialization
 from services.aws_service import aws_service
+from services.analysis_job_service import analysis_job_service
+from services.email_outbox_service import email_outbox
+from services.warmup_service import warmup_service
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,49 +44,59 @@ async def initialize_super_admin():
     except Exception as e:
         logger.error(f"Error initializing super admin: {e}")
 
+async def connect_dynamodb():
+    """Connect to DynamoDB, creating missing tables"""
+    if not await init_dynamodb():
+        raise RuntimeError("DynamoDB not available - running with limited functionality")
+
+async def warm_chatbot_cache():
+    """Load the chatbot's policy cache so the first question doesn't scan the policies table"""
+    from services.chatbot_service_enhanced import enhanced_chatbot_service
+    await enhanced_chatbot_service._update_cache()
+
+async def load_intent_classifier():
+    """Load the chat intent classifier (keyword routing is used until it is ready)"""
+    from services.chatbot_service_enhanced import enhanced_chatbot_service
+    await enhanced_chatbot_service.load_intent_classifier()
+
+async def start_background_workers():
+    """Start background analysis workers and the email sender"""
+    await analysis_job_service.start()
+    await email_outbox.start()
+
+def register_warmup_steps():
+    """Startup tasks, run in the background by the warmup service once the app is serving"""
+    warmup_service.add("dynamodb", connect_dynamodb, timeout=settings.WARMUP_DYNAMODB_TIMEOUT_SECONDS)
+    warmup_service.add("s3", aws_service.initialize, required=False)
+    warmup_service.add("super_admin", initialize_super_admin, required=False, depends_on=("dynamodb",))
+    warmup_service.add("chatbot_cache", warm_chatbot_cache, required=False, depends_on=("dynamodb",))
+    warmup_service.add("intent_classifier", load_intent_classifier, required=False)
+    warmup_service.add("background_workers", start_background_workers, depends_on=("dynamodb",))
+    
+    # Load the deferred heavy imports (RAG, document parsing, imaging) once we are serving
+    if settings.LAZY_IMPORT_WARMUP:
+        warmup_service.add(
+            "deferred_imports",
+            lambda: warm_lazy_imports(settings.LAZY_IMPORT_WARMUP_DELAY_SECONDS),
+            timeout=None, required=False
+        )
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager - replaces deprecated on_event"""
-    # Startup
+    # Startup: serve immediately, warm dependencies in the background (see /readyz)
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    
-    try:
-        # Initialize DynamoDB connection
-        dynamodb_connected = await init_dynamodb()
-        if dynamodb_connected:
-            logger.info("DynamoDB connection established successfully")
-            
-            # Initialize AWS S3 service
-            await aws_service.initialize()
-            
-            # Initialize super admin
-            await initialize_super_admin()
-            
-            # Initialize chatbot cache for better performance
-            try:
-                from services.chatbot_service_enhanced import enhanced_chatbot_service
-                logger.info("🤖 Initializing chatbot cache...")
-                await enhanced_chatbot_service._update_cache()
-                logger.info("✅ Chatbot cache initialized successfully")
-            except Exception as cache_error:
-                logger.warning(f"⚠️ Chatbot cache initialization failed: {cache_error}")
-            
-            # Chatbot service is initialized automatically when imported by controllers
-            logger.info("Chatbot service available via controllers")
-            
-            logger.info("Application startup completed successfully")
-        else:
-            logger.warning("DynamoDB not available - running with limited functionality")
-            
-    except Exception as e:
-        logger.error(f"Startup error: {str(e)}")
-        # Don't raise - let the app continue for development
+    register_warmup_steps()
+    warmup_service.start()
     
     yield
     
     # Shutdown
     try:
-        # Close AWS service connections
+        # Stop warmup, analysis workers and close AWS service connections
+        await warmup_service.stop()
+        await analysis_job_service.stop()
+        await email_outbox.stop()
         await aws_service.close()
         logger.info("Application shutdown completed")
     except Exception as e:
@@ -94,9 +110,13 @@ def create_app() -> FastAPI:
         title=settings.APP_NAME,
         version=settings.APP_VERSION,
         description=settings.APP_DESCRIPTION,
-        lifespan=lifespan
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse
     )
     
+    # Add response cache middleware (inside CORS so cached responses still get CORS headers)
+    add_response_cache_middleware(app)
+    
     # Add CORS middleware
     add_cors_middleware(app)
     
@@ -118,34 +138,32 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    try:
-        # Check DynamoDB connection
-        dynamodb_client = await get_dynamodb()
-        if dynamodb_client and dynamodb_client.tables['users']:
-            return {
-                "status": "healthy",
-                "database": "DynamoDB connected",
-                "version": settings.APP_VERSION
-            }
-        else:
-            return JSONResponse(
-                status_code=503,
-                content={
-                    "status": "unhealthy",
-                    "database": "DynamoDB disconnected",
-                    "version": settings.APP_VERSION
-                }
-            )
-    except Exception as e:
-        return JSONResponse(
-            status_code=503,
-            content={
-                "status": "unhealthy",
-                "database": "DynamoDB error",
-                "error": str(e)
-            }
-        )
+    """Health check endpoint (cached DynamoDB state; never connects)"""
+    if warmup_service.is_ready("dynamodb"):
+        return {
+            "status": "healthy",
+            "database": "DynamoDB connected",
+            "version": settings.APP_VERSION
+        }
+    return JSONResponse(
+        status_code=503,
+        content={
+            "status": "unhealthy",
+            "database": "DynamoDB disconnected",
+            "version": settings.APP_VERSION
+        }
+    )
+
+@app.get("/livez")
+async def liveness():
+    """Liveness probe: the process is up and serving"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness():
+    """Readiness probe: warm state of each dependency, from the warmup service's cached status"""
+    status = warmup_service.status()
+    return JSONResponse(status_code=200 if status["status"] == "ready" else 503, content=status)
 
 if __name__ == "__main__":
     import os
@@ -155,5 +173,8 @@ if __name__ == "__main__":
         "main:app",
         host=host,
         port=port,
+        # request.client is the X-Forwarded-For client only behind FORWARDED_ALLOW_IPS proxies
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
         reload=True if settings.ENVIRONMENT == "development" else False
     )
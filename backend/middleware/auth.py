@@ -7,12 +7,31 @@ from typing import Optional
 import jwt
 from config.settings import settings
 from models.user_dynamodb import User
+from services.principal_cache_service import principal_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer(auto_error=False)  # auto_error=False makes it optional
 
+async def _load_principal(user_id: str, email: str) -> Optional[dict]:
+    """
+    Load the user for a token from DynamoDB, without the password hash. None only when the user
+    does not exist: lookup errors raise, so the principal cache never caches them as missing.
+    """
+    user = await User.find_by_id(user_id, raise_errors=True)
+    if user is None:
+        # Fallback to email lookup
+        user = await User.find_by_email(email, raise_errors=True)
+    
+    if user is None:
+        return None
+    
+    # Convert user to dict for response
+    user_dict = user.to_dict()
+    user_dict.pop('password_hash', None)  # Remove password from response
+    return user_dict
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Get current authenticated user from DynamoDB"""
     try:
@@ -26,21 +45,25 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         if user_id is None or email is None:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        # Find user in DynamoDB
-        user = await User.find_by_id(user_id)
-        if user is None:
-            # Fallback to email lookup
-            user = await User.find_by_email(email)
-            
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
+        # Resolve the user through the principal cache (older tokens without iat key on exp)
+        issued_at = payload.get("iat") or payload.get("exp")
+        try:
+            user_dict = await principal_cache.get_principal(
+                user_id, str(issued_at), lambda: _load_principal(user_id, email)
+            )
+        except Exception as e:
+            # The token may well be valid: ask the client to retry rather than sign out
+            logger.error(f"User lookup failed during authentication: {str(e)}")
+            raise HTTPException(status_code=503, detail="Authentication temporarily unavailable",
+                                headers={"Retry-After": "1"})
         
-        # Convert user to dict for response
-        user_dict = user.to_dict()
-        user_dict.pop('password_hash', None)  # Remove password from response
+        if user_dict is None:
+            raise HTTPException(status_code=401, detail="User not found")
         
         return user_dict
         
+    except HTTPException:
+        raise
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
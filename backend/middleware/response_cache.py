@@ -0,0 +1,212 @@
+"""
+Response Cache Middleware
+Caches serialized JSON bodies of public GET endpoints in process, validates them with ETags
+and answers If-None-Match with 304 without calling the endpoint
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from services.data_version_service import data_versions
+from utils.http_cache import etag_matches
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CacheRule:
+    """How long a route's responses are fresh and which data domains invalidate them"""
+    path: str
+    domains: Tuple[str, ...] = ()
+    max_age: int = 60
+    stale_while_revalidate: int = 300
+    prefix: bool = False
+
+    @property
+    def cache_control(self) -> str:
+        return f"public, max-age={self.max_age}, stale-while-revalidate={self.stale_while_revalidate}"
+
+
+# Visits are written on every page view, so the summary is refreshed by age rather than by version
+CACHE_RULES = [
+    CacheRule("/api/public/master-policies", domains=("policies",), max_age=60),
+    CacheRule("/api/public/master-policies-fast", domains=("map",), max_age=60),
+    CacheRule("/api/public/master-policies-no-dedup", domains=("map",), max_age=60),
+    CacheRule("/api/public/countries", max_age=3600, stale_while_revalidate=86400),
+    CacheRule("/api/countries", max_age=3600, stale_while_revalidate=86400),
+    CacheRule("/api/policy-areas", max_age=86400, stale_while_revalidate=86400),
+    CacheRule("/api/policy/policy-areas", max_age=86400, stale_while_revalidate=86400),
+    CacheRule("/api/policy/map-visualization", domains=("map",), max_age=30),
+    CacheRule("/api/visits/summary", max_age=60, stale_while_revalidate=600),
+]
+
+
+@dataclass
+class _Entry:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    etag: str
+    versions: Tuple[int, ...]
+    stored_at: float
+
+
+async def _empty_receive() -> Dict[str, Any]:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware for the routes in CACHE_RULES.
+
+    An entry is served while it is younger than max_age and the data versions of its
+    domains are unchanged; between max_age and max_age + stale_while_revalidate it is
+    served once more while a background request refreshes it. ETags are a hash of the
+    body, so a refresh that produces the same data still answers 304. Concurrent misses
+    for the same URL share one call to the endpoint.
+    """
+
+    def __init__(self, app, rules: List[CacheRule] = None, max_entries: int = None, max_body_bytes: int = None):
+        self.app = app
+        rules = CACHE_RULES if rules is None else rules
+        self._exact = {rule.path: rule for rule in rules if not rule.prefix}
+        self._prefixes = [rule for rule in rules if rule.prefix]
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_MAX_ENTRIES
+        self.max_body_bytes = max_body_bytes or settings.RESPONSE_CACHE_MAX_BODY_BYTES
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _match(self, path: str) -> Optional[CacheRule]:
+        rule = self._exact.get(path.rstrip("/") or "/")
+        if rule is not None:
+            return rule
+        for rule in self._prefixes:
+            if path.startswith(rule.path):
+                return rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        rule = self._match(scope["path"])
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        key = f"{scope['path']}?{scope.get('query_string', b'').decode('latin-1')}"
+        versions = data_versions.snapshot(rule.domains)
+        entry = self._entries.get(key)
+        state = "MISS"
+
+        if entry is not None and entry.versions == versions:
+            age = time.monotonic() - entry.stored_at
+            if age < rule.max_age:
+                state = "HIT"
+            elif age < rule.max_age + rule.stale_while_revalidate:
+                state = "STALE"
+                self._refresh(key, scope, rule, versions)
+            else:
+                entry = None
+        else:
+            entry = None
+
+        if entry is None:
+            entry = await asyncio.shield(self._refresh(key, scope, rule, versions))
+
+        if state == "MISS":
+            response_cache_stats["misses"] += 1
+        else:
+            self._entries.move_to_end(key)
+            response_cache_stats["hits" if state == "HIT" else "stale_hits"] += 1
+
+        await self._respond(scope, send, entry, rule, state)
+
+    def _refresh(self, key: str, scope, rule: CacheRule, versions: Tuple[int, ...]) -> asyncio.Task:
+        """Start (or join) a call to the endpoint for key"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, scope, rule, versions))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fetch_done(key, done))
+        return task
+
+    def _fetch_done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Background refreshes have no caller to raise to
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Response cache refresh failed for {key}: {task.exception()}")
+
+    async def _fetch(self, key: str, scope, rule: CacheRule, versions: Tuple[int, ...]) -> _Entry:
+        # Run the endpoint as an unconditional request and buffer what it sends
+        headers = [(name, value) for name, value in scope["headers"] if name not in (b"if-none-match", b"if-modified-since")]
+        upstream_scope = {**scope, "method": "GET", "headers": headers}
+        status = 500
+        response_headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(upstream_scope, _empty_receive, capture)
+        body = b"".join(chunks)
+        entry = _Entry(
+            status=status,
+            headers=[(name, value) for name, value in response_headers
+                     if name.lower() not in (b"content-length", b"etag", b"cache-control")],
+            body=body,
+            etag=f'"{hashlib.sha1(body).hexdigest()[:20]}"',
+            versions=versions,
+            stored_at=time.monotonic()
+        )
+
+        if status == 200 and len(body) <= self.max_body_bytes:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                response_cache_stats["evictions"] += 1
+        else:
+            self._entries.pop(key, None)
+        response_cache_stats["entries"] = len(self._entries)
+        return entry
+
+    async def _respond(self, scope, send, entry: _Entry, rule: CacheRule, state: str):
+        if entry.status != 200:
+            headers = entry.headers + [(b"content-length", str(len(entry.body)).encode())]
+            await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        validators = [
+            (b"etag", entry.etag.encode()),
+            (b"cache-control", rule.cache_control.encode()),
+            (b"x-cache", state.encode())
+        ]
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        if if_none_match and etag_matches(if_none_match.decode("latin-1"), entry.etag):
+            response_cache_stats["not_modified"] += 1
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers = entry.headers + validators + [(b"content-length", str(len(entry.body)).encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else entry.body})
+
+
+response_cache_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "not_modified": 0, "evictions": 0, "entries": 0}
+
+
+def add_response_cache_middleware(app):
+    """Add the response cache to FastAPI app"""
+    if settings.RESPONSE_CACHE_ENABLED:
+        app.add_middleware(ResponseCacheMiddleware)
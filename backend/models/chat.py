@@ -21,12 +21,14 @@ class ChatResponse(BaseModel):
     timestamp: Optional[datetime] = None
     sources: List[Dict[str, Any]] = Field(default_factory=list)
     suggested_questions: List[str] = Field(default_factory=list)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
 
 class ChatConversation(BaseModel):
     conversation_id: str
     messages: List[ChatMessage]
     created_at: datetime
     updated_at: datetime
+    user_id: Optional[str] = None
 
 class ConversationResponse(BaseModel):
     id: str
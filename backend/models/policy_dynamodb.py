@@ -153,20 +153,17 @@ class Policy:
     async def search_policies(query: str, user_id: Optional[str] = None) -> List['Policy']:
         """Search policies by title or content"""
         try:
-            dynamodb = await get_dynamodb()
-            
-            # Build filter expression
-            filter_expr = Attr('title').contains(query) | Attr('content').contains(query)
-            
-            if user_id:
-                filter_expr = filter_expr & Attr('user_id').eq(user_id)
+            from services.search_index_service import policy_search_index
             
-            policies_data = await dynamodb.scan_items(
-                'policies',
-                filter_expression=filter_expr
-            )
-            
-            return [Policy.from_dict(policy_data) for policy_data in policies_data]
+            dynamodb = await get_dynamodb()
+            _, hits = await policy_search_index.search(query, user_id=user_id, limit=100)
+            
+            policies = []
+            for hit in hits:
+                policy_data = await dynamodb.get_item('policies', {'policy_id': hit["id"]})
+                if policy_data:
+                    policies.append(Policy.from_dict(policy_data))
+            return policies
         except Exception as e:
             logger.error(f"Error searching policies: {str(e)}")
             return []
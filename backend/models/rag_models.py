@@ -14,6 +14,8 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 import json
 
+from config.schema import RAG_TABLES, ensure_schema
+
 @dataclass
 class ConversationEmbedding:
     """Model for storing conversation embeddings"""
@@ -81,75 +83,13 @@ class RAGDatabaseManager:
     async def ensure_rag_tables(self):
         """Ensure all RAG-related tables exist"""
         try:
-            # Conversation embeddings table
-            embedding_table_schema = {
-                'TableName': self.embedding_table,
-                'KeySchema': [
-                    {'AttributeName': 'conversation_id', 'KeyType': 'HASH'}
-                ],
-                'AttributeDefinitions': [
-                    {'AttributeName': 'conversation_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'user_id', 'AttributeType': 'S'},
-                    {'AttributeName': 'timestamp', 'AttributeType': 'S'}
-                ],
-                'GlobalSecondaryIndexes': [
-                    {
-                        'IndexName': 'user-timestamp-index',
-                        'KeySchema': [
-                            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
-                            {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
-                        ],
-                        'Projection': {'ProjectionType': 'ALL'},
-                        'BillingMode': 'PAY_PER_REQUEST'
-                    }
-                ],
-                'BillingMode': 'PAY_PER_REQUEST'
-            }
-            
-            # Create tables if they don't exist
-            await self._create_table_if_not_exists(embedding_table_schema)
-            
-            # Keyword index table for fast keyword search
-            keyword_table_schema = {
-                'TableName': self.keyword_index_table,
-                'KeySchema': [
-                    {'AttributeName': 'keyword', 'KeyType': 'HASH'},
-                    {'AttributeName': 'conversation_id', 'KeyType': 'RANGE'}
-                ],
-                'AttributeDefinitions': [
-                    {'AttributeName': 'keyword', 'AttributeType': 'S'},
-                    {'AttributeName': 'conversation_id', 'AttributeType': 'S'}
-                ],
-                'BillingMode': 'PAY_PER_REQUEST'
-            }
-            
-            await self._create_table_if_not_exists(keyword_table_schema)
-            
+            await ensure_schema(self.db.client, RAG_TABLES)
             print("✅ RAG database tables initialized successfully")
             
         except Exception as e:
             print(f"❌ Error creating RAG tables: {e}")
             raise
     
-    async def _create_table_if_not_exists(self, table_schema: Dict[str, Any]):
-        """Create table if it doesn't exist"""
-        try:
-            table_name = table_schema['TableName']
-            
-            # Check if table exists
-            # Check if tables already exist
-            existing_tables = self.db.client.list_tables()['TableNames']
-            
-            if table_name not in existing_tables:
-                # Create the table using client directly
-                self.db.client.create_table(**table_schema)
-                print(f"✅ Created table: {table_name}")
-            else:
-                print(f"ℹ️ Table already exists: {table_name}")
-                
-        except Exception as e:
-            print(f"❌ Error creating table {table_schema['TableName']}: {e}")
-    
     async def store_conversation_embedding(self, conversation: ConversationEmbedding) -> bool:
         """Store conversation with embedding"""
         try:
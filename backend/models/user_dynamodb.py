@@ -5,9 +5,8 @@ Replaces MongoDB user model with DynamoDB operations
 from typing import Optional, Dict, List
 import uuid
 from datetime import datetime
-import bcrypt
 from config.dynamodb import get_dynamodb
-from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.conditions import Key
 import logging
 
 logger = logging.getLogger(__name__)
@@ -73,15 +72,17 @@ class User:
         return cls(**data)
     
     @staticmethod
-    def hash_password(password: str) -> str:
-        """Hash a password"""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    async def hash_password(password: str) -> str:
+        """Hash a password on the bcrypt worker pool"""
+        from services.password_hash_service import password_hash_service
+        return await password_hash_service.hash_password(password)
     
-    def verify_password(self, password: str) -> bool:
-        """Verify password against hash"""
+    async def verify_password(self, password: str) -> bool:
+        """Verify password against hash on the bcrypt worker pool"""
         if not self.password_hash:
             return False
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        from services.password_hash_service import password_hash_service
+        return await password_hash_service.verify_password(password, self.password_hash)
     
     async def save(self) -> bool:
         """Save user to DynamoDB"""
@@ -123,34 +124,42 @@ class User:
             return False
     
     @staticmethod
-    async def find_by_id(user_id: str) -> Optional['User']:
-        """Find user by ID"""
+    async def find_by_id(user_id: str, raise_errors: bool = False) -> Optional['User']:
+        """Find user by ID. With raise_errors None means the user does not exist; lookup errors raise"""
         try:
             dynamodb = await get_dynamodb()
-            user_data = await dynamodb.get_item('users', {'user_id': user_id})
+            user_data = await dynamodb.get_item('users', {'user_id': user_id}, raise_errors=raise_errors)
             
             if user_data:
                 return User.from_dict(user_data)
             return None
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error finding user by ID: {str(e)}")
             return None
     
     @staticmethod
-    async def find_by_email(email: str) -> Optional['User']:
-        """Find user by email"""
+    async def find_by_email(email: str, raise_errors: bool = False) -> Optional['User']:
+        """Find user by email. With raise_errors None means the user does not exist; lookup errors raise"""
         try:
             dynamodb = await get_dynamodb()
-            users = await dynamodb.query_items(
-                'users',
-                Key('email').eq(email),
-                index_name='email-index'
-            )
+            if raise_errors:
+                page = await dynamodb.query_page('users', Key('email').eq(email), index_name='email-index')
+                users = page['items']
+            else:
+                users = await dynamodb.query_items(
+                    'users',
+                    Key('email').eq(email),
+                    index_name='email-index'
+                )
             
             if users:
                 return User.from_dict(users[0])
             return None
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error finding user by email: {str(e)}")
             return None
     
@@ -159,9 +168,10 @@ class User:
         """Find user by Google ID"""
         try:
             dynamodb = await get_dynamodb()
-            users = await dynamodb.scan_items(
+            users = await dynamodb.query_items(
                 'users',
-                filter_expression=Attr('google_id').eq(google_id)
+                Key('google_id').eq(google_id),
+                index_name='google-id-index'
             )
             
             if users:
@@ -196,7 +206,7 @@ class User:
             # Create new user
             user = User(
                 email=email,
-                password_hash=User.hash_password(password),
+                password_hash=await User.hash_password(password),
                 name=name,
                 firstName=firstName,
                 lastName=lastName,
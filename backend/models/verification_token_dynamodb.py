@@ -0,0 +1,108 @@
+"""
+DynamoDB Verification Token Model
+One-time codes (email verification, password reset) keyed by email and purpose,
+expired by DynamoDB TTL and consumed with a conditional delete so each code works once
+"""
+from typing import Optional, Dict
+import time
+from datetime import datetime
+from config.dynamodb import get_dynamodb
+from config.settings import settings
+from boto3.dynamodb.conditions import Attr
+from utils.helpers import generate_otp
+import logging
+
+logger = logging.getLogger(__name__)
+
+PURPOSE_EMAIL_VERIFICATION = 'email_verification'
+PURPOSE_PASSWORD_RESET = 'password_reset'
+
+# Results of VerificationToken.consume
+TOKEN_VALID = 'valid'
+TOKEN_INVALID = 'invalid'
+TOKEN_EXPIRED = 'expired'
+
+
+class VerificationToken:
+    """One-time code for an email address and purpose"""
+
+    @staticmethod
+    def _key(email: str, purpose: str) -> Dict:
+        return {'email': email.strip().lower(), 'purpose': purpose}
+
+    @staticmethod
+    async def issue(email: str, purpose: str, expiry_minutes: int = None) -> Optional[str]:
+        """Create a new code, replacing any earlier one for the same email and purpose"""
+        try:
+            dynamodb = await get_dynamodb()
+            code = generate_otp()
+            expires_at = int(time.time()) + (expiry_minutes or settings.OTP_EXPIRY_MINUTES) * 60
+
+            item = {
+                **VerificationToken._key(email, purpose),
+                'code': code,
+                'attempts': 0,
+                'expires_at': expires_at,
+                'created_at': datetime.utcnow().isoformat()
+            }
+
+            if await dynamodb.insert_item('auth_tokens', item):
+                return code
+            return None
+        except Exception as e:
+            logger.error(f"Error issuing {purpose} code: {str(e)}")
+            return None
+
+    @staticmethod
+    async def consume(email: str, purpose: str, code: str) -> str:
+        """
+        Use a code. The delete only succeeds when the code matches and has not expired,
+        so two concurrent requests cannot both redeem it. Wrong guesses are counted and
+        the code is dropped after OTP_MAX_ATTEMPTS.
+
+        Returns TOKEN_VALID, TOKEN_INVALID or TOKEN_EXPIRED
+        """
+        try:
+            dynamodb = await get_dynamodb()
+            key = VerificationToken._key(email, purpose)
+            now = int(time.time())
+
+            consumed = await dynamodb.delete_item(
+                'auth_tokens',
+                key,
+                condition_expression=Attr('code').eq(code) & Attr('expires_at').gt(now)
+            )
+            if consumed:
+                return TOKEN_VALID
+
+            # TTL deletion is lazy, so an expired item can still be present
+            token = await dynamodb.get_item('auth_tokens', key)
+            if not token:
+                return TOKEN_INVALID
+            if int(token.get('expires_at', 0)) <= now:
+                return TOKEN_EXPIRED
+
+            attempts = await dynamodb.increment_counter(
+                'auth_tokens', key, 'attempts',
+                condition_expression=Attr('email').exists()
+            )
+            if attempts is not None and attempts >= settings.OTP_MAX_ATTEMPTS:
+                await dynamodb.delete_item('auth_tokens', key)
+                logger.warning(f"{purpose} code for {key['email']} revoked after {attempts} failed attempts")
+            return TOKEN_INVALID
+        except Exception as e:
+            logger.error(f"Error consuming {purpose} code: {str(e)}")
+            return TOKEN_INVALID
+
+    @staticmethod
+    async def peek(email: str, purpose: str) -> Optional[str]:
+        """Return the current unexpired code without consuming it (development only)"""
+        try:
+            dynamodb = await get_dynamodb()
+            token = await dynamodb.get_item('auth_tokens', VerificationToken._key(email, purpose))
+            if token and int(token.get('expires_at', 0)) > time.time():
+                return token.get('code')
+            return None
+        except Exception as e:
+            logger.error(f"Error reading {purpose} code: {str(e)}")
+            return None
@@ -5,19 +5,40 @@ Business logic for admin operations using DynamoDB
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 import logging
+import time
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 
 from config.dynamodb import get_dynamodb
 from models.user_dynamodb import User
 from models.admin_dynamodb import AdminData, SystemConfig, UserStats, AuditLog
+from services.principal_cache_service import principal_cache
+from services.search_index_service import policy_search_index
+from services.policy_quality_service import policy_quality
 from config.settings import settings
+from utils.pagination import encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 
+STATUS_INDEX = 'status-created-index'
+
+# Submission statuses listed under "all"; any other status seen in the counts aggregate is added
+SUBMISSION_STATUSES = ['pending_review', 'pending', 'under_review', 'needs_revision',
+                       'approved', 'rejected', 'draft', 'published', 'master']
+
+CURSOR_DONE = 'done'
+SKIP_CHUNK_SIZE = 100
+APPROVED_SCAN_BATCH = 25
+SUBMISSION_COUNTS_ID = 'aggregate#submission_counts'
+
 class AdminService:
     """Admin service for administrative operations with DynamoDB"""
     
     def __init__(self):
         self.dynamodb = None
+        self._submission_counts: Optional[Dict[str, Any]] = None
+        self._submission_counts_loaded_at = 0.0
 
     async def _ensure_connection(self):
         """Ensure DynamoDB connection is available"""
@@ -140,6 +161,8 @@ class AdminService:
             success = await user.update({"is_active": is_active})
             
             if success:
+                principal_cache.invalidate_user(user_id)
+                
                 # Log admin action
                 await AuditLog.log_action(
                     user_id=admin_user_id,
@@ -175,6 +198,8 @@ class AdminService:
             success = await user.update({"is_active": False, "deleted_at": datetime.utcnow().isoformat()})
             
             if success:
+                principal_cache.invalidate_user(user_id)
+                
                 # Log admin action
                 await AuditLog.log_action(
                     user_id=admin_user_id,
@@ -321,6 +346,8 @@ class AdminService:
             success = await user.update({"role": "admin"})
             
             if success:
+                principal_cache.invalidate_user(user_id)
+                
                 # Log admin action
                 await AuditLog.log_action(
                     user_id=admin_user_id,
@@ -357,6 +384,8 @@ class AdminService:
             success = await user.update({"role": "user"})
             
             if success:
+                principal_cache.invalidate_user(user_id)
+                
                 # Log admin action
                 await AuditLog.log_action(
                     user_id=admin_user_id,
@@ -375,72 +404,282 @@ class AdminService:
             logger.error(f"Error demoting admin: {str(e)}")
             return {"status": "error", "message": "Failed to demote admin"}
     
-    async def get_submissions(self, page: int = 1, limit: int = 10, status: str = "all") -> Dict[str, Any]:
-        """Get policy submissions for admin review"""
+    async def get_submissions(self, page: int = 1, limit: int = 10, status: str = "all",
+                              cursor: Optional[str] = None, include_counts: bool = True) -> Dict[str, Any]:
+        """
+        Get policy submissions for admin review, newest first.
+        Pass the returned next_cursor back as cursor to fetch the following page; page
+        is only used to skip ahead when no cursor is given. Raises ValueError for a malformed
+        cursor or one from a listing with another status.
+        """
+        if cursor:
+            state = decode_cursor(cursor)
+            if state.get("status") != status:
+                raise ValueError("Invalid pagination cursor")
+            positions = state.get("positions") or {}
+        else:
+            positions = {}
+        
         try:
             if not await self._ensure_connection():
                 return {"status": "error", "message": "Database not available", "data": []}
             
-            # Get all policies directly from DynamoDB
-            all_policies = await self.dynamodb.scan_table('policies')
+            counts = await self.get_submission_counts() if include_counts or status == "all" else None
+            statuses = self._listing_statuses(status, counts)
             
-            # Filter by status if specified
-            if status != "all":
-                all_policies = [p for p in all_policies if p.get('status') == status]
+            try:
+                if not cursor and page > 1:
+                    positions = await self._skip_submissions(statuses, positions, (page - 1) * limit)
+                
+                pages = await self._fetch_status_pages(statuses, positions, limit)
+                merged = self._merge_status_pages(pages, limit)
+                positions = self._positions_after(positions, pages, merged)
+            except ClientError as e:
+                logger.warning(f"{STATUS_INDEX} unavailable, listing submissions by scan: {str(e)}")
+                return await self._get_submissions_by_scan(page, limit, status)
             
-            # Sort by created_at (newest first)
-            all_policies.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+            submissions = [self._format_submission(policy) for policy, _ in merged]
+            has_more = any(position != CURSOR_DONE for position in self._pending_positions(statuses, positions))
             
-            # Manual pagination
-            start_idx = (page - 1) * limit
-            end_idx = start_idx + limit
-            paginated_policies = all_policies[start_idx:end_idx]
-            
-            # Convert to admin submission format
-            submissions = []
-            for policy in paginated_policies:
-                # Extract policy count from policy_areas
-                policy_count = 0
-                policy_areas = policy.get('policy_areas', [])
-                for area in policy_areas:
-                    policy_count += len(area.get('policies', []))
-                
-                submission = {
-                    "policy_id": policy.get('policy_id'),
-                    "submission_id": policy.get('policy_id'),  # Alias for compatibility
-                    "user_id": policy.get('user_id'),
-                    "user_email": policy.get('user_email'),
-                    "country": policy.get('country'),
-                    "submission_type": policy.get('submission_type', 'form'),
-                    "status": policy.get('status', 'pending_review'),
-                    "created_at": policy.get('created_at'),
-                    "updated_at": policy.get('updated_at'),
-                    "policy_areas": policy_areas,
-                    "total_policies": policy.get('total_policies', policy_count),
-                    "score": policy.get('score', 0),
-                    "completeness_score": policy.get('completeness_score', 0),
-                    "admin_notes": policy.get('admin_notes', ''),
-                    "reviewed_by": policy.get('reviewed_by', ''),
-                    "reviewed_at": policy.get('reviewed_at', ''),
-                    "file_metadata": policy.get('file_metadata', {})
-                }
-                submissions.append(submission)
+            total = None
+            if include_counts and counts is not None:
+                total = counts["total"] if status == "all" else counts["by_status"].get(status, 0)
             
-            logger.info(f"Retrieved {len(submissions)} submissions out of {len(all_policies)} total")
+            logger.info(f"Retrieved {len(submissions)} submissions (status={status}, has_more={has_more})")
             
             return {
                 "status": "success",
                 "data": submissions,  # Changed from 'submissions' to 'data' for consistency
-                "total": len(all_policies),
+                "total": total,
                 "page": page,
                 "limit": limit,
                 "filtered_by": status,
-                "total_pages": (len(all_policies) + limit - 1) // limit
+                "total_pages": (total + limit - 1) // limit if total is not None else None,
+                "next_cursor": encode_cursor({"status": status, "positions": positions}) if has_more else None,
+                "has_more": has_more
             }
             
         except Exception as e:
             logger.error(f"Error getting submissions: {str(e)}")
             return {"status": "error", "message": f"Failed to get submissions: {str(e)}", "data": []}
+
+    async def _get_submissions_by_scan(self, page: int, limit: int, status: str) -> Dict[str, Any]:
+        """Full-scan listing, used while the status index is missing or backfilling"""
+        all_policies = await self.dynamodb.scan_table('policies')
+        
+        # Filter by status if specified
+        if status != "all":
+            all_policies = [p for p in all_policies if p.get('status') == status]
+        
+        # Sort by created_at (newest first)
+        all_policies.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        
+        # Manual pagination
+        start_idx = (page - 1) * limit
+        end_idx = start_idx + limit
+        submissions = [self._format_submission(policy) for policy in all_policies[start_idx:end_idx]]
+        
+        return {
+            "status": "success",
+            "data": submissions,
+            "total": len(all_policies),
+            "page": page,
+            "limit": limit,
+            "filtered_by": status,
+            "total_pages": (len(all_policies) + limit - 1) // limit,
+            "next_cursor": None,
+            "has_more": end_idx < len(all_policies)
+        }
+
+    @staticmethod
+    def _format_submission(policy: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a policies item to the admin submission format"""
+        # Extract policy count from policy_areas
+        policy_count = 0
+        policy_areas = policy.get('policy_areas', [])
+        for area in policy_areas:
+            policy_count += len(area.get('policies', []))
+        
+        return {
+            "policy_id": policy.get('policy_id'),
+            "submission_id": policy.get('policy_id'),  # Alias for compatibility
+            "user_id": policy.get('user_id'),
+            "user_email": policy.get('user_email'),
+            "country": policy.get('country'),
+            "submission_type": policy.get('submission_type', 'form'),
+            "status": policy.get('status', 'pending_review'),
+            "created_at": policy.get('created_at'),
+            "updated_at": policy.get('updated_at'),
+            "policy_areas": policy_areas,
+            "total_policies": policy.get('total_policies', policy_count),
+            "score": policy.get('score', 0),
+            "completeness_score": policy.get('completeness_score', 0),
+            "admin_notes": policy.get('admin_notes', ''),
+            "reviewed_by": policy.get('reviewed_by', ''),
+            "reviewed_at": policy.get('reviewed_at', ''),
+            "file_metadata": policy.get('file_metadata', {})
+        }
+
+    # Cursor pagination over the status-created index
+    #
+    # Each status is its own index partition, so "all" is a k-way merge of the partitions
+    # by created_at. Positions map a status to the ExclusiveStartKey to resume from, or
+    # CURSOR_DONE once that partition is exhausted; a missing status starts from the top.
+
+    @staticmethod
+    def _listing_statuses(status: str, counts: Optional[Dict[str, Any]]) -> List[str]:
+        if status != "all":
+            return [status]
+        statuses = list(SUBMISSION_STATUSES)
+        for known in (counts or {}).get("by_status", {}):
+            if known not in statuses:
+                statuses.append(known)
+        return statuses
+
+    @staticmethod
+    def _pending_positions(statuses: List[str], positions: Dict[str, Any]) -> List[Any]:
+        return [positions.get(status) for status in statuses]
+
+    async def _fetch_status_pages(self, statuses: List[str], positions: Dict[str, Any], limit: int) -> Dict[str, Dict]:
+        """Read up to limit items, newest first, from every partition that is not exhausted"""
+        pages = {}
+        for status in statuses:
+            position = positions.get(status)
+            if position == CURSOR_DONE:
+                continue
+            pages[status] = await self.dynamodb.query_page(
+                'policies',
+                Key('status').eq(status),
+                index_name=STATUS_INDEX,
+                limit=limit,
+                exclusive_start_key=position,
+                scan_forward=False
+            )
+        return pages
+
+    @staticmethod
+    def _merge_status_pages(pages: Dict[str, Dict], limit: int) -> List[tuple]:
+        """Newest limit items across the partition pages as (item, status) pairs"""
+        entries = [(item, status) for status, page in pages.items() for item in page['items']]
+        # Stable sort keeps each partition's index order for equal timestamps
+        entries.sort(key=lambda entry: entry[0].get('created_at', ''), reverse=True)
+        return entries[:limit]
+
+    @staticmethod
+    def _positions_after(positions: Dict[str, Any], pages: Dict[str, Dict], consumed: List[tuple]) -> Dict[str, Any]:
+        """Positions after consuming a prefix of the merged entries"""
+        used: Dict[str, List[Dict]] = {}
+        for item, status in consumed:
+            used.setdefault(status, []).append(item)
+        
+        next_positions = dict(positions)
+        for status, page in pages.items():
+            items = used.get(status, [])
+            if len(items) == len(page['items']):
+                next_positions[status] = page['last_evaluated_key'] or CURSOR_DONE
+            elif items:
+                last = items[-1]
+                next_positions[status] = {
+                    'policy_id': last['policy_id'],
+                    'status': status,
+                    'created_at': last['created_at']
+                }
+        return next_positions
+
+    async def _skip_submissions(self, statuses: List[str], positions: Dict[str, Any], count: int) -> Dict[str, Any]:
+        """Advance positions past count submissions (page numbers without a cursor)"""
+        while count > 0:
+            chunk = min(count, SKIP_CHUNK_SIZE)
+            pages = await self._fetch_status_pages(statuses, positions, chunk)
+            merged = self._merge_status_pages(pages, chunk)
+            positions = self._positions_after(positions, pages, merged)
+            if not merged:
+                break
+            count -= len(merged)
+        return positions
+
+    async def get_submission_counts(self, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Submission counts by status and the number of approved, map-visible policies.
+        Kept as a pre-aggregate in admin_data and rebuilt once it is older than
+        SUBMISSION_COUNTS_TTL_SECONDS, so listings never count by scanning.
+        Returns None when the counts cannot be computed.
+        """
+        now = time.monotonic()
+        if not refresh and self._submission_counts and now - self._submission_counts_loaded_at < settings.SUBMISSION_COUNTS_TTL_SECONDS:
+            return self._submission_counts
+        
+        counts = None
+        if not refresh:
+            stored = await self.dynamodb.get_item('admin_data', {'admin_id': SUBMISSION_COUNTS_ID})
+            if stored and stored.get('data_value'):
+                age = (datetime.utcnow() - datetime.fromisoformat(stored['updated_at'])).total_seconds()
+                if age < settings.SUBMISSION_COUNTS_TTL_SECONDS:
+                    counts = self._counts_from_item(stored['data_value'])
+        
+        if counts is None:
+            try:
+                counts = await self._compute_submission_counts()
+            except Exception as e:
+                logger.error(f"Error computing submission counts: {str(e)}")
+                return self._submission_counts
+            await self.dynamodb.insert_item('admin_data', {
+                'admin_id': SUBMISSION_COUNTS_ID,
+                'data_type': 'aggregate',
+                'data_key': 'submission_counts',
+                'data_value': counts,
+                'created_at': counts['computed_at'],
+                'updated_at': counts['computed_at']
+            })
+        
+        self._submission_counts = counts
+        self._submission_counts_loaded_at = now
+        return counts
+
+    async def _invalidate_submission_counts(self):
+        """
+        Drop the cached and the stored counts so the next listing recounts. Other processes
+        catch up once their in-memory copy is older than the TTL.
+        """
+        self._submission_counts = None
+        await self.dynamodb.delete_item('admin_data', {'admin_id': SUBMISSION_COUNTS_ID})
+
+    @staticmethod
+    def _counts_from_item(value: Dict[str, Any]) -> Dict[str, Any]:
+        # DynamoDB returns numbers as Decimal
+        return {
+            "by_status": {status: int(count) for status, count in value.get("by_status", {}).items()},
+            "total": int(value.get("total", 0)),
+            "approved_policies": int(value.get("approved_policies", 0)),
+            "computed_at": value.get("computed_at")
+        }
+
+    async def _compute_submission_counts(self) -> Dict[str, Any]:
+        """Count submissions with a paginated scan that only reads status and policy_areas"""
+        by_status: Dict[str, int] = {}
+        approved_policies = 0
+        start_key = None
+        while True:
+            page = await self.dynamodb.scan_page(
+                'policies',
+                fields=('status', 'policy_areas'),
+                exclusive_start_key=start_key
+            )
+            for policy in page['items']:
+                status = policy.get('status', 'pending_review')
+                by_status[status] = by_status.get(status, 0) + 1
+                approved_policies += len(self._approved_entries(policy))
+            start_key = page['last_evaluated_key']
+            if not start_key:
+                break
+        
+        return {
+            "by_status": by_status,
+            "total": sum(by_status.values()),
+            "approved_policies": approved_policies,
+            "computed_at": datetime.utcnow().isoformat()
+        }
+
     async def get_statistics(self) -> Dict[str, Any]:
         """Get admin statistics"""
         try:
@@ -478,10 +717,15 @@ class AdminService:
             if not area_found:
                 raise Exception(f"Policy not found at area_id: {area_id}, policy_index: {policy_index}")
             
+            # Re-check quality with the current rules before the policy goes live
+            policy_quality.check_submission(submission, force=True)
+            
             # Update submission in database
             submission['updated_at'] = datetime.utcnow().isoformat()
             await self.dynamodb.update_item('policies', {'policy_id': submission_id}, submission)
             
+            await self._invalidate_submission_counts()
+            policy_search_index.index_submission(submission)
             logger.info(f"Policy approved: {submission_id} - {area_id}[{policy_index}] by {admin_user.get('email')}")
             
             return {
@@ -530,6 +774,8 @@ class AdminService:
             submission['updated_at'] = datetime.utcnow().isoformat()
             await self.dynamodb.update_item('policies', {'policy_id': submission_id}, submission)
             
+            await self._invalidate_submission_counts()
+            policy_search_index.index_submission(submission)
             logger.info(f"Policy rejected: {submission_id} - {area_id}[{policy_index}] by {admin_user.get('email')}")
             
             return {
@@ -590,8 +836,11 @@ class AdminService:
                 "created_at": policy_to_commit['committed_at'],
                 "updated_at": policy_to_commit['committed_at']
             }
+            policy_quality.check_submission(master_policy)
             
             await self.dynamodb.insert_item('policies', master_policy)
+            await self._invalidate_submission_counts()
+            policy_search_index.index_submission(master_policy)
             
             logger.info(f"Policy committed to master: {policy_to_commit['master_id']} by {admin_user.get('email')}")
             
@@ -618,6 +867,8 @@ class AdminService:
             deleted = await self.dynamodb.delete_item('policies', {'policy_id': policy_id})
             
             if deleted:
+                await self._invalidate_submission_counts()
+                policy_search_index.remove_submission(policy_id)
                 logger.info(f"Policy completely deleted: {policy_id} by {admin_user.get('email')}")
                 return {
                     "success": True,
@@ -631,53 +882,132 @@ class AdminService:
             logger.error(f"Error deleting policy completely: {str(e)}")
             raise Exception(f"Failed to delete policy completely: {str(e)}")
 
-    async def get_approved_policies(self, page: int = 1, limit: int = 20) -> Dict[str, Any]:
-        """Get all approved policies for map visualization"""
+    async def get_approved_policies(self, page: int = 1, limit: int = 20, cursor: Optional[str] = None,
+                                    include_counts: bool = True) -> Dict[str, Any]:
+        """
+        Get approved policies for map visualization, newest submission first.
+        Raises ValueError for a malformed cursor.
+        """
+        if cursor:
+            state = decode_cursor(cursor)
+            positions = state.get("positions") or {}
+            skip = int(state.get("skip", 0))
+        else:
+            positions, skip = {}, (page - 1) * limit
+        
         try:
             if not await self._ensure_connection():
                 raise Exception("Database connection not available")
             
-            # Get all policies from database
-            all_policies = await self.dynamodb.scan_table('policies')
-            
-            # Filter for approved policies that are map visible
-            approved_policies = []
-            for policy in all_policies:
-                policy_areas = policy.get('policy_areas', [])
-                for area in policy_areas:
-                    for p in area.get('policies', []):
-                        if p.get('status') == 'approved' and p.get('map_visible', False):
-                            approved_policy = {
-                                "policy_id": policy.get('policy_id'),
-                                "country": policy.get('country'),
-                                "area_id": area.get('area_id'),
-                                "area_name": area.get('area_name'),
-                                "policy_name": p.get('policyName'),
-                                "policy_description": p.get('policyDescription'),
-                                "approved_at": p.get('approved_at'),
-                                "approved_by": p.get('approved_by'),
-                                "map_visible": p.get('map_visible', False)
-                            }
-                            approved_policies.append(approved_policy)
-            
-            # Paginate results
-            start_idx = (page - 1) * limit
-            end_idx = start_idx + limit
-            paginated_policies = approved_policies[start_idx:end_idx]
+            counts = await self.get_submission_counts()
+            statuses = self._listing_statuses("all", counts)
+            
+            try:
+                policies, positions, skip = await self._collect_approved_policies(statuses, positions, skip, limit)
+            except ClientError as e:
+                logger.warning(f"{STATUS_INDEX} unavailable, listing approved policies by scan: {str(e)}")
+                return await self._get_approved_policies_by_scan(page, limit)
+            
+            has_more = any(position != CURSOR_DONE for position in self._pending_positions(statuses, positions))
+            total = counts["approved_policies"] if include_counts and counts is not None else None
             
             return {
                 "success": True,
-                "policies": paginated_policies,
-                "total": len(approved_policies),
+                "policies": policies,
+                "total": total,
                 "page": page,
                 "limit": limit,
-                "total_pages": (len(approved_policies) + limit - 1) // limit
+                "total_pages": (total + limit - 1) // limit if total is not None else None,
+                "next_cursor": encode_cursor({"positions": positions, "skip": skip}) if has_more else None,
+                "has_more": has_more
             }
             
         except Exception as e:
             logger.error(f"Error getting approved policies: {str(e)}")
             raise Exception(f"Failed to get approved policies: {str(e)}")
 
+    async def _collect_approved_policies(self, statuses: List[str], positions: Dict[str, Any],
+                                         skip: int, limit: int) -> tuple:
+        """
+        Walk submissions newest first until limit approved policies are collected.
+        skip counts entries to pass over, starting with the submission at the current position.
+        Returns (policies, positions, skip) where skip is how far into the next submission to resume.
+        """
+        policies: List[Dict[str, Any]] = []
+        while len(policies) < limit:
+            pages = await self._fetch_status_pages(statuses, positions, APPROVED_SCAN_BATCH)
+            merged = self._merge_status_pages(pages, APPROVED_SCAN_BATCH)
+            if not merged:
+                positions = self._positions_after(positions, pages, merged)
+                break
+            
+            consumed = len(merged)
+            for index, (submission, _) in enumerate(merged):
+                entries = self._approved_entries(submission)
+                if skip >= len(entries):
+                    skip -= len(entries)
+                    continue
+                
+                room = limit - len(policies)
+                remaining = entries[skip:]
+                policies.extend(remaining[:room])
+                if len(remaining) > room:
+                    # Resume inside this submission on the next page
+                    skip += room
+                    consumed = index
+                    break
+                skip = 0
+                if len(policies) == limit:
+                    consumed = index + 1
+                    break
+            
+            positions = self._positions_after(positions, pages, merged[:consumed])
+        
+        return policies, positions, skip
+
+    async def _get_approved_policies_by_scan(self, page: int, limit: int) -> Dict[str, Any]:
+        """Full-scan listing, used while the status index is missing or backfilling"""
+        all_policies = await self.dynamodb.scan_table('policies')
+        
+        approved_policies = []
+        for policy in all_policies:
+            approved_policies.extend(self._approved_entries(policy))
+        
+        # Paginate results
+        start_idx = (page - 1) * limit
+        end_idx = start_idx + limit
+        
+        return {
+            "success": True,
+            "policies": approved_policies[start_idx:end_idx],
+            "total": len(approved_policies),
+            "page": page,
+            "limit": limit,
+            "total_pages": (len(approved_policies) + limit - 1) // limit,
+            "next_cursor": None,
+            "has_more": end_idx < len(approved_policies)
+        }
+
+    @staticmethod
+    def _approved_entries(policy: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Approved, map-visible policies inside a submission"""
+        approved_policies = []
+        for area in policy.get('policy_areas', []):
+            for p in area.get('policies', []):
+                if p.get('status') == 'approved' and p.get('map_visible', False):
+                    approved_policies.append({
+                        "policy_id": policy.get('policy_id'),
+                        "country": policy.get('country'),
+                        "area_id": area.get('area_id'),
+                        "area_name": area.get('area_name'),
+                        "policy_name": p.get('policyName'),
+                        "policy_description": p.get('policyDescription'),
+                        "approved_at": p.get('approved_at'),
+                        "approved_by": p.get('approved_by'),
+                        "map_visible": p.get('map_visible', False)
+                    })
+        return approved_policies
+
     async def get_policy_files(self, policy_id: str) -> Dict[str, Any]:
         """Get all files associated with a policy"""
         try:
@@ -1,24 +1,36 @@
 """
 DynamoDB-based AI Analysis service for policy analysis and scoring.
 """
+import asyncio
 import logging
 import io
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from fastapi import HTTPException
 import uuid
-import PyPDF2
-from docx import Document
-import openai
 import os
 from config.dynamodb import get_dynamodb
 from config.data_constants import POLICY_AREAS
+from utils.lazy_imports import lazy_import
 from utils.helpers import calculate_policy_score, calculate_completeness_score
 from services.bedrock_service import bedrock_service
+from services.analysis_cache_service import (
+    analysis_cache, content_hash, version_fingerprint, LAYER_TEXT, LAYER_GROQ, LAYER_TEA,
+    MAX_INLINE_PAYLOAD_BYTES
+)
 
 logger = logging.getLogger(__name__)
 
+# Document parsers are imported on first use
+PyPDF2 = lazy_import("PyPDF2")
+docx = lazy_import("docx")
+
 class AIAnalysisService:
+    # Bump when extraction logic changes so cached text is re-extracted
+    TEXT_EXTRACTOR_VERSION = "1"
+    GROQ_MODEL = "llama3-8b-8192"  # GROQ's model
+    GROQ_SYSTEM_PROMPT = "You are a policy analysis expert. Extract key information from policy documents and return only valid JSON responses with no additional text."
+    
     def __init__(self):
         # Service initialization
         pass
@@ -58,7 +70,7 @@ class AIAnalysisService:
                 # Extract text from Word document
                 try:
                     doc_file = io.BytesIO(file_content)
-                    document = Document(doc_file)
+                    document = docx.Document(doc_file)
                     
                     logger.info(f"Word document has {len(document.paragraphs)} paragraphs")
                     
@@ -120,6 +132,77 @@ class AIAnalysisService:
             logger.error(f"Text extraction failed for {filename}: {str(e)}")
             return ""
     
+    async def extract_text_cached(self, file_content: bytes, filename: str) -> str:
+        """Extract text content, reusing the cached result for identical file bytes"""
+        digest = content_hash(file_content)
+        version = version_fingerprint(self.TEXT_EXTRACTOR_VERSION, filename.lower().split('.')[-1])
+        
+        cached_text = await analysis_cache.get(LAYER_TEXT, digest, version)
+        if cached_text is not None:
+            logger.info(f"Using cached text extraction for {filename}")
+            return cached_text
+        
+        loop = asyncio.get_event_loop()
+        text_content = await loop.run_in_executor(None, self.extract_text_from_file, file_content, filename)
+        
+        if text_content.strip():
+            await analysis_cache.set(LAYER_TEXT, digest, version, text_content)
+        return text_content
+    
+    async def get_stored_file_text(self, file_metadata) -> str:
+        """
+        Return extracted text for an uploaded file.
+        Uses the text saved on the file metadata when present, otherwise downloads from S3,
+        extracts (through the analysis cache) and saves the text back for the next call.
+        """
+        if file_metadata.extracted_text:
+            return file_metadata.extracted_text
+        
+        try:
+            from services.aws_service import aws_service
+            s3_result = await aws_service.get_file(file_metadata.s3_key)
+            file_content = s3_result['content']
+            
+            if not file_content:
+                raise HTTPException(status_code=404, detail="File content is empty")
+                
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"S3 retrieval failed for file_id {file_metadata.file_id}, s3_key {file_metadata.s3_key}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to retrieve file from S3: {str(e)}")
+        
+        try:
+            text_content = await self.extract_text_cached(file_content, file_metadata.filename or 'unknown')
+        except Exception as e:
+            logger.error(f"Text extraction failed: {str(e)}")
+            raise HTTPException(status_code=400, detail=f"Failed to extract text from document: {str(e)}")
+        
+        # Keep the text on the file record unless it would exceed the DynamoDB item limit. Only the
+        # text: the processing status belongs to whatever job is processing the file
+        if text_content.strip() and len(text_content.encode('utf-8')) <= MAX_INLINE_PAYLOAD_BYTES:
+            await file_metadata.update({'extracted_text': text_content})
+        
+        return text_content
+    
+    async def calculate_tea_scores_cached(self, text_content: str) -> Dict[str, Any]:
+        """Calculate TEA scores, reusing cached Bedrock results for identical text"""
+        digest = content_hash(text_content)
+        version = bedrock_service.get_cache_version()
+        
+        cached_scores = await analysis_cache.get(LAYER_TEA, digest, version)
+        if cached_scores is not None:
+            logger.info("Using cached TEA scores for document")
+            return cached_scores
+        
+        loop = asyncio.get_event_loop()
+        tea_scores = await loop.run_in_executor(None, self.calculate_tea_scores, text_content)
+        
+        # Only cache model results - errors and keyword fallbacks should be retried
+        if "error" not in tea_scores and not tea_scores.get("fallback_used"):
+            await analysis_cache.set(LAYER_TEA, digest, version, tea_scores)
+        return tea_scores
+    
     def calculate_tea_scores(self, text_content: str) -> Dict[str, Any]:
         """
         Calculate Transparency, Explainability, Accountability (TEA) scores using Bedrock
@@ -162,10 +245,82 @@ class AIAnalysisService:
     
     def analyze_policy_document(self, text_content: str) -> Dict[str, Any]:
         """Analyze policy document content using GROQ API"""
+        analysis_data, parsed = self._extract_policy_fields(text_content)
+        if not parsed:
+            return analysis_data
+        
+        # Calculate TEA scores using Bedrock
+        logger.info("Calculating TEA scores for the document")
+        tea_scores = self.calculate_tea_scores(text_content)
+        
+        return self._attach_tea_scores(analysis_data, tea_scores)
+    
+    async def analyze_policy_document_cached(self, text_content: str) -> Dict[str, Any]:
+        """Analyze policy document, reusing cached GROQ extraction and TEA scores for identical text"""
+        digest = content_hash(text_content)
+        version = self._get_groq_cache_version()
+        
+        analysis_data = await analysis_cache.get(LAYER_GROQ, digest, version)
+        if analysis_data is None:
+            loop = asyncio.get_event_loop()
+            analysis_data, parsed = await loop.run_in_executor(None, self._extract_policy_fields, text_content)
+            if not parsed:
+                return analysis_data
+            await analysis_cache.set(LAYER_GROQ, digest, version, analysis_data)
+        else:
+            logger.info("Using cached GROQ extraction for document")
+        
+        tea_scores = await self.calculate_tea_scores_cached(text_content)
+        
+        # Copy so the cached extraction is not mutated
+        return self._attach_tea_scores(dict(analysis_data), tea_scores)
+    
+    def _get_groq_cache_version(self) -> str:
+        """Version tag for cached GROQ extractions"""
+        return version_fingerprint(self._build_analysis_prompt(""), self.GROQ_SYSTEM_PROMPT, self.GROQ_MODEL)
+    
+    def _attach_tea_scores(self, analysis_data: Dict[str, Any], tea_scores: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge TEA scores into the structured extraction result"""
+        # Add TEA scores to analysis data
+        analysis_data["tea_scores"] = tea_scores.get("scores", {
+            "transparency_score": 0,
+            "explainability_score": 0,
+            "accountability_score": 0
+        })
+        analysis_data["tea_analysis"] = {
+            "transparency_analysis": tea_scores.get("transparency_analysis", []),
+            "explainability_analysis": tea_scores.get("explainability_analysis", []),
+            "accountability_analysis": tea_scores.get("accountability_analysis", [])
+        }
+        
+        # Add metadata about the analysis method
+        analysis_data["tea_metadata"] = {
+            "analysis_method": "aws_bedrock" if not tea_scores.get("fallback_used") else "keyword_fallback",
+            "fallback_used": tea_scores.get("fallback_used", False),
+            "has_error": "error" in tea_scores
+        }
+        
+        # Log the calculated scores
+        scores = analysis_data["tea_scores"]
+        logger.info(f"TEA Scores - Transparency: {scores.get('transparency_score', 0)}, "
+                   f"Explainability: {scores.get('explainability_score', 0)}, "
+                   f"Accountability: {scores.get('accountability_score', 0)}")
+        
+        if tea_scores.get("fallback_used"):
+            logger.info("TEA scores calculated using keyword-based fallback (Bedrock not available)")
+        elif "error" in tea_scores:
+            logger.warning(f"TEA scores calculation had errors: {tea_scores.get('error')}")
+        else:
+            logger.info("TEA scores calculated successfully using AWS Bedrock")
+        
+        return analysis_data
+    
+    def _extract_policy_fields(self, text_content: str) -> Tuple[Dict[str, Any], bool]:
+        """Extract structured policy fields using GROQ API; the flag is False if the response could not be parsed"""
         try:
             if not text_content.strip():
                 logger.warning("No text content provided for analysis")
-                return {"error": "No text content to analyze"}
+                return {"error": "No text content to analyze"}, False
             
             logger.info(f"Starting AI analysis of document with {len(text_content)} characters")
             
@@ -184,42 +339,13 @@ class AIAnalysisService:
                     "key_points": [],
                     "timeline": "Not specified",
                     "summary": "AI analysis not available - API not configured"
-                }
+                }, False
             
             # Truncate text if too long and add sample text at the beginning for better analysis
             analysis_text = text_content[:3000] if len(text_content) > 3000 else text_content
             
             # Enhanced prompt for better extraction
-            prompt = f"""
-You are an expert policy analyst. Analyze the following policy document and extract specific information. 
-Be precise and only extract information that is clearly present in the text.
-
-DOCUMENT TEXT:
-{analysis_text}
-
-Please analyze and extract the following information in JSON format:
-
-1. TITLE: The main title or name of the document/policy
-2. COUNTRY: The country, jurisdiction, or region this policy applies to
-3. POLICY_AREA: The main policy domain (e.g., "AI and Technology", "Healthcare", "Education", "Environment", etc.)
-4. OBJECTIVES: List of main goals or objectives mentioned
-5. KEY_POINTS: List of important policy points or provisions
-6. TIMELINE: Any implementation dates or timelines mentioned
-7. SUMMARY: A concise summary in 150 words or less
-
-Return ONLY a valid JSON object with this exact structure:
-{{
-    "title": "exact title from document or descriptive title based on content",
-    "country": "country name or Unknown if not found",
-    "policy_area": "specific policy area",
-    "objectives": ["objective 1", "objective 2"],
-    "key_points": ["key point 1", "key point 2"],
-    "timeline": "timeline information or Not specified",
-    "summary": "comprehensive summary"
-}}
-
-Important: Return ONLY the JSON object, no additional text or explanations.
-"""
+            prompt = self._build_analysis_prompt(analysis_text)
             
             # Call GROQ API
             import requests
@@ -229,9 +355,9 @@ Important: Return ONLY the JSON object, no additional text or explanations.
             }
             
             payload = {
-                "model": "llama3-8b-8192",  # GROQ's model
+                "model": self.GROQ_MODEL,
                 "messages": [
-                    {"role": "system", "content": "You are a policy analysis expert. Extract key information from policy documents and return only valid JSON responses with no additional text."},
+                    {"role": "system", "content": self.GROQ_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 "max_tokens": 1500,  # Increased for better responses
@@ -316,43 +442,7 @@ Important: Return ONLY the JSON object, no additional text or explanations.
                             analysis_data["country"] = country_map.get(match.group(), match.group())
                             break
                 
-                # Calculate TEA scores using Bedrock
-                logger.info("Calculating TEA scores for the document")
-                tea_scores = self.calculate_tea_scores(text_content)
-                
-                # Add TEA scores to analysis data
-                analysis_data["tea_scores"] = tea_scores.get("scores", {
-                    "transparency_score": 0,
-                    "explainability_score": 0,
-                    "accountability_score": 0
-                })
-                analysis_data["tea_analysis"] = {
-                    "transparency_analysis": tea_scores.get("transparency_analysis", []),
-                    "explainability_analysis": tea_scores.get("explainability_analysis", []),
-                    "accountability_analysis": tea_scores.get("accountability_analysis", [])
-                }
-                
-                # Add metadata about the analysis method
-                analysis_data["tea_metadata"] = {
-                    "analysis_method": "aws_bedrock" if not tea_scores.get("fallback_used") else "keyword_fallback",
-                    "fallback_used": tea_scores.get("fallback_used", False),
-                    "has_error": "error" in tea_scores
-                }
-                
-                # Log the calculated scores
-                scores = analysis_data["tea_scores"]
-                logger.info(f"TEA Scores - Transparency: {scores.get('transparency_score', 0)}, "
-                           f"Explainability: {scores.get('explainability_score', 0)}, "
-                           f"Accountability: {scores.get('accountability_score', 0)}")
-                
-                if tea_scores.get("fallback_used"):
-                    logger.info("TEA scores calculated using keyword-based fallback (Bedrock not available)")
-                elif "error" in tea_scores:
-                    logger.warning(f"TEA scores calculation had errors: {tea_scores.get('error')}")
-                else:
-                    logger.info("TEA scores calculated successfully using AWS Bedrock")
-                
-                return analysis_data
+                return analysis_data, True
                 
             except json.JSONDecodeError as e:
                 logger.error(f"JSON parsing failed: {e}")
@@ -372,7 +462,7 @@ Important: Return ONLY the JSON object, no additional text or explanations.
                     "summary": f"Analysis of policy document. {ai_response[:150]}..."
                 }
                 
-                return analysis_data
+                return analysis_data, False
             
         except Exception as e:
             logger.error(f"Policy document analysis failed: {str(e)}")
@@ -385,7 +475,40 @@ Important: Return ONLY the JSON object, no additional text or explanations.
                 "key_points": [],
                 "timeline": "Not specified", 
                 "summary": "AI analysis could not be completed due to technical error"
-            }
+            }, False
+    
+    def _build_analysis_prompt(self, analysis_text: str) -> str:
+        """Create the GROQ structured extraction prompt"""
+        return f"""
+You are an expert policy analyst. Analyze the following policy document and extract specific information. 
+Be precise and only extract information that is clearly present in the text.
+
+DOCUMENT TEXT:
+{analysis_text}
+
+Please analyze and extract the following information in JSON format:
+
+1. TITLE: The main title or name of the document/policy
+2. COUNTRY: The country, jurisdiction, or region this policy applies to
+3. POLICY_AREA: The main policy domain (e.g., "AI and Technology", "Healthcare", "Education", "Environment", etc.)
+4. OBJECTIVES: List of main goals or objectives mentioned
+5. KEY_POINTS: List of important policy points or provisions
+6. TIMELINE: Any implementation dates or timelines mentioned
+7. SUMMARY: A concise summary in 150 words or less
+
+Return ONLY a valid JSON object with this exact structure:
+{{
+    "title": "exact title from document or descriptive title based on content",
+    "country": "country name or Unknown if not found",
+    "policy_area": "specific policy area",
+    "objectives": ["objective 1", "objective 2"],
+    "key_points": ["key point 1", "key point 2"],
+    "timeline": "timeline information or Not specified",
+    "summary": "comprehensive summary"
+}}
+
+Important: Return ONLY the JSON object, no additional text or explanations.
+"""
     
     async def _get_db(self):
         """Get DynamoDB client"""
@@ -0,0 +1,171 @@
+"""
+Layered cache for document analysis results
+Keeps extracted text, GROQ structured extraction and Bedrock TEA scores keyed by
+content hash and prompt/model version, with an in-memory LRU in front of DynamoDB/S3
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Optional, Union
+
+from config.dynamodb import get_dynamodb
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Cache layers
+LAYER_TEXT = "text"
+LAYER_GROQ = "groq"
+LAYER_TEA = "tea"
+
+# DynamoDB items are capped at 400KB - larger payloads are stored in S3
+MAX_INLINE_PAYLOAD_BYTES = 350 * 1024
+S3_CACHE_PREFIX = "analysis-cache/"
+
+
+def content_hash(content: Union[bytes, str]) -> str:
+    """Return the SHA-256 hex digest of document bytes or text"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def version_fingerprint(*parts: str) -> str:
+    """Build a short version tag from prompt templates and model identifiers"""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class AnalysisCacheService:
+    """In-memory LRU backed by the analysis_cache DynamoDB table (S3 for large payloads)"""
+
+    def __init__(self, max_entries: int = None, ttl_days: int = None):
+        self.max_entries = max_entries or settings.ANALYSIS_CACHE_MAX_ENTRIES
+        self.ttl_seconds = (ttl_days or settings.ANALYSIS_CACHE_TTL_DAYS) * 24 * 3600
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = Lock()
+        self.stats = {"memory_hits": 0, "store_hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def build_key(layer: str, digest: str, version: str) -> str:
+        """Compose the cache key for a layer entry"""
+        return f"{layer}:{version}:{digest}"
+
+    def _memory_get(self, cache_key: str) -> Optional[Any]:
+        with self._lock:
+            if cache_key not in self._memory:
+                return None
+            self._memory.move_to_end(cache_key)
+            return self._memory[cache_key]
+
+    def _memory_set(self, cache_key: str, value: Any):
+        with self._lock:
+            self._memory[cache_key] = value
+            self._memory.move_to_end(cache_key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    async def get(self, layer: str, digest: str, version: str) -> Optional[Any]:
+        """Return a cached value or None on miss"""
+        cache_key = self.build_key(layer, digest, version)
+
+        value = self._memory_get(cache_key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+
+        try:
+            dynamodb = await get_dynamodb()
+            item = await dynamodb.get_item('analysis_cache', {'cache_key': cache_key})
+            if item and int(item.get('expires_at', 0)) > time.time():
+                if item.get('s3_key'):
+                    payload = await self._read_s3_payload(item['s3_key'])
+                else:
+                    payload = item.get('payload')
+
+                if payload is not None:
+                    value = json.loads(payload)
+                    self._memory_set(cache_key, value)
+                    self.stats["store_hits"] += 1
+                    return value
+        except Exception as e:
+            logger.warning(f"Analysis cache read failed for {layer}: {str(e)}")
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, layer: str, digest: str, version: str, value: Any) -> bool:
+        """Store a value in memory and persist it"""
+        cache_key = self.build_key(layer, digest, version)
+        self._memory_set(cache_key, value)
+
+        try:
+            payload = json.dumps(value, default=str)
+            item = {
+                'cache_key': cache_key,
+                'layer': layer,
+                'content_hash': digest,
+                'version': version,
+                'expires_at': int(time.time()) + self.ttl_seconds,
+                'created_at': datetime.utcnow().isoformat()
+            }
+
+            if len(payload.encode("utf-8")) > MAX_INLINE_PAYLOAD_BYTES:
+                item['s3_key'] = f"{S3_CACHE_PREFIX}{layer}/{version}/{digest}.json"
+                await self._write_s3_payload(item['s3_key'], payload)
+            else:
+                item['payload'] = payload
+
+            dynamodb = await get_dynamodb()
+            stored = await dynamodb.insert_item('analysis_cache', item)
+            if stored:
+                self.stats["writes"] += 1
+            return stored
+        except Exception as e:
+            logger.warning(f"Analysis cache write failed for {layer}: {str(e)}")
+            return False
+
+    async def invalidate(self, layer: str, digest: str, version: str) -> bool:
+        """Drop a single entry from memory and the persistent store"""
+        cache_key = self.build_key(layer, digest, version)
+        with self._lock:
+            self._memory.pop(cache_key, None)
+
+        try:
+            dynamodb = await get_dynamodb()
+            return await dynamodb.delete_item('analysis_cache', {'cache_key': cache_key})
+        except Exception as e:
+            logger.warning(f"Analysis cache invalidation failed for {layer}: {str(e)}")
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current memory usage"""
+        return {**self.stats, "memory_entries": len(self._memory), "max_entries": self.max_entries}
+
+    async def _read_s3_payload(self, s3_key: str) -> Optional[str]:
+        from services.aws_service import aws_service
+        result = await aws_service.get_file(s3_key)
+        return result['content'].decode("utf-8") if result.get('content') else None
+
+    async def _write_s3_payload(self, s3_key: str, payload: str):
+        from services.aws_service import aws_service
+
+        def put_object():
+            return aws_service.s3_client.put_object(
+                Bucket=aws_service.bucket_name,
+                Key=s3_key,
+                Body=payload.encode("utf-8"),
+                ContentType="application/json",
+                ServerSideEncryption="AES256"
+            )
+
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(aws_service.executor, put_object)
+
+
+# Create singleton instance
+analysis_cache = AnalysisCacheService()
@@ -0,0 +1,278 @@
+"""
+Background job queue for document analysis and TEA scoring
+Requests submit a job and poll for its status instead of holding the HTTP connection
+open while GROQ/Bedrock run
+"""
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE_TEA_SCORES = "tea_scores"
+JOB_TYPE_DOCUMENT_ANALYSIS = "document_analysis"
+JOB_TYPES = [JOB_TYPE_TEA_SCORES, JOB_TYPE_DOCUMENT_ANALYSIS]
+
+
+class MemoryJobStore:
+    """Job status store kept in process memory"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    async def save(self, job: Dict[str, Any]):
+        self._jobs[job['job_id']] = job
+        self._evict_expired()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    def _evict_expired(self):
+        now = datetime.utcnow()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.get('completed_at')
+            and (now - datetime.fromisoformat(job['completed_at'])).total_seconds() > self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class RedisJobStore:
+    """Job status store in Redis so any worker process can answer status polls"""
+
+    KEY_PREFIX = "analysis_job:"
+
+    def __init__(self, redis_client, ttl_seconds: int):
+        # A redis.asyncio client: a slow Redis delays the poll, not the event loop
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    async def save(self, job: Dict[str, Any]):
+        await self.redis_client.setex(f"{self.KEY_PREFIX}{job['job_id']}", self.ttl_seconds, json.dumps(job, default=str))
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        data = await self.redis_client.get(f"{self.KEY_PREFIX}{job_id}")
+        return json.loads(data) if data else None
+
+
+class AnalysisJobService:
+    """In-process job queue with a fixed pool of async workers"""
+
+    def __init__(self):
+        self.worker_count = settings.ANALYSIS_JOB_WORKERS
+        self.timeout_seconds = settings.ANALYSIS_JOB_TIMEOUT_SECONDS
+        # Chosen on first use, so importing the service neither imports nor pings Redis
+        self.store = None
+        self._store_lock = asyncio.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def _get_store(self):
+        """Use Redis when REDIS_URL is reachable, otherwise keep jobs in memory"""
+        if self.store is not None:
+            return self.store
+        async with self._store_lock:
+            if self.store is not None:
+                return self.store
+            ttl_seconds = settings.ANALYSIS_JOB_TTL_SECONDS
+            if settings.REDIS_URL:
+                try:
+                    import redis.asyncio as aioredis
+                    redis_client = aioredis.from_url(
+                        settings.REDIS_URL,
+                        decode_responses=True,
+                        socket_connect_timeout=1,
+                        socket_timeout=1
+                    )
+                    await redis_client.ping()
+                    logger.info("Analysis job store using Redis")
+                    self.store = RedisJobStore(redis_client, ttl_seconds)
+                    return self.store
+                except Exception as e:
+                    logger.warning(f"Redis unavailable for analysis jobs ({str(e)}), using in-memory store")
+            self.store = MemoryJobStore(ttl_seconds)
+            return self.store
+
+    async def start(self):
+        """Start the worker pool (idempotent)"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.ANALYSIS_JOB_QUEUE_SIZE)
+        self._workers = [
+            asyncio.create_task(self._worker(index)) for index in range(self.worker_count)
+        ]
+        logger.info(f"Analysis job service started with {self.worker_count} workers")
+
+    async def stop(self):
+        """Cancel workers on shutdown"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def submit(self, job_type: str, file_id: str, policy_id: Optional[str] = None,
+                     submitted_by: Optional[str] = None) -> Dict[str, Any]:
+        """Queue an analysis job and return its initial status"""
+        if job_type not in JOB_TYPES:
+            raise HTTPException(status_code=400, detail=f"Unsupported job type. Allowed types: {', '.join(JOB_TYPES)}")
+
+        await self.start()
+        store = await self._get_store()
+
+        job = {
+            'job_id': str(uuid.uuid4()),
+            'job_type': job_type,
+            'file_id': file_id,
+            'policy_id': policy_id,
+            'submitted_by': submitted_by,
+            'status': 'queued',
+            'result': None,
+            'error': None,
+            'created_at': datetime.utcnow().isoformat(),
+            'started_at': None,
+            'completed_at': None
+        }
+
+        try:
+            self._queue.put_nowait(job['job_id'])
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Analysis queue is full, please retry shortly")
+
+        await store.save(job)
+        logger.info(f"Queued {job_type} job {job['job_id']} for file {file_id}")
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return current job status"""
+        store = await self._get_store()
+        return await store.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue depth and worker counts"""
+        if self.store is None:
+            store = None
+        else:
+            store = "redis" if isinstance(self.store, RedisJobStore) else "memory"
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "store": store
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Analysis worker {index} failed on job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str):
+        store = await self._get_store()
+        job = await store.get(job_id)
+        if not job:
+            logger.warning(f"Analysis job {job_id} expired before it ran")
+            return
+
+        job['status'] = 'running'
+        job['started_at'] = datetime.utcnow().isoformat()
+        await store.save(job)
+
+        try:
+            result = await asyncio.wait_for(self._execute(job), timeout=self.timeout_seconds)
+            job['status'] = 'completed'
+            job['result'] = result
+        except asyncio.TimeoutError:
+            job['status'] = 'failed'
+            job['error'] = f"Analysis timed out after {self.timeout_seconds} seconds"
+            await self._mark_file_failed(job['file_id'])
+        except HTTPException as e:
+            job['status'] = 'failed'
+            job['error'] = e.detail
+            await self._mark_file_failed(job['file_id'])
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            await self._mark_file_failed(job['file_id'])
+
+        job['completed_at'] = datetime.utcnow().isoformat()
+        await store.save(job)
+        logger.info(f"Analysis job {job_id} finished with status {job['status']}")
+
+    async def _mark_file_failed(self, file_id: str):
+        """Move a file this job left in 'processing' to 'failed' so it is not stuck there"""
+        from models.file_metadata_dynamodb import FileMetadata
+
+        try:
+            file_metadata = await FileMetadata.find_by_id(file_id)
+            if file_metadata and file_metadata.processing_status == 'processing':
+                await file_metadata.update_processing_status('failed')
+        except Exception as e:
+            logger.error(f"Could not mark file {file_id} as failed: {str(e)}")
+
+    async def _execute(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the analysis and persist the result on the file and policy records"""
+        from models.file_metadata_dynamodb import FileMetadata
+        from services.ai_analysis_service_dynamodb import ai_analysis_service
+
+        file_metadata = await FileMetadata.find_by_id(job['file_id'])
+        if not file_metadata:
+            raise HTTPException(status_code=404, detail="File not found")
+
+        await file_metadata.update_processing_status('processing')
+
+        text_content = await ai_analysis_service.get_stored_file_text(file_metadata)
+        if not text_content.strip():
+            await file_metadata.update_processing_status('failed')
+            raise HTTPException(status_code=400, detail="No readable text found in the document")
+
+        if job['job_type'] == JOB_TYPE_TEA_SCORES:
+            tea_results = await ai_analysis_service.calculate_tea_scores_cached(text_content)
+            result = {
+                "tea_scores": tea_results.get("scores", {}),
+                "tea_analysis": {
+                    "transparency_analysis": tea_results.get("transparency_analysis", []),
+                    "explainability_analysis": tea_results.get("explainability_analysis", []),
+                    "accountability_analysis": tea_results.get("accountability_analysis", [])
+                },
+                "fallback_used": tea_results.get("fallback_used", False)
+            }
+        else:
+            result = await ai_analysis_service.analyze_policy_document_cached(text_content)
+
+        await file_metadata.update_processing_status('completed', ai_analysis=result)
+
+        policy_id = job.get('policy_id') or file_metadata.policy_id
+        if policy_id:
+            await self._store_on_policy(policy_id, job['job_type'], result)
+
+        return result
+
+    async def _store_on_policy(self, policy_id: str, job_type: str, result: Dict[str, Any]):
+        from models.policy_dynamodb import Policy
+
+        policy = await Policy.find_by_id(policy_id)
+        if not policy:
+            logger.warning(f"Policy {policy_id} not found - analysis result kept on file metadata only")
+            return
+
+        ai_analysis = dict(policy.ai_analysis or {})
+        ai_analysis[job_type] = result
+        ai_analysis['analyzed_at'] = datetime.utcnow().isoformat()
+        await policy.update({'ai_analysis': ai_analysis})
+
+
+# Create singleton instance
+analysis_job_service = AnalysisJobService()
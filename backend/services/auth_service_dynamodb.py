@@ -1,7 +1,6 @@
 """
 Authentication service for user management with DynamoDB.
 """
-import bcrypt
 import jwt
 import os
 import random
@@ -9,30 +8,38 @@ import string
 import re
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+from fastapi import HTTPException
 
 from config.dynamodb import get_dynamodb
 from config.settings import settings
+from utils.lazy_imports import lazy_import
 from models.user_dynamodb import User
+from models.verification_token_dynamodb import (
+    VerificationToken, PURPOSE_EMAIL_VERIFICATION, PURPOSE_PASSWORD_RESET, TOKEN_VALID, TOKEN_EXPIRED
+)
 from models.user import UserRegistration, UserLogin, GoogleAuthRequest, OTPVerification, PasswordReset, AdminLogin, UserResponse
 from services.email_service import email_service
-from utils.helpers import generate_otp
+from services.password_hash_service import password_hash_service
+from services.principal_cache_service import principal_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Google token verification is only needed for Google sign-in
+id_token = lazy_import("google.oauth2.id_token")
+google_requests = lazy_import("google.auth.transport.requests")
+
 class AuthService:
     def __init__(self):
         self.settings = settings
         
-    def hash_password(self, password: str) -> str:
-        """Hash a password using bcrypt"""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    async def hash_password(self, password: str) -> str:
+        """Hash a password using bcrypt on the password hashing pool"""
+        return await password_hash_service.hash_password(password)
     
-    def verify_password(self, password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash on the password hashing pool"""
+        return await password_hash_service.verify_password(password, hashed_password)
     
     def create_access_token(self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token"""
@@ -42,7 +49,7 @@ class AuthService:
         else:
             expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": expire, "iat": datetime.utcnow()})
         encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
         return encoded_jwt
     
@@ -79,15 +86,9 @@ class AuthService:
                 return {"status": "error", "message": "Failed to create user"}
             
             # Generate OTP for email verification
-            otp = generate_otp()
-            otp_expiry = datetime.utcnow() + timedelta(minutes=10)
-            
-            # Update user with OTP
-            await user.update({
-                'email_verification_otp': otp,
-                'otp_expiry': otp_expiry.isoformat(),
-                'is_email_verified': False
-            })
+            otp = await VerificationToken.issue(registration_data.email, PURPOSE_EMAIL_VERIFICATION)
+            if not otp:
+                return {"status": "error", "message": "Failed to create verification code"}
             
             # Send verification email using email service
             user_name = f"{registration_data.firstName} {registration_data.lastName}".strip()
@@ -131,21 +132,28 @@ class AuthService:
             
             return response
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Registration error: {str(e)}")
             return {"status": "error", "message": "Registration failed"}
     
-    async def login_user(self, login_data: UserLogin) -> Dict[str, Any]:
+    async def login_user(self, login_data: UserLogin, client_ip: Optional[str] = None) -> Dict[str, Any]:
         """Authenticate user login"""
         try:
+            password_hash_service.check_login_allowed(login_data.email, client_ip)
+            
             # Find user by email
             user = await User.find_by_email(login_data.email)
             if not user:
+                password_hash_service.record_login_failure(login_data.email, client_ip)
                 return {"status": "error", "message": "Invalid email or password"}
             
             # Verify password
-            if not user.verify_password(login_data.password):
+            if not await user.verify_password(login_data.password):
+                password_hash_service.record_login_failure(login_data.email, client_ip)
                 return {"status": "error", "message": "Invalid email or password"}
+            password_hash_service.record_login_success(login_data.email)
             
             # Check if user is active
             if not user.is_active:
@@ -179,6 +187,8 @@ class AuthService:
                 "token_type": "bearer"
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Login error: {str(e)}")
             return {"status": "error", "message": "Login failed"}
@@ -261,19 +271,16 @@ class AuthService:
             if not user:
                 return {"status": "error", "message": "User not found"}
             
-            # Check if OTP is valid and not expired
-            if user.email_verification_otp != otp_data.otp:
-                return {"status": "error", "message": "Invalid OTP"}
-            
-            if user.otp_expiry and datetime.fromisoformat(user.otp_expiry) < datetime.utcnow():
+            # Check if OTP is valid and not expired (consumed on success)
+            result = await VerificationToken.consume(otp_data.email, PURPOSE_EMAIL_VERIFICATION, otp_data.otp)
+            if result == TOKEN_EXPIRED:
                 return {"status": "error", "message": "OTP has expired"}
+            if result != TOKEN_VALID:
+                return {"status": "error", "message": "Invalid OTP"}
             
             # Verify email
-            await user.update({
-                'is_email_verified': True,
-                'email_verification_otp': None,
-                'otp_expiry': None
-            })
+            await user.update({'is_email_verified': True})
+            principal_cache.invalidate_user(user.user_id)
             
             return {
                 "status": "success",
@@ -299,15 +306,10 @@ class AuthService:
             if user.is_email_verified:
                 return {"status": "error", "message": "Email is already verified"}
             
-            # Generate new OTP
-            otp = generate_otp()
-            otp_expiry = datetime.utcnow() + timedelta(minutes=10)
-            
-            # Update user with new OTP
-            await user.update({
-                'email_verification_otp': otp,
-                'otp_expiry': otp_expiry.isoformat()
-            })
+            # Generate new OTP (replaces the previous one)
+            otp = await VerificationToken.issue(email, PURPOSE_EMAIL_VERIFICATION)
+            if not otp:
+                return {"status": "error", "message": "Failed to resend OTP"}
             
             # Send verification email using email service
             email_sent = await email_service.send_verification_email(
@@ -344,14 +346,9 @@ class AuthService:
                 return {"status": "success", "message": "Password reset email sent if account exists"}
             
             # Generate OTP for password reset
-            otp = generate_otp()
-            otp_expiry = datetime.utcnow() + timedelta(minutes=10)
-            
-            # Update user with reset OTP
-            await user.update({
-                'password_reset_otp': otp,
-                'password_reset_otp_expiry': otp_expiry.isoformat()
-            })
+            otp = await VerificationToken.issue(email, PURPOSE_PASSWORD_RESET)
+            if not otp:
+                return {"status": "error", "message": "Failed to process password reset"}
             
             # Send reset email using email service
             email_sent = await email_service.send_password_reset_email(
@@ -386,38 +383,37 @@ class AuthService:
             if not user:
                 return {"status": "error", "message": "User not found"}
             
-            # Check if OTP is valid and not expired
-            if user.password_reset_otp != reset_data.otp:
-                return {"status": "error", "message": "Invalid reset code"}
-            
-            if (user.password_reset_otp_expiry and 
-                datetime.fromisoformat(user.password_reset_otp_expiry) < datetime.utcnow()):
-                return {"status": "error", "message": "Reset code has expired"}
-            
-            # Check if new password matches confirmation
+            # Check if new password matches confirmation before the code is used up
             if reset_data.newPassword != reset_data.confirmPassword:
                 return {"status": "error", "message": "Passwords do not match"}
             
-            # Update password and clear reset OTP
-            new_password_hash = self.hash_password(reset_data.newPassword)
-            await user.update({
-                'password': new_password_hash,
-                'password_reset_otp': None,
-                'password_reset_otp_expiry': None
-            })
+            # Check if OTP is valid and not expired (consumed on success)
+            result = await VerificationToken.consume(reset_data.email, PURPOSE_PASSWORD_RESET, reset_data.otp)
+            if result == TOKEN_EXPIRED:
+                return {"status": "error", "message": "Reset code has expired"}
+            if result != TOKEN_VALID:
+                return {"status": "error", "message": "Invalid reset code"}
+            
+            # Update password
+            new_password_hash = await self.hash_password(reset_data.newPassword)
+            await user.update({'password_hash': new_password_hash})
             
             return {
                 "status": "success",
                 "message": "Password reset successfully"
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Reset password error: {str(e)}")
             return {"status": "error", "message": "Password reset failed"}
     
-    async def admin_login(self, login_data: AdminLogin) -> Dict[str, Any]:
+    async def admin_login(self, login_data: AdminLogin, client_ip: Optional[str] = None) -> Dict[str, Any]:
         """Admin login with enhanced security"""
         try:
+            password_hash_service.check_login_allowed(login_data.email, client_ip)
+            
             # Check super admin credentials
             if (login_data.email == settings.SUPER_ADMIN_EMAIL and
                 login_data.password == settings.SUPER_ADMIN_PASSWORD):
@@ -465,10 +461,13 @@ class AuthService:
             # Regular admin login
             user = await User.find_by_email(login_data.email)
             if not user or user.role not in ['admin', 'super_admin']:
+                password_hash_service.record_login_failure(login_data.email, client_ip)
                 return {"status": "error", "message": "Invalid admin credentials"}
             
-            if not user.verify_password(login_data.password):
+            if not await user.verify_password(login_data.password):
+                password_hash_service.record_login_failure(login_data.email, client_ip)
                 return {"status": "error", "message": "Invalid admin credentials"}
+            password_hash_service.record_login_success(login_data.email)
             
             # Update last login
             await user.update({
@@ -494,6 +493,8 @@ class AuthService:
                 "token_type": "bearer"
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Admin login error: {str(e)}")
             return {"status": "error", "message": "Admin login failed"}
@@ -531,18 +532,20 @@ class AuthService:
                 return {"status": "error", "message": "User not found"}
             
             # Verify current password
-            if user.password_hash and not user.verify_password(current_password):
+            if user.password_hash and not await user.verify_password(current_password):
                 return {"status": "error", "message": "Current password is incorrect"}
             
             # Update password
-            new_password_hash = self.hash_password(new_password)
-            await user.update({'password': new_password_hash})
+            new_password_hash = await self.hash_password(new_password)
+            await user.update({'password_hash': new_password_hash})
             
             return {
                 "status": "success",
                 "message": "Password changed successfully"
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Change password error: {str(e)}")
             return {"status": "error", "message": "Failed to change password"}
@@ -560,6 +563,7 @@ class AuthService:
             
             if update_data:
                 await user.update(update_data)
+                principal_cache.invalidate_user(user_id)
             
             return {
                 "status": "success",
@@ -577,22 +581,25 @@ class AuthService:
             if not user:
                 return {"status": "error", "message": "User not found"}
             
+            verification_otp = await VerificationToken.peek(email, PURPOSE_EMAIL_VERIFICATION)
+            password_reset_otp = await VerificationToken.peek(email, PURPOSE_PASSWORD_RESET)
+            
             # Return both email verification OTP and password reset OTP
             response = {
                 "status": "success",
                 "email": email,
-                "verification_otp": user.email_verification_otp,
-                "password_reset_otp": getattr(user, 'password_reset_otp', None)
+                "verification_otp": verification_otp,
+                "password_reset_otp": password_reset_otp
             }
             
             # Also log the OTP for easy access during development
-            if user.email_verification_otp:
-                logger.info(f"🔑 EMAIL VERIFICATION OTP for {email}: {user.email_verification_otp}")
-                print(f"🔑 EMAIL VERIFICATION OTP for {email}: {user.email_verification_otp}")
+            if verification_otp:
+                logger.info(f"🔑 EMAIL VERIFICATION OTP for {email}: {verification_otp}")
+                print(f"🔑 EMAIL VERIFICATION OTP for {email}: {verification_otp}")
             
-            if hasattr(user, 'password_reset_otp') and user.password_reset_otp:
-                logger.info(f"🔑 PASSWORD RESET OTP for {email}: {user.password_reset_otp}")
-                print(f"🔑 PASSWORD RESET OTP for {email}: {user.password_reset_otp}")
+            if password_reset_otp:
+                logger.info(f"🔑 PASSWORD RESET OTP for {email}: {password_reset_otp}")
+                print(f"🔑 PASSWORD RESET OTP for {email}: {password_reset_otp}")
             
             return response
             
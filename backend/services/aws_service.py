@@ -14,14 +14,17 @@ from botocore.exceptions import ClientError, NoCredentialsError
 import json
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
-import redis
-from PIL import Image
 import io
 from pathlib import Path
 from dotenv import load_dotenv
+from utils.lazy_imports import lazy_import
 
 logger = logging.getLogger(__name__)
 
+# Imported on first use: the Redis client and image optimization
+redis = lazy_import("redis")
+Image = lazy_import("PIL.Image")
+
 # Load environment variables from the backend directory
 current_dir = Path(__file__).parent
 backend_dir = current_dir.parent
@@ -106,23 +109,9 @@ class AWSService:
             logger.error("AWS credentials not found")
             raise
         
-        # Initialize Redis for caching (optional)
-        try:
-            # Create Redis client but don't test connection during init
-            self.redis_client = redis.Redis(
-                host=os.getenv('REDIS_HOST', 'localhost'),
-                port=int(os.getenv('REDIS_PORT', 6379)),
-                db=0,
-                decode_responses=True,
-                socket_connect_timeout=1,  # Quick timeout
-                socket_timeout=1
-            )
-            self.cache_enabled = True
-            logger.info("Redis client created, caching enabled (will test on first use)")
-        except Exception as e:
-            logger.warning(f"Redis client creation failed ({str(e)}), caching disabled")
-            self.redis_client = None
-            self.cache_enabled = False
+        # Redis for caching (optional); the client is created on first use, see redis_client
+        self._redis_client = None
+        self.cache_enabled = True
         
         # Thread pool for async operations
         self.executor = ThreadPoolExecutor(max_workers=10)
@@ -137,6 +126,30 @@ class AWSService:
         
         self.max_file_size = 50 * 1024 * 1024  # 50MB
         
+    @property
+    def redis_client(self):
+        """Redis client, created on first use so redis isn't imported when the singleton is"""
+        if self.cache_enabled and self._redis_client is None:
+            try:
+                # Create Redis client but don't test connection here
+                self._redis_client = redis.Redis(
+                    host=os.getenv('REDIS_HOST', 'localhost'),
+                    port=int(os.getenv('REDIS_PORT', 6379)),
+                    db=0,
+                    decode_responses=True,
+                    socket_connect_timeout=1,  # Quick timeout
+                    socket_timeout=1
+                )
+                logger.info("Redis client created, caching enabled (will test on first use)")
+            except Exception as e:
+                logger.warning(f"Redis client creation failed ({str(e)}), caching disabled")
+                self.cache_enabled = False
+        return self._redis_client
+
+    @redis_client.setter
+    def redis_client(self, client):
+        self._redis_client = client
+
     def _test_redis_connection(self):
         """Test Redis connection on first use and disable if it fails"""
         if not self.cache_enabled or not self.redis_client:
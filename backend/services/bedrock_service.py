@@ -5,34 +5,113 @@ Calculates Transparency, Explainability, and Accountability scores
 import boto3
 import json
 import logging
-from typing import Dict, Any, Optional
+import re
+import time
+from typing import Dict, Any, List, Optional
 import os
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
+from config.settings import settings
+from services.analysis_cache_service import version_fingerprint
+from services.model_router import ModelRouter
+from utils.keyword_scorer import KeywordScorer
 
 logger = logging.getLogger(__name__)
 
+# Errors that mean a model cannot serve this account/region - cached so the model is skipped
+PERMANENT_BEDROCK_ERRORS = {'AccessDeniedException', 'ValidationException', 'ResourceNotFoundException'}
+
+# Lines that start a new section: "Section 3", "Article 12", "2.1 Scope", "PART II - OVERSIGHT"
+SECTION_HEADING_PATTERN = re.compile(
+    r'^\s*(?:(?i:section|article|chapter|part|annex|schedule)\s+[\w.]+'
+    r'|\d+(?:\.\d+)*[.)]?\s+[A-Z]'
+    r'|[A-Z][A-Z0-9 ,&()/-]{3,}$)'
+)
+
+# Keyword sets for the fallback scorer when no Bedrock model is available
+TEA_KEYWORD_SETS = {
+    'transparency_score': [
+        # Public access keywords
+        'public', 'publicly', 'accessible', 'available', 'open', 'transparent',
+        # Stakeholder keywords
+        'stakeholder', 'consultation', 'feedback', 'input', 'participation',
+        # Data/reporting keywords
+        'data', 'report', 'reporting', 'publish', 'disclosure', 'disclose',
+        # Process keywords
+        'process', 'procedure', 'method', 'criteria', 'algorithm'
+    ],
+    'explainability_score': [
+        # Human interpretability
+        'interpretable', 'understandable', 'explainable', 'clear', 'readable',
+        # Explanations
+        'explain', 'explanation', 'clarify', 'description', 'rationale',
+        # Documentation
+        'document', 'documentation', 'record', 'log', 'trace',
+        # User information
+        'inform', 'information', 'notify', 'communicate', 'guidance'
+    ],
+    'accountability_score': [
+        # Responsibility
+        'responsible', 'responsibility', 'liable', 'liability', 'accountable',
+        # Oversight
+        'audit', 'auditing', 'oversight', 'supervision', 'monitoring',
+        # Redress
+        'appeal', 'redress', 'complaint', 'grievance', 'remedy',
+        # Governance
+        'govern', 'governance', 'regulatory', 'authority', 'body', 'committee'
+    ]
+}
+
+
+def _is_permanent_bedrock_error(error: Exception) -> bool:
+    return isinstance(error, ClientError) and error.response['Error']['Code'] in PERMANENT_BEDROCK_ERRORS
+
+
 class BedrockService:
+    # Models in order of preference (updated for current AWS Bedrock)
+    MODEL_IDS = [
+        "us.anthropic.claude-3-5-haiku-20241022-v1:0",   # Claude 3.5 Haiku inference profile - WORKING!
+        "us.anthropic.claude-3-5-sonnet-20241022-v2:0",  # Claude 3.5 Sonnet inference profile
+        "anthropic.claude-3-sonnet-20240229-v1:0",       # Claude 3 Sonnet (if you have access)
+        "anthropic.claude-3-haiku-20240307-v1:0",        # Claude 3 Haiku (if you have access)
+    ]
+
+    # Longest document text sent in a single scoring prompt
+    MAX_PROMPT_DOCUMENT_CHARS = 8000
+
     def __init__(self):
         """Initialize Bedrock client"""
-        try:
-            # Initialize Bedrock client
-            self.bedrock_client = boto3.client(
-                'bedrock-runtime',
-                region_name=os.getenv('AWS_REGION', 'us-east-1'),
-                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-            )
-            logger.info("Bedrock service initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize Bedrock service: {str(e)}")
-            self.bedrock_client = None
-
-    def calculate_transparency_explainability_accountability_scores(self, document_text: str) -> Dict[str, Any]:
+        self.model_router = ModelRouter("bedrock", self.MODEL_IDS, is_permanent_error=_is_permanent_bedrock_error)
+        self.keyword_scorer = KeywordScorer(TEA_KEYWORD_SETS)
+        self._bedrock_client = None
+        self._client_initialized = False
+
+    @property
+    def bedrock_client(self):
+        """Bedrock runtime client, created on first use (loading its service model is slow)"""
+        if not self._client_initialized:
+            self._client_initialized = True
+            try:
+                self._bedrock_client = boto3.client(
+                    'bedrock-runtime',
+                    region_name=os.getenv('AWS_REGION', 'us-east-1'),
+                    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+                    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
+                )
+                logger.info("Bedrock service initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize Bedrock service: {str(e)}")
+        return self._bedrock_client
+
+    def calculate_transparency_explainability_accountability_scores(self, document_text: str,
+                                                                   chunked: Optional[bool] = None) -> Dict[str, Any]:
         """
         Calculate Transparency, Explainability, and Accountability scores based on document analysis
         
         Args:
             document_text: The extracted text from the policy document
+            chunked: Score section chunks separately and merge them. Defaults to chunking
+                     only documents longer than a single prompt can hold.
             
         Returns:
             Dictionary containing the three scores and detailed analysis
@@ -46,6 +125,12 @@ class BedrockService:
                 "error": "Bedrock service not available"
             }
         
+        if chunked is None:
+            chunked = len(document_text) > self.MAX_PROMPT_DOCUMENT_CHARS
+        
+        if chunked:
+            return self._calculate_chunked_scores(document_text)
+        
         try:
             # Create comprehensive prompt for scoring
             prompt = self._create_scoring_prompt(document_text)
@@ -63,10 +148,17 @@ class BedrockService:
             logger.error(f"Error calculating scores: {str(e)}")
             return self._get_default_scores(f"Analysis failed: {str(e)}")
 
+    def get_cache_version(self) -> str:
+        """Version tag for cached scores - changes whenever the prompt or model chain changes"""
+        return version_fingerprint(
+            self._create_scoring_prompt(""), *self.MODEL_IDS,
+            str(settings.TEA_CHUNK_SIZE_CHARS), str(settings.TEA_MAX_CHUNKS)
+        )
+
     def _create_scoring_prompt(self, document_text: str) -> str:
         """Create detailed prompt for scoring the document"""
         # Truncate document if too long for better analysis
-        max_length = 8000
+        max_length = self.MAX_PROMPT_DOCUMENT_CHARS
         if len(document_text) > max_length:
             document_text = document_text[:max_length] + "... [Document truncated for analysis]"
         
@@ -168,98 +260,14 @@ Analyze the document carefully and provide accurate, evidence-based answers. If
         return prompt
 
     def _call_bedrock_claude(self, prompt: str) -> Optional[Dict[str, Any]]:
-        """Call Bedrock with Claude model"""
+        """Call Bedrock with Claude model, routed to the fastest healthy model"""
         try:
-            # Try multiple models in order of preference (updated for current AWS Bedrock)
-            models = [
-                "us.anthropic.claude-3-5-haiku-20241022-v1:0",   # Claude 3.5 Haiku inference profile - WORKING!
-                "us.anthropic.claude-3-5-sonnet-20241022-v2:0",  # Claude 3.5 Sonnet inference profile
-                "anthropic.claude-3-sonnet-20240229-v1:0",       # Claude 3 Sonnet (if you have access)
-                "anthropic.claude-3-haiku-20240307-v1:0",        # Claude 3 Haiku (if you have access)
-            ]
-            
-            for model_id in models:
-                try:
-                    logger.info(f"Trying model: {model_id}")
-                    
-                    # Prepare the request body based on model type
-                    if "claude-3" in model_id:
-                        # Claude 3 format
-                        body = {
-                            "anthropic_version": "bedrock-2023-05-31",
-                            "max_tokens": 4000,
-                            "temperature": 0.1,
-                            "messages": [
-                                {
-                                    "role": "user",
-                                    "content": prompt
-                                }
-                            ]
-                        }
-                    else:
-                        # Claude 2 format
-                        body = {
-                            "prompt": f"\n\nHuman: {prompt}\n\nAssistant:",
-                            "max_tokens_to_sample": 4000,
-                            "temperature": 0.1,
-                            "stop_sequences": ["\n\nHuman:"]
-                        }
-                    
-                    # Make the request
-                    response = self.bedrock_client.invoke_model(
-                        modelId=model_id,
-                        body=json.dumps(body),
-                        contentType="application/json",
-                        accept="application/json"
-                    )
-                    
-                    # Parse the response
-                    response_body = json.loads(response['body'].read())
-                    
-                    if "claude-3" in model_id:
-                        ai_response = response_body.get('content', [{}])[0].get('text', '')
-                    else:
-                        ai_response = response_body.get('completion', '')
-                    
-                    logger.info(f"Received response from {model_id}: {ai_response[:200]}...")
-                    
-                    # Parse JSON from response
-                    try:
-                        # Extract JSON from the response
-                        import re
-                        json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-                        if json_match:
-                            json_str = json_match.group()
-                            result = json.loads(json_str)
-                            
-                            # Validate and calculate final scores
-                            scores = self._calculate_final_scores(result)
-                            result['scores'] = scores
-                            
-                            logger.info(f"Successfully used model: {model_id}")
-                            return result
-                        else:
-                            logger.warning(f"No JSON found in response from {model_id}")
-                            continue
-                            
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Failed to parse JSON from {model_id}: {e}")
-                        continue
-                        
-                except ClientError as e:
-                    error_code = e.response['Error']['Code']
-                    if error_code == 'AccessDeniedException':
-                        logger.warning(f"No access to model {model_id}, trying next model")
-                        continue
-                    elif error_code == 'ValidationException':
-                        logger.warning(f"Model {model_id} not available in region, trying next model")
-                        continue
-                    else:
-                        logger.error(f"Bedrock API error with {model_id}: {e}")
-                        continue
-                except Exception as e:
-                    logger.warning(f"Error with {model_id}: {e}, trying next model")
-                    continue
+            model_id, result = self.model_router.call_sync(
+                lambda model_id: self._invoke_claude_model(model_id, prompt)
+            )
+            if result:
+                logger.info(f"Successfully used model: {model_id}")
+                return result
             
             # If all models fail, try fallback analysis
             logger.error("All Bedrock models failed, attempting fallback analysis")
@@ -269,6 +277,191 @@ Analyze the document carefully and provide accurate, evidence-based answers. If
             logger.error(f"Unexpected error in Bedrock call: {e}")
             return self._fallback_analysis(prompt)
 
+    def _invoke_claude_model(self, model_id: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """
+        Invoke a single Bedrock model.
+        Returns the parsed analysis, None if the response held no usable JSON, and raises on API errors.
+        """
+        logger.info(f"Trying model: {model_id}")
+        
+        # Prepare the request body based on model type
+        if "claude-3" in model_id:
+            # Claude 3 format
+            body = {
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": 4000,
+                "temperature": 0.1,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ]
+            }
+        else:
+            # Claude 2 format
+            body = {
+                "prompt": f"\n\nHuman: {prompt}\n\nAssistant:",
+                "max_tokens_to_sample": 4000,
+                "temperature": 0.1,
+                "stop_sequences": ["\n\nHuman:"]
+            }
+        
+        try:
+            # Make the request
+            response = self.bedrock_client.invoke_model(
+                modelId=model_id,
+                body=json.dumps(body),
+                contentType="application/json",
+                accept="application/json"
+            )
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            if error_code == 'AccessDeniedException':
+                logger.warning(f"No access to model {model_id}, trying next model")
+            elif error_code == 'ValidationException':
+                logger.warning(f"Model {model_id} not available in region, trying next model")
+            else:
+                logger.error(f"Bedrock API error with {model_id}: {e}")
+            raise
+        
+        # Parse the response
+        response_body = json.loads(response['body'].read())
+        
+        if "claude-3" in model_id:
+            ai_response = response_body.get('content', [{}])[0].get('text', '')
+        else:
+            ai_response = response_body.get('completion', '')
+        
+        logger.info(f"Received response from {model_id}: {ai_response[:200]}...")
+        
+        # Extract JSON from the response
+        json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
+        if not json_match:
+            logger.warning(f"No JSON found in response from {model_id}")
+            return None
+        
+        try:
+            result = json.loads(json_match.group())
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse JSON from {model_id}: {e}")
+            return None
+        
+        # Validate and calculate final scores
+        result['scores'] = self._calculate_final_scores(result)
+        result['usage'] = response_body.get('usage', {})
+        return result
+
+    def _calculate_chunked_scores(self, document_text: str) -> Dict[str, Any]:
+        """Map-reduce scoring: score section chunks concurrently, then merge per-question evidence"""
+        chunks = self._split_into_sections(document_text, settings.TEA_CHUNK_SIZE_CHARS)
+        if len(chunks) > settings.TEA_MAX_CHUNKS:
+            logger.warning(f"Document split into {len(chunks)} chunks, scoring the first {settings.TEA_MAX_CHUNKS}")
+            chunks = chunks[:settings.TEA_MAX_CHUNKS]
+        
+        logger.info(f"Scoring document in {len(chunks)} chunks")
+        
+        with ThreadPoolExecutor(max_workers=settings.TEA_CHUNK_CONCURRENCY) as executor:
+            chunk_results = list(executor.map(self._score_chunk, range(len(chunks)), chunks))
+        
+        analyses = [analysis for analysis, _ in chunk_results if analysis]
+        chunk_metrics = [metrics for _, metrics in chunk_results]
+        
+        if not analyses:
+            logger.error("All chunks failed, attempting fallback analysis")
+            return self._fallback_analysis(self._create_scoring_prompt(document_text))
+        
+        result = self._merge_chunk_analyses(analyses)
+        result['scores'] = self._calculate_final_scores(result)
+        result['chunked'] = True
+        result['chunk_metrics'] = chunk_metrics
+        result['usage'] = {
+            "input_tokens": sum(metrics.get('input_tokens', 0) for metrics in chunk_metrics),
+            "output_tokens": sum(metrics.get('output_tokens', 0) for metrics in chunk_metrics)
+        }
+        return result
+
+    def _score_chunk(self, index: int, chunk: str):
+        """Score one chunk; returns (analysis or None, metrics)"""
+        started = time.monotonic()
+        prompt = self._create_scoring_prompt(chunk)
+        try:
+            model_id, analysis = self.model_router.call_sync(
+                lambda model_id: self._invoke_claude_model(model_id, prompt)
+            )
+        except Exception as e:
+            logger.error(f"Chunk {index} scoring failed: {e}")
+            model_id, analysis = None, None
+        
+        usage = analysis.pop('usage', {}) if analysis else {}
+        metrics = {
+            "chunk": index,
+            "characters": len(chunk),
+            "status": "completed" if analysis else "failed",
+            "model_id": model_id,
+            "input_tokens": usage.get('input_tokens', 0),
+            "output_tokens": usage.get('output_tokens', 0),
+            "latency_seconds": round(time.monotonic() - started, 3)
+        }
+        logger.info(f"Chunk {index} scored: {metrics}")
+        return analysis, metrics
+
+    def _merge_chunk_analyses(self, analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge per-chunk answers question by question. Evidence anywhere in the document counts,
+        so each question keeps the highest-scoring chunk answer and its justification.
+        """
+        merged = {}
+        for section in ('transparency_analysis', 'explainability_analysis', 'accountability_analysis'):
+            # The prompt fixes question order, so answers are matched by position
+            best_answers = []
+            for analysis in analyses:
+                for position, item in enumerate(analysis.get(section, [])):
+                    if position >= len(best_answers):
+                        best_answers.append(item)
+                    elif item.get('score', 0) > best_answers[position].get('score', 0):
+                        best_answers[position] = item
+            merged[section] = best_answers
+        return merged
+
+    def _split_into_sections(self, document_text: str, max_chars: int) -> List[str]:
+        """Split text at section headings, then pack sections into chunks of at most max_chars"""
+        sections, current = [], []
+        for line in document_text.splitlines():
+            if current and SECTION_HEADING_PATTERN.match(line):
+                sections.append("\n".join(current))
+                current = []
+            current.append(line)
+        if current:
+            sections.append("\n".join(current))
+        
+        chunks, buffer = [], ""
+        for section in sections:
+            for piece in self._split_oversized_section(section, max_chars):
+                if buffer and len(buffer) + len(piece) + 1 > max_chars:
+                    chunks.append(buffer)
+                    buffer = piece
+                else:
+                    buffer = f"{buffer}\n{piece}" if buffer else piece
+        if buffer:
+            chunks.append(buffer)
+        
+        return [chunk for chunk in chunks if chunk.strip()]
+
+    def _split_oversized_section(self, section: str, max_chars: int) -> List[str]:
+        """Break a section longer than max_chars at paragraph boundaries, hard-splitting long paragraphs"""
+        if len(section) <= max_chars:
+            return [section]
+        
+        pieces = []
+        for paragraph in re.split(r'\n\s*\n', section):
+            while len(paragraph) > max_chars:
+                pieces.append(paragraph[:max_chars])
+                paragraph = paragraph[max_chars:]
+            if paragraph:
+                pieces.append(paragraph)
+        return pieces
+
     def _calculate_final_scores(self, analysis_result: Dict[str, Any]) -> Dict[str, int]:
         """Calculate final scores from analysis results"""
         try:
@@ -295,17 +488,17 @@ Analyze the document carefully and provide accurate, evidence-based answers. If
             logger.info("Using fallback keyword-based analysis")
             
             # Extract document text from prompt
-            import re
             doc_match = re.search(r'DOCUMENT TEXT:\s*(.*?)\s*Please carefully read', prompt, re.DOTALL)
             if not doc_match:
                 return self._get_default_scores("Could not extract document text for fallback analysis")
             
             document_text = doc_match.group(1).lower()
             
-            # Keyword-based scoring
-            transparency_score = self._analyze_transparency_keywords(document_text)
-            explainability_score = self._analyze_explainability_keywords(document_text)
-            accountability_score = self._analyze_accountability_keywords(document_text)
+            # Keyword-based scoring - one pass over the text for all three keyword sets
+            keyword_scores = self.keyword_scorer.score(document_text)
+            transparency_score = keyword_scores['transparency_score']
+            explainability_score = keyword_scores['explainability_score']
+            accountability_score = keyword_scores['accountability_score']
             
             # Create structured response
             result = {
@@ -345,68 +538,22 @@ Analyze the document carefully and provide accurate, evidence-based answers. If
             logger.error(f"Fallback analysis failed: {e}")
             return self._get_default_scores("Fallback analysis failed")
 
-    def _analyze_transparency_keywords(self, text: str) -> int:
-        """Analyze transparency using keyword matching"""
-        transparency_keywords = [
-            # Public access keywords
-            'public', 'publicly', 'accessible', 'available', 'open', 'transparent',
-            # Stakeholder keywords  
-            'stakeholder', 'consultation', 'feedback', 'input', 'participation',
-            # Data/reporting keywords
-            'data', 'report', 'reporting', 'publish', 'disclosure', 'disclose',
-            # Process keywords
-            'process', 'procedure', 'method', 'criteria', 'algorithm'
-        ]
-        
-        score = 0
-        for keyword in transparency_keywords:
-            if keyword in text:
-                score += 1
-        
-        # Normalize to 0-10 scale
-        return min(10, max(0, score // 2))
-
-    def _analyze_explainability_keywords(self, text: str) -> int:
-        """Analyze explainability using keyword matching"""
-        explainability_keywords = [
-            # Human interpretability
-            'interpretable', 'understandable', 'explainable', 'clear', 'readable',
-            # Explanations
-            'explain', 'explanation', 'clarify', 'description', 'rationale',
-            # Documentation
-            'document', 'documentation', 'record', 'log', 'trace',
-            # User information
-            'inform', 'information', 'notify', 'communicate', 'guidance'
-        ]
-        
-        score = 0
-        for keyword in explainability_keywords:
-            if keyword in text:
-                score += 1
-        
-        # Normalize to 0-10 scale
-        return min(10, max(0, score // 2))
-
-    def _analyze_accountability_keywords(self, text: str) -> int:
-        """Analyze accountability using keyword matching"""
-        accountability_keywords = [
-            # Responsibility
-            'responsible', 'responsibility', 'liable', 'liability', 'accountable',
-            # Oversight
-            'audit', 'auditing', 'oversight', 'supervision', 'monitoring',
-            # Redress
-            'appeal', 'redress', 'complaint', 'grievance', 'remedy',
-            # Governance
-            'govern', 'governance', 'regulatory', 'authority', 'body', 'committee'
-        ]
-        
-        score = 0
-        for keyword in accountability_keywords:
-            if keyword in text:
-                score += 1
-        
-        # Normalize to 0-10 scale
-        return min(10, max(0, score // 2))
+    def score_documents_by_keywords(self, documents: List[str]) -> List[Dict[str, int]]:
+        """
+        Keyword-score many documents in one batch, e.g. to re-score the corpus after
+        the keyword sets change
+
+        Returns:
+            One dict of transparency/explainability/accountability scores per document
+        """
+        return self.keyword_scorer.score_batch(documents)
+
+    def update_keyword_sets(self, keyword_sets: Dict[str, List[str]]):
+        """Replace the fallback keyword sets (keys must match TEA_KEYWORD_SETS)"""
+        if set(keyword_sets) != set(TEA_KEYWORD_SETS):
+            raise ValueError(f"Keyword sets must define exactly: {', '.join(TEA_KEYWORD_SETS)}")
+        self.keyword_scorer = KeywordScorer(keyword_sets)
+        logger.info("Fallback keyword sets updated")
 
     def _get_default_scores(self, error_message: str) -> Dict[str, Any]:
         """Return default scores when analysis fails"""
@@ -10,13 +10,29 @@ import httpx
 import asyncio
 import re
 import random
+from collections import Counter
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from dotenv import load_dotenv
 
 from models.chat import ChatMessage, ChatRequest, ChatResponse, ChatConversation
+from boto3.dynamodb.conditions import Key
 from config.dynamodb import get_dynamodb
 from utils.helpers import convert_objectid
+from services.model_router import ModelRouter, ModelUnavailableError
+from utils.pagination import encode_cursor, decode_cursor
+from utils.spelling import SpellingCorrector
+from utils.intent_classifier import load_or_train
+from utils.policy_index import PolicyIndex
+from services.policy_quality_service import policy_quality
+from config.settings import settings
+
+# Session attributes the conversation list renders; title, message_count and last_message are
+# written with each save and projected into user-updated-index, so listing never reads the messages array
+CONVERSATION_LIST_FIELDS = ('session_id', 'user_id', 'title', 'created_at', 'updated_at', 'message_count', 'last_message')
+
+# Owner recorded on conversations started without a user, so they are listed from the same index
+ANONYMOUS_OWNER = 'anonymous'
 
 # Load environment variables
 env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
@@ -35,10 +51,15 @@ class EnhancedChatbotService:
         self.groq_api_key = os.getenv('GROQ_API_KEY')
         self.groq_api_url = os.getenv('GROQ_API_URL', "https://api.groq.com/openai/v1/chat/completions")
         
+        # Route between providers by health and latency (OpenAI preferred on ties)
+        self.ai_router = ModelRouter("chat", ["openai", "groq"])
+        
         # Policy data cache for faster responses
         self.policy_cache = None
         self.countries_cache = None
         self.areas_cache = None
+        # Country -> area grouping of policy_cache, rebuilt with it
+        self.policy_index = PolicyIndex([])
         self.last_cache_update = None
         self.cache_duration = 21600  # 6 hours for longer cache retention
         
@@ -50,6 +71,10 @@ class EnhancedChatbotService:
             'awesome', 'perfect', 'no', 'nope', 'yes', 'yeah', 'yep', 'sure'
         ]
         
+        # Intent classifier, loaded in the background at startup; until then (and for
+        # low-confidence predictions) messages are routed by the keyword rules below
+        self.intent_classifier = None
+        
         # Help keywords
         self.help_keywords = ['help', 'what can you do', 'assist', 'guide', 'support', 'how to use']
         
@@ -193,6 +218,29 @@ class EnhancedChatbotService:
             'pleae': 'please',
             'plese': 'please'
         }
+        
+        # Multi-word corrections, applied in the same pass as the word corrections
+        self.phrase_corrections = {
+            'thank u': 'thank you',
+            'thnk u': 'thank you', 
+            'thnk you': 'thank you',
+            'thanx u': 'thank you',
+            'good mornig': 'good morning',
+            'good evning': 'good evening',
+            'good afernoon': 'good afternoon',
+            'good afteroon': 'good afternoon',
+            'artifical intelligence': 'artificial intelligence',
+            'cyber saftey': 'cybersafety',
+            'cyber safty': 'cybersafety',
+            'ai safty': 'ai safety',
+            'ai saftey': 'ai safety',
+            'comparision between': 'comparison between',
+            'diference between': 'difference between',
+            'beetween countries': 'between countries'
+        }
+        
+        # Keyword lists only until the policy cache adds countries, areas and policy vocabulary
+        self.spell_corrector = self._build_spell_corrector([], [], [])
 
     async def get_db(self):
         """Get DynamoDB connection"""
@@ -225,6 +273,7 @@ class EnhancedChatbotService:
                 self.policy_cache = []
                 self.countries_cache = []
                 self.areas_cache = []
+                self.policy_index = PolicyIndex([])
                 return
             
             # Process and cache policy data
@@ -233,6 +282,8 @@ class EnhancedChatbotService:
             areas_set = set()
             
             processed_count = 0
+            # Policies saved before the quality rules (or under older ones) are checked here
+            unchecked_count = 0
             for policy in all_policies:
                 try:
                     if policy.get('status') in ['approved', 'master']:
@@ -248,6 +299,9 @@ class EnhancedChatbotService:
                             
                             for p in area.get('policies', []):
                                 if p.get('status') == 'approved' or policy.get('status') == 'master':
+                                    if not policy_quality.is_current(p):
+                                        policy_quality.check_policy(p, country)
+                                        unchecked_count += 1
                                     policy_data = {
                                         'country': country,
                                         'area_name': area_name,
@@ -258,7 +312,8 @@ class EnhancedChatbotService:
                                         'participation': p.get('participation', ''),
                                         'policy_id': policy.get('policy_id'),
                                         'created_at': policy.get('created_at'),
-                                        'approved_at': p.get('approved_at')
+                                        'approved_at': p.get('approved_at'),
+                                        'quality_ok': p['quality_ok']
                                     }
                                     self.policy_cache.append(policy_data)
                                     processed_count += 1
@@ -268,9 +323,17 @@ class EnhancedChatbotService:
             
             self.countries_cache = sorted(list(countries_set))
             self.areas_cache = sorted(list(areas_set))
+            self.policy_index = PolicyIndex(self.policy_cache)
             self.last_cache_update = current_time
             
+            # Rebuild the spelling dictionary with the new vocabulary off the event loop
+            self.spell_corrector = await asyncio.get_running_loop().run_in_executor(
+                None, self._build_spell_corrector, self.countries_cache, self.areas_cache, self.policy_cache
+            )
+            
             print(f"✅ Cache updated: {len(self.policy_cache)} policies, {len(self.countries_cache)} countries, {len(self.areas_cache)} areas")
+            if unchecked_count:
+                print(f"⚠️ {unchecked_count} cached policies had no current quality flag (see /api/admin/policy-quality)")
             
         except Exception as e:
             print(f"❌ Critical error updating cache: {e}")
@@ -280,140 +343,42 @@ class EnhancedChatbotService:
                 self.countries_cache = []
                 self.areas_cache = []
 
+    def _build_spell_corrector(self, countries: List[str], areas: List[str], policies: List[Dict]) -> SpellingCorrector:
+        """
+        Spelling corrector whose fuzzy-correction dictionary holds the chatbot keywords, the
+        targets of the typo table, and the countries, areas and policy names of the cache.
+        Words of policy descriptions are only protected from correction.
+        """
+        dictionary = Counter()
+        for phrase in (self.greeting_keywords + self.help_keywords + self.comparison_keywords +
+                       list(self.spelling_corrections.values()) + list(self.phrase_corrections.values())):
+            dictionary.update(phrase.lower().split())
+        for text in countries + areas + [policy.get('policy_name', '') for policy in policies]:
+            dictionary.update(re.findall(r"[a-z]+", text.lower()))
+        
+        vocabulary = set()
+        for policy in policies:
+            vocabulary.update(re.findall(r"[a-z]+", str(policy.get('policy_description', '')).lower()))
+        
+        return SpellingCorrector(self.spelling_corrections, self.phrase_corrections,
+                                 dictionary=dict(dictionary), vocabulary=vocabulary)
+
     def _correct_spelling_mistakes(self, message: str) -> tuple[str, bool]:
         """
-        Detect and correct common spelling mistakes in user messages.
+        Correct the known typos and phrases in user messages (fuzzy matches are only
+        offered as suggestions, see _smart_spell_check).
         Returns (corrected_message, was_corrected)
         """
         try:
-            original_message = message
-            corrected_message = message.lower()
-            corrections_made = []
-            
-            # Split message into words for word-level corrections
-            words = corrected_message.split()
-            corrected_words = []
-            
-            for word in words:
-                # Remove punctuation for matching but keep it for reconstruction
-                clean_word = re.sub(r'[^\w]', '', word)
-                punctuation = re.sub(r'[\w]', '', word)
-                
-                # Check if the clean word needs correction
-                if clean_word in self.spelling_corrections:
-                    corrected_word = self.spelling_corrections[clean_word]
-                    corrected_words.append(corrected_word + punctuation)
-                    corrections_made.append(f"'{clean_word}' → '{corrected_word}'")
-                else:
-                    corrected_words.append(word)
-            
-            corrected_message = ' '.join(corrected_words)
-            
-            # Additional phrase-level corrections for multi-word expressions
-            phrase_corrections = {
-                'thank u': 'thank you',
-                'thnk u': 'thank you', 
-                'thnk you': 'thank you',
-                'thanx u': 'thank you',
-                'good mornig': 'good morning',
-                'good evning': 'good evening',
-                'good afernoon': 'good afternoon',
-                'good afteroon': 'good afternoon',
-                'artifical intelligence': 'artificial intelligence',
-                'cyber saftey': 'cybersafety',
-                'cyber safty': 'cybersafety',
-                'ai safty': 'ai safety',
-                'ai saftey': 'ai safety',
-                'comparision between': 'comparison between',
-                'diference between': 'difference between',
-                'beetween countries': 'between countries'
-            }
-            
-            for incorrect_phrase, correct_phrase in phrase_corrections.items():
-                if incorrect_phrase in corrected_message:
-                    corrected_message = corrected_message.replace(incorrect_phrase, correct_phrase)
-                    corrections_made.append(f"'{incorrect_phrase}' → '{correct_phrase}'")
-            
-            # Check if any corrections were made
-            was_corrected = len(corrections_made) > 0
-            
-            if was_corrected:
-                print(f"Spelling corrections made: {', '.join(corrections_made)}")
-                # Preserve original capitalization pattern as much as possible
-                corrected_message = self._preserve_capitalization(original_message, corrected_message)
-            
-            return corrected_message if was_corrected else original_message, was_corrected
+            corrected_message, corrections = self.spell_corrector.correct(message)
+            if corrections:
+                print(f"Spelling corrections made: {', '.join(f'{original!r} → {fixed!r}' for original, fixed in corrections)}")
+            return corrected_message, bool(corrections)
             
         except Exception as e:
             print(f"Error in spelling correction: {e}")
             return message, False
 
-    def _preserve_capitalization(self, original: str, corrected: str) -> str:
-        """
-        Attempt to preserve the original capitalization pattern in the corrected message
-        """
-        try:
-            # Simple approach: if original was all caps, return all caps
-            if original.isupper():
-                return corrected.upper()
-            
-            # If original started with capital letter, capitalize the corrected message
-            if original and original[0].isupper():
-                return corrected.capitalize()
-            
-            # Otherwise return as is
-            return corrected
-            
-        except Exception as e:
-            print(f"Error preserving capitalization: {e}")
-            return corrected
-
-    def _calculate_similarity(self, word1: str, word2: str) -> float:
-        """
-        Calculate similarity between two words using simple edit distance
-        Returns a score between 0 and 1 (1 = identical)
-        """
-        try:
-            if word1 == word2:
-                return 1.0
-            
-            # Simple Levenshtein distance calculation
-            len1, len2 = len(word1), len(word2)
-            if len1 == 0:
-                return 0.0 if len2 > 0 else 1.0
-            if len2 == 0:
-                return 0.0
-            
-            # Create a matrix for dynamic programming
-            matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-            
-            # Initialize first row and column
-            for i in range(len1 + 1):
-                matrix[i][0] = i
-            for j in range(len2 + 1):
-                matrix[0][j] = j
-            
-            # Fill the matrix
-            for i in range(1, len1 + 1):
-                for j in range(1, len2 + 1):
-                    cost = 0 if word1[i-1] == word2[j-1] else 1
-                    matrix[i][j] = min(
-                        matrix[i-1][j] + 1,      # deletion
-                        matrix[i][j-1] + 1,      # insertion
-                        matrix[i-1][j-1] + cost  # substitution
-                    )
-            
-            # Calculate similarity score
-            max_len = max(len1, len2)
-            distance = matrix[len1][len2]
-            similarity = (max_len - distance) / max_len
-            
-            return similarity
-            
-        except Exception as e:
-            print(f"Error calculating similarity: {e}")
-            return 0.0
-
     def _smart_spell_check(self, message: str) -> tuple[str, bool, list]:
         """
         Intelligent spell checking that suggests corrections for unknown words
@@ -426,36 +391,17 @@ class EnhancedChatbotService:
             if was_directly_corrected:
                 return corrected_message, True, []
             
-            # If no direct corrections, try fuzzy matching for potential typos
-            words = message.lower().split()
+            # If no direct corrections, look up close dictionary words for the unknown ones
             suggestions = []
-            
-            for word in words:
-                clean_word = re.sub(r'[^\w]', '', word)
-                if len(clean_word) > 2:  # Only check words longer than 2 characters
-                    
-                    # Check against greeting keywords
-                    best_match = None
-                    best_score = 0.0
-                    
-                    # Check all keyword categories for fuzzy matches
-                    all_keywords = (self.greeting_keywords + 
-                                  self.acknowledgment_keywords + 
-                                  self.apologetic_keywords + 
-                                  self.help_keywords)
-                    
-                    for keyword in all_keywords:
-                        for keyword_word in keyword.split():
-                            similarity = self._calculate_similarity(clean_word, keyword_word)
-                            if similarity > best_score and similarity > 0.7:  # 70% similarity threshold
-                                best_score = similarity
-                                best_match = keyword_word
-                    
-                    if best_match and best_score > 0.7:
+            for word in re.findall(r"[a-z]+", message.lower()):
+                if len(word) > 2:  # Only check words longer than 2 characters
+                    suggestion = self.spell_corrector.suggest(word)
+                    if suggestion:
+                        best_match, distance = suggestion
                         suggestions.append({
-                            'original': clean_word,
+                            'original': word,
                             'suggestion': best_match,
-                            'confidence': best_score
+                            'confidence': (max(len(word), len(best_match)) - distance) / max(len(word), len(best_match))
                         })
             
             return message, False, suggestions
@@ -539,25 +485,20 @@ class EnhancedChatbotService:
             # Extract conversation context from history
             context = self._extract_conversation_context(conversation.messages, processed_message)
             
-            # Check for greetings and casual responses first
-            message_lower = processed_message.lower().strip()  # Use processed_message consistently
-            if any(keyword in message_lower for keyword in self.greeting_keywords):
+            intent = await self._classify_intent(processed_message, context)
+            if intent == 'greeting':
                 ai_response = await self._get_greeting_response(processed_message, conversation.messages)
-            # Check for help requests
-            elif any(keyword in message_lower for keyword in self.help_keywords):
+            elif intent == 'help':
                 ai_response = await self._get_help_response(processed_message, conversation.messages)
-            # Check if this is a policy-related query with context
-            elif await self._is_policy_related_query(processed_message, context):
-                # Check if it's a comparison query
-                if self._is_comparison_query(processed_message):
-                    ai_response = await self._handle_country_comparison(processed_message, conversation.messages, context)
+            elif intent == 'comparison':
+                ai_response = await self._handle_country_comparison(processed_message, conversation.messages, context)
+            elif intent == 'policy':
+                # Find relevant policies with context
+                policies = await self._find_relevant_policies_with_context(processed_message, context)
+                if policies:
+                    ai_response = await self._get_policy_response(processed_message, policies, conversation.messages)
                 else:
-                    # Find relevant policies with context
-                    policies = await self._find_relevant_policies_with_context(processed_message, context)
-                    if policies:
-                        ai_response = await self._get_policy_response(processed_message, policies, conversation.messages)
-                    else:
-                        ai_response = await self._get_no_data_response(processed_message)
+                    ai_response = await self._get_no_data_response(processed_message)
             else:
                 # Non-policy response
                 ai_response = await self._get_non_policy_response(processed_message)
@@ -590,6 +531,34 @@ class EnhancedChatbotService:
                 conversation_id=request.conversation_id or "new"
             )
 
+    async def load_intent_classifier(self):
+        """Load the saved intent model (or train one from the training data) off the event loop"""
+        if not settings.INTENT_CLASSIFIER_ENABLED:
+            return
+        loop = asyncio.get_running_loop()
+        self.intent_classifier = await loop.run_in_executor(
+            None, load_or_train, settings.INTENT_MODEL_FILE, settings.INTENT_TRAINING_FILES
+        )
+
+    async def _classify_intent(self, message: str, context: Dict[str, Any] = None) -> str:
+        """greeting, help, comparison, policy or out_of_scope"""
+        if self.intent_classifier is not None:
+            intent, confidence = self.intent_classifier.predict(message)
+            if confidence >= settings.INTENT_MIN_CONFIDENCE:
+                return intent
+        return await self._rule_intent(message, context)
+
+    async def _rule_intent(self, message: str, context: Dict[str, Any] = None) -> str:
+        """Keyword routing: greetings first, then help, then policy questions"""
+        message_lower = message.lower().strip()
+        if any(keyword in message_lower for keyword in self.greeting_keywords):
+            return 'greeting'
+        if any(keyword in message_lower for keyword in self.help_keywords):
+            return 'help'
+        if await self._is_policy_related_query(message, context):
+            return 'comparison' if self._is_comparison_query(message) else 'policy'
+        return 'out_of_scope'
+
     async def _get_or_create_conversation(self, conversation_id: Optional[str], user_id: Optional[str]) -> ChatConversation:
         """Get existing conversation or create new one"""
         try:
@@ -611,7 +580,8 @@ class EnhancedChatbotService:
                         conversation_id=conversation_id,
                         messages=messages,
                         created_at=datetime.fromisoformat(conversation_data.get('created_at')),
-                        updated_at=datetime.fromisoformat(conversation_data.get('updated_at', conversation_data.get('created_at')))
+                        updated_at=datetime.fromisoformat(conversation_data.get('updated_at', conversation_data.get('created_at'))),
+                        user_id=conversation_data.get('user_id') or user_id
                     )
             
             # Create new conversation
@@ -620,7 +590,8 @@ class EnhancedChatbotService:
                 conversation_id=conversation_id,
                 messages=[],
                 created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
+                updated_at=datetime.utcnow(),
+                user_id=user_id
             )
             
             return new_conversation
@@ -632,16 +603,20 @@ class EnhancedChatbotService:
                 conversation_id=conversation_id,
                 messages=[],
                 created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
+                updated_at=datetime.utcnow(),
+                user_id=user_id
             )
 
     async def _save_conversation(self, conversation: ChatConversation):
         """Save conversation to database"""
         try:
             db = await self.get_db()
+            first_question = next((msg.content for msg in conversation.messages if msg.role == 'user'), "")
             
             conversation_data = {
                 'session_id': conversation.conversation_id,
+                'user_id': conversation.user_id or ANONYMOUS_OWNER,
+                'title': first_question[:60],
                 'messages': [
                     {
                         'role': msg.role,
@@ -650,6 +625,8 @@ class EnhancedChatbotService:
                     }
                     for msg in conversation.messages
                 ],
+                'message_count': len(conversation.messages),
+                'last_message': conversation.messages[-1].content[:100] if conversation.messages else "",
                 'created_at': conversation.created_at.isoformat(),
                 'updated_at': conversation.updated_at.isoformat()
             }
@@ -965,7 +942,7 @@ class EnhancedChatbotService:
             return await self._get_no_data_response(message)
 
     async def _find_relevant_policies(self, query: str) -> List[Dict]:
-        """Find policies relevant to the query - with corruption detection"""
+        """Find policies relevant to the query, skipping those flagged by the quality rules"""
         if not self.policy_cache:
             return []
         
@@ -991,11 +968,10 @@ class EnhancedChatbotService:
                 if area and area.lower() in query_lower:
                     mentioned_areas.append(area.lower())
         
-        # Score policies based on relevance with corruption detection
+        # Score policies based on relevance
         for policy in self.policy_cache:
-            # Check for obvious corruption - skip corrupted policies
-            if self._is_policy_corrupted(policy):
-                print(f"⚠️ Skipping corrupted policy: {policy.get('policy_name', 'Unknown')} assigned to {policy.get('country', 'Unknown')}")
+            # Flagged when the policy was submitted, approved or cached (see policy_quality_service)
+            if not policy.get('quality_ok', True):
                 continue
             
             score = 0
@@ -1056,31 +1032,6 @@ class EnhancedChatbotService:
         relevant_policies.sort(key=lambda x: x['relevance_score'], reverse=True)
         return relevant_policies[:10]  # Return top 10 relevant policies
 
-    def _is_policy_corrupted(self, policy: Dict) -> bool:
-        """Detect if a policy has incorrect country assignment"""
-        country = policy.get('country', '').lower()
-        policy_name = policy.get('policy_name', '').lower()
-        description = policy.get('policy_description', '').lower()
-        
-        # Check for obvious corruption patterns
-        if country == 'bangladesh':
-            # Bangladesh shouldn't have German, UK, or Algerian policies
-            if any(term in policy_name or term in description for term in [
-                'german federal government', 'germany', 'turing institute', 'uk', 'britain', 
-                'algeria', 'algerian'
-            ]):
-                return True
-        
-        if country == 'united states':
-            # US shouldn't have German or UK policies
-            if any(term in policy_name or term in description for term in [
-                'german federal government', 'germany', 'turing institute', 'uk', 'britain'
-            ]):
-                return True
-        
-        # Add more corruption checks as needed
-        return False
-
     async def _find_relevant_policies_with_context(self, query: str, context: Dict[str, Any]) -> List[Dict]:
         """Find relevant policies with conversation context"""
         # Start with the base query
@@ -1237,8 +1188,8 @@ I'm here to make policy research both informative and engaging! What interests y
             country_specific_policies = []
             
             for policy in policies:
-                # Skip corrupted policies first
-                if self._is_policy_corrupted(policy):
+                # Skip policies flagged by the quality rules first
+                if not policy.get('quality_ok', True):
                     continue
                 
                 policy_name = policy.get('policy_name', '').strip()
@@ -1378,31 +1329,17 @@ I'm here to make policy research both informative and engaging! What interests y
             # Get policies for mentioned countries
             comparison_data = {}
             for country in mentioned_countries[:3]:  # Limit to 3 countries
-                country_policies = [p for p in self.policy_cache 
-                                  if p.get('country') and p['country'].lower() == country.lower()]
+                country_policies = self.policy_index.policies_for(country)
                 
-                # If we have context about specific policy areas, filter further
+                # If we have context about specific policy areas, narrow to those areas
                 if context and context.get('mentioned_areas'):
-                    area_filtered_policies = []
-                    for policy in country_policies:
-                        policy_area = policy.get('policy_area', '').lower()
-                        policy_name = policy.get('policy_name', '').lower()
-                        policy_desc = policy.get('policy_description', '').lower()
-                        
-                        # Check if policy matches any mentioned areas
-                        for mentioned_area in context['mentioned_areas']:
-                            mentioned_area_lower = mentioned_area.lower()
-                            if (mentioned_area_lower in policy_area or
-                                mentioned_area_lower in policy_name or
-                                mentioned_area_lower in policy_desc or
-                                # Special handling for AI Safety
-                                (mentioned_area == "AI Safety" and any(term in policy_name or term in policy_desc 
-                                    for term in ["ai", "artificial intelligence", "machine learning", "automation"]))):
-                                area_filtered_policies.append(policy)
-                                break
-                    
-                    if area_filtered_policies:
-                        country_policies = area_filtered_policies
+                    positions = sorted(
+                        position
+                        for area in context['mentioned_areas']
+                        for position in self.policy_index.positions(country, area)
+                    )
+                    if positions:
+                        country_policies = [self.policy_index.policies[position] for position in positions]
                 
                 comparison_data[country] = country_policies
             
@@ -1669,24 +1606,22 @@ If you're knowledgeable about [country]'s [topic], I'd be genuinely thrilled if
         return base_prompt
 
     async def _call_ai_api(self, prompt: str, context_policies: List[Dict] = None) -> str:
-        """Call AI API with OpenAI primary and GROQ backup"""
+        """Call AI API through the provider router (OpenAI preferred, GROQ backup)"""
         try:
-            # Use ChatGPT as the primary AI model
+            providers = []
             if self.openai_api_key:
-                response = await self._call_openai_api(prompt, context_policies)
-                if response:
-                    return response
-                else:
-                    print("OpenAI failed, trying GROQ fallback...")
+                providers.append("openai")
             else:
                 print("ChatGPT API key not configured, trying GROQ...")
-            
-            # GROQ Fallback - When OpenAI fails
             if self.groq_api_key:
-                print("🔄 Using GROQ as backup AI...")
-                response = await self._call_groq_api(prompt, context_policies)
-                if response:
-                    return response
+                providers.append("groq")
+            
+            provider, response = await self.ai_router.call(
+                lambda provider: self._call_provider_api(provider, prompt, context_policies),
+                allowed=providers
+            )
+            if response:
+                return response
             
             # If both AI services fail, use local fallback
             if context_policies:
@@ -1701,6 +1636,13 @@ If you're knowledgeable about [country]'s [topic], I'd be genuinely thrilled if
             else:
                 return "I apologize, but I'm experiencing technical difficulties with AI services. However, I can still help you with policy information from my database!"
 
+    async def _call_provider_api(self, provider: str, prompt: str, context_policies: List[Dict] = None) -> Optional[str]:
+        """Dispatch a routed call to the matching provider"""
+        if provider == "openai":
+            return await self._call_openai_api(prompt, context_policies)
+        print("🔄 Using GROQ as backup AI...")
+        return await self._call_groq_api(prompt, context_policies)
+
     async def _call_openai_api(self, prompt: str, context_policies: List[Dict] = None) -> Optional[str]:
         """Call ChatGPT (OpenAI GPT-4) API with enhanced context from your policy database"""
         try:
@@ -1738,22 +1680,24 @@ If you're knowledgeable about [country]'s [topic], I'd be genuinely thrilled if
                     error_data = response.json()
                     if "insufficient_quota" in str(error_data):
                         print("❌ OpenAI quota exceeded - falling back to local response")
-                        return None  # Will trigger fallback
+                        raise ModelUnavailableError("OpenAI quota exceeded")
                     else:
                         print("❌ OpenAI rate limited - falling back to local response")
                         return None
                 elif response.status_code == 401:
                     print("❌ OpenAI API key invalid")
-                    return None
+                    raise ModelUnavailableError("OpenAI API key invalid")
                 elif response.status_code == 403:
                     print("❌ OpenAI access denied")
-                    return None
+                    raise ModelUnavailableError("OpenAI access denied")
                 
                 response.raise_for_status()
                 
                 data = response.json()
                 return data['choices'][0]['message']['content'].strip()
                 
+        except ModelUnavailableError:
+            raise
         except Exception as e:
             print(f"ChatGPT API error: {e}")
             return None
@@ -1793,7 +1737,7 @@ If you're knowledgeable about [country]'s [topic], I'd be genuinely thrilled if
                     return None
                 elif response.status_code == 401:
                     print("❌ GROQ API key invalid")
-                    return None
+                    raise ModelUnavailableError("GROQ API key invalid")
                 
                 response.raise_for_status()
                 
@@ -1802,6 +1746,8 @@ If you're knowledgeable about [country]'s [topic], I'd be genuinely thrilled if
                 print("✅ GROQ API call successful")
                 return result
                 
+        except ModelUnavailableError:
+            raise
         except Exception as e:
             print(f"GROQ API error: {e}")
             return None
@@ -1947,44 +1893,89 @@ If you're knowledgeable about [country]'s [topic], I'd be genuinely thrilled if
             print(f"Error getting conversation history: {e}")
             return []
 
-    async def get_user_conversations(self, limit: int = 20, user_id: Optional[str] = None) -> List[Dict]:
-        """Get user conversations"""
+    async def get_user_conversations(self, limit: int = 20, user_id: Optional[str] = None,
+                                     cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of a user's conversations (anonymous ones without user_id), most recently
+        updated first, read from user-updated-index. Pass the returned next_cursor back as
+        cursor for the following page. Raises ValueError for a malformed cursor.
+        """
+        owner = user_id or ANONYMOUS_OWNER
+        start_key = None
+        if cursor:
+            state = decode_cursor(cursor)
+            if state.get('owner') != owner or not isinstance(state.get('key'), dict):
+                raise ValueError("Invalid pagination cursor")
+            start_key = state['key']
+        
         try:
             db = await self.get_db()
-            sessions = await db.scan_table('chat_sessions')
-            
-            # Filter by user if specified
-            if user_id:
-                sessions = [s for s in sessions if s.get('user_id') == user_id]
-            
-            # Sort by updated_at descending
-            sessions.sort(key=lambda x: x.get('updated_at', ''), reverse=True)
-            
-            # Limit results
-            sessions = sessions[:limit]
-            
-            # Format for frontend
-            conversations = []
-            for session in sessions:
-                last_message = ""
-                messages = session.get('messages', [])
-                if messages:
-                    last_message = messages[-1].get('content', '')[:100]
-                
-                conversation = {
-                    'conversation_id': session.get('session_id'),
-                    'last_message': last_message,
-                    'updated_at': session.get('updated_at'),
-                    'created_at': session.get('created_at'),
-                    'message_count': len(messages)
-                }
-                conversations.append(conversation)
-            
-            return conversations
-            
+            page = await db.query_page(
+                'chat_sessions', Key('user_id').eq(owner), index_name='user-updated-index',
+                limit=limit, exclusive_start_key=start_key, scan_forward=False,
+                fields=CONVERSATION_LIST_FIELDS
+            )
         except Exception as e:
             print(f"Error getting user conversations: {e}")
-            return []
+            return {'conversations': [], 'next_cursor': None}
+        
+        # Format for frontend
+        conversations = []
+        for session in page['items']:
+            if 'message_count' not in session:
+                # Saved before the list attributes existed
+                messages = (await db.get_item('chat_sessions', {'session_id': session['session_id']}) or {}).get('messages', [])
+                session['message_count'] = len(messages)
+                session['last_message'] = messages[-1].get('content', '')[:100] if messages else ""
+            
+            conversations.append({
+                'conversation_id': session.get('session_id'),
+                'title': session.get('title') or session.get('last_message', '')[:60],
+                'last_message': session.get('last_message', ''),
+                'updated_at': session.get('updated_at'),
+                'created_at': session.get('created_at'),
+                'message_count': int(session['message_count'])
+            })
+        
+        last_key = page['last_evaluated_key']
+        return {
+            'conversations': conversations,
+            'next_cursor': encode_cursor({'owner': owner, 'key': last_key}) if last_key else None
+        }
+
+    async def backfill_conversation_list_fields(self) -> int:
+        """
+        One-off migration for sessions saved before user-updated-index: sets user_id (anonymous
+        when unknown), title, message_count and last_message so they are listed again. updated_at
+        is left as it was, keeping the list order. Returns the number of sessions updated.
+        """
+        db = await self.get_db()
+        table = db.tables['chat_sessions']
+        updated = 0
+        start_key = None
+        while True:
+            page = await db.scan_page('chat_sessions', exclusive_start_key=start_key,
+                                      fields=('session_id', 'user_id', 'title', 'message_count', 'messages'))
+            for session in page['items']:
+                if session.get('user_id') and 'title' in session and 'message_count' in session:
+                    continue
+                messages = session.get('messages', [])
+                first_question = next((msg.get('content', '') for msg in messages if msg.get('role') == 'user'), "")
+                # Directly on the table: db.update_item would stamp updated_at
+                table.update_item(
+                    Key={'session_id': session['session_id']},
+                    UpdateExpression="SET user_id = :owner, title = :title, message_count = :count, last_message = :last",
+                    ExpressionAttributeValues={
+                        ':owner': session.get('user_id') or ANONYMOUS_OWNER,
+                        ':title': session.get('title') or first_question[:60],
+                        ':count': len(messages),
+                        ':last': messages[-1].get('content', '')[:100] if messages else ""
+                    }
+                )
+                updated += 1
+            start_key = page['last_evaluated_key']
+            if not start_key:
+                return updated
 
     async def delete_conversation(self, conversation_id: str) -> bool:
         """Delete conversation"""
@@ -2053,8 +2044,8 @@ If you're knowledgeable about [country]'s [topic], I'd be genuinely thrilled if
         # Generate country comparison examples
         for i, country1 in enumerate(self.countries_cache[:5]):
             for country2 in self.countries_cache[i+1:6]:
-                policies1 = [p for p in self.policy_cache if p.get('country') == country1][:3]
-                policies2 = [p for p in self.policy_cache if p.get('country') == country2][:3]
+                policies1 = self.policy_index.policies_for(country1, limit=3)
+                policies2 = self.policy_index.policies_for(country2, limit=3)
                 
                 if policies1 and policies2:
                     training_examples.append({
@@ -2109,25 +2100,13 @@ If you're knowledgeable about [country]'s [topic], I'd be genuinely thrilled if
             datetime.utcnow().timestamp() - self.last_cache_update > 21600):
             await self._update_cache()
         
-        # Group policies by country and area
-        country_data = {}
-        for policy in self.policy_cache:
-            country = policy.get('country', 'Unknown')
-            area = policy.get('area_name', 'Unknown')
-            
-            if country not in country_data:
-                country_data[country] = {}
-            if area not in country_data[country]:
-                country_data[country][area] = 0
-            country_data[country][area] += 1
-        
         return {
             'total_policies': len(self.policy_cache),
             'total_countries': len(self.countries_cache),
             'total_areas': len(self.areas_cache),
             'countries': self.countries_cache,
             'areas': self.areas_cache,
-            'country_area_breakdown': country_data
+            'country_area_breakdown': self.policy_index.breakdown()
         }
     
     def check_specific_data(self, country: str = None, area: str = None) -> Dict[str, Any]:
@@ -2135,41 +2114,25 @@ If you're knowledgeable about [country]'s [topic], I'd be genuinely thrilled if
         if not self.policy_cache:
             return {'status': 'cache_empty', 'message': 'Policy cache not loaded'}
         
-        matching_policies = []
-        
-        for policy in self.policy_cache:
-            match = True
-            policy_country = policy.get('country', '').strip()
-            policy_area = policy.get('area_name', '').strip()
-            
-            if country:
-                # Handle common country name variations
-                country_matches = (
-                    policy_country.lower() == country.lower() or
-                    (country.lower() in ["usa", "us", "america", "american"] and policy_country.lower() == "united states") or
-                    (country.lower() in ["uk", "britain", "british"] and policy_country.lower() == "united kingdom")
-                )
-                if not country_matches:
-                    match = False
-                    
-            if area and policy_area.lower() != area.lower():
-                match = False
-            
-            if match:
-                matching_policies.append({
-                    'country': policy_country,
-                    'area': policy_area,
-                    'policy_name': policy.get('policy_name'),
-                    'has_description': bool(policy.get('policy_description'))
-                })
+        # The index resolves case and common country aliases (USA, UK, ...)
+        total = self.policy_index.count(country or None, area or None)
+        preview = [
+            {
+                'country': policy.get('country', '').strip(),
+                'area': policy.get('area_name', '').strip(),
+                'policy_name': policy.get('policy_name'),
+                'has_description': bool(policy.get('policy_description'))
+            }
+            for policy in self.policy_index.policies_for(country or None, area or None, limit=5)  # First 5 for preview
+        ]
         
         return {
             'query': {'country': country, 'area': area},
-            'found': len(matching_policies),
-            'policies': matching_policies[:5],  # First 5 for preview
-            'total_available': len(matching_policies),
-            'all_countries_in_cache': sorted(list(set([p.get('country', '') for p in self.policy_cache if p.get('country')]))),
-            'all_areas_in_cache': sorted(list(set([p.get('area_name', '') for p in self.policy_cache if p.get('area_name')])))
+            'found': total,
+            'policies': preview,
+            'total_available': total,
+            'all_countries_in_cache': self.policy_index.countries,
+            'all_areas_in_cache': self.policy_index.areas
         }
 
 
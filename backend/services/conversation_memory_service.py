@@ -12,6 +12,16 @@ import uuid
 import json
 from dataclasses import dataclass, asdict
 from config.dynamodb import get_dynamodb, DynamoDBClient
+from config.schema import MEMORY_TABLES, ensure_schema
+
+# TransactWriteItems takes up to 100 operations: the message puts plus the thread update
+MAX_MESSAGES_PER_TRANSACTION = 99
+MESSAGE_TTL_DAYS = 90
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token for English text)"""
+    return (len(text) + 3) // 4 if text else 0
 
 @dataclass
 class ConversationMessage:
@@ -124,99 +134,105 @@ class ConversationMemoryService:
         Returns:
             The created ConversationMessage
         """
+        messages = await self.add_messages(
+            conversation_id,
+            [{'role': role, 'content': content, 'metadata': metadata}],
+            user_id=user_id
+        )
+        return messages[0]
+    
+    async def add_messages(
+        self,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        user_id: Optional[str] = None
+    ) -> List[ConversationMessage]:
+        """
+        Append messages (e.g. a user question and the assistant's answer) to a conversation in a
+        single transaction: one put per message plus an update that ADDs to the thread's
+        message_count, so concurrent appends never lose counts
+        
+        Args:
+            conversation_id: The conversation ID
+            messages: Dicts with role and content, and optionally metadata and timestamp
+            user_id: The user ID (optional)
+        
+        Returns:
+            The created ConversationMessages, in order
+        """
         await self.ensure_db_connection()
         
         try:
-            message_id = str(uuid.uuid4())
-            timestamp = datetime.utcnow()
-            
-            message = ConversationMessage(
-                message_id=message_id,
-                conversation_id=conversation_id,
-                user_id=user_id,
-                role=role,
-                content=content,
-                timestamp=timestamp,
-                metadata=metadata or {}
-            )
-            
-            # Store in DynamoDB
-            from boto3.dynamodb.conditions import Key
-            
-            # Use the low-level client for put_item
-            item = {
-                'message_id': {'S': message_id},
-                'conversation_id': {'S': conversation_id},
-                'role': {'S': role},
-                'content': {'S': content},
-                'timestamp': {'S': timestamp.isoformat()},
-                'ttl': {'N': str(int((timestamp + timedelta(days=90)).timestamp()))}
-            }
-            
-            if user_id:
-                item['user_id'] = {'S': user_id}
-            if metadata:
-                item['metadata'] = {'S': json.dumps(metadata)}
-            
-            # Use client.put_item instead of table.put_item
-            self.db.client.put_item(
-                TableName='conversation_messages',
-                Item=item
-            )
-            
-            # Update conversation thread metadata
-            await self._update_conversation_metadata(conversation_id, user_id)
+            now = datetime.utcnow()
+            created = [
+                ConversationMessage(
+                    message_id=str(uuid.uuid4()),
+                    conversation_id=conversation_id,
+                    user_id=user_id,
+                    role=data['role'],
+                    content=data['content'],
+                    # Keep the order of messages without their own timestamp within the batch
+                    timestamp=data.get('timestamp') or now + timedelta(microseconds=offset),
+                    metadata=data.get('metadata') or {}
+                )
+                for offset, data in enumerate(messages)
+            ]
+            
+            for start in range(0, len(created), MAX_MESSAGES_PER_TRANSACTION):
+                batch = created[start:start + MAX_MESSAGES_PER_TRANSACTION]
+                await self.db.transact_write(
+                    [{'Put': {'TableName': 'conversation_messages', 'Item': self._message_item(message)}}
+                     for message in batch] +
+                    [{'Update': self._thread_update(conversation_id, user_id, batch)}]
+                )
             
-            return message
+            return created
             
         except Exception as e:
             print(f"❌ Error adding message: {e}")
             raise e
     
-    async def _update_conversation_metadata(self, conversation_id: str, user_id: Optional[str]):
-        """Update conversation thread metadata"""
-        try:
-            timestamp = datetime.utcnow().isoformat()
-            
-            # Try to get existing conversation
-            try:
-                response = self.db.client.get_item(
-                    TableName='conversation_threads',
-                    Key={'conversation_id': {'S': conversation_id}}
-                )
-                
-                if 'Item' in response:
-                    # Update existing conversation
-                    message_count = int(response['Item'].get('message_count', {}).get('N', '0')) + 1
-                else:
-                    # Create new conversation thread
-                    message_count = 1
-            except:
-                # Default to new conversation
-                message_count = 1
-            
-            # Prepare item for DynamoDB
-            item = {
-                'conversation_id': {'S': conversation_id},
-                'updated_at': {'S': timestamp},
-                'message_count': {'N': str(message_count)},
-                'ttl': {'N': str(int((datetime.utcnow() + timedelta(days=90)).timestamp()))}
-            }
-            
-            if user_id:
-                item['user_id'] = {'S': user_id}
-            
-            if message_count == 1:
-                item['created_at'] = {'S': timestamp}
-            
-            # Use client.put_item
-            self.db.client.put_item(
-                TableName='conversation_threads',
-                Item=item
-            )
-            
-        except Exception as e:
-            print(f"❌ Error updating conversation metadata: {e}")
+    def _message_item(self, message: ConversationMessage) -> Dict[str, Any]:
+        item = {
+            'message_id': message.message_id,
+            'conversation_id': message.conversation_id,
+            'role': message.role,
+            'content': message.content,
+            'timestamp': message.timestamp.isoformat(),
+            'ttl': int((message.timestamp + timedelta(days=MESSAGE_TTL_DAYS)).timestamp())
+        }
+        if message.user_id:
+            item['user_id'] = message.user_id
+        if message.metadata:
+            item['metadata'] = json.dumps(message.metadata)
+        return item
+    
+    def _thread_update(self, conversation_id: str, user_id: Optional[str],
+                       batch: List[ConversationMessage]) -> Dict[str, Any]:
+        """Update for the conversation thread: creates it on the first message, then bumps its count"""
+        assignments = [
+            'updated_at = :updated_at',
+            'created_at = if_not_exists(created_at, :created_at)',
+            '#ttl = :ttl'
+        ]
+        values = {
+            ':updated_at': batch[-1].timestamp.isoformat(),
+            ':created_at': batch[0].timestamp.isoformat(),
+            ':ttl': int((datetime.utcnow() + timedelta(days=MESSAGE_TTL_DAYS)).timestamp()),
+            ':count': len(batch),
+            ':tokens': sum(estimate_tokens(message.content) for message in batch)
+        }
+        if user_id:
+            assignments.append('user_id = :user_id')
+            values[':user_id'] = user_id
+        
+        return {
+            'TableName': 'conversation_threads',
+            'Key': {'conversation_id': conversation_id},
+            'UpdateExpression': f"SET {', '.join(assignments)} ADD message_count :count, history_tokens :tokens",
+            'ExpressionAttributeNames': {'#ttl': 'ttl'},
+            'ExpressionAttributeValues': values
+        }
     
     async def get_conversation_thread(self, conversation_id: str) -> Optional[ConversationThread]:
         """Get complete conversation thread"""
@@ -351,66 +367,7 @@ class ConversationMemoryService:
         await self.ensure_db_connection()
         
         try:
-            # Create conversation_messages table
-            try:
-                self.db.dynamodb.create_table(
-                    TableName='conversation_messages',
-                    KeySchema=[
-                        {'AttributeName': 'message_id', 'KeyType': 'HASH'}
-                    ],
-                    AttributeDefinitions=[
-                        {'AttributeName': 'message_id', 'AttributeType': 'S'},
-                        {'AttributeName': 'conversation_id', 'AttributeType': 'S'},
-                        {'AttributeName': 'timestamp', 'AttributeType': 'S'}
-                    ],
-                    GlobalSecondaryIndexes=[
-                        {
-                            'IndexName': 'conversation-timestamp-index',
-                            'KeySchema': [
-                                {'AttributeName': 'conversation_id', 'KeyType': 'HASH'},
-                                {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
-                            ],
-                            'Projection': {'ProjectionType': 'ALL'},
-                            'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                        }
-                    ],
-                    ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                )
-                print("✅ Created conversation_messages table")
-            except Exception as e:
-                if "already exists" not in str(e):
-                    print(f"⚠️ Error creating conversation_messages table: {e}")
-            
-            # Create conversation_threads table
-            try:
-                self.db.dynamodb.create_table(
-                    TableName='conversation_threads',
-                    KeySchema=[
-                        {'AttributeName': 'conversation_id', 'KeyType': 'HASH'}
-                    ],
-                    AttributeDefinitions=[
-                        {'AttributeName': 'conversation_id', 'AttributeType': 'S'},
-                        {'AttributeName': 'user_id', 'AttributeType': 'S'},
-                        {'AttributeName': 'updated_at', 'AttributeType': 'S'}
-                    ],
-                    GlobalSecondaryIndexes=[
-                        {
-                            'IndexName': 'user-updated-index',
-                            'KeySchema': [
-                                {'AttributeName': 'user_id', 'KeyType': 'HASH'},
-                                {'AttributeName': 'updated_at', 'KeyType': 'RANGE'}
-                            ],
-                            'Projection': {'ProjectionType': 'ALL'},
-                            'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                        }
-                    ],
-                    ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                )
-                print("✅ Created conversation_threads table")
-            except Exception as e:
-                if "already exists" not in str(e):
-                    print(f"⚠️ Error creating conversation_threads table: {e}")
-                    
+            await ensure_schema(self.db.client, MEMORY_TABLES)
         except Exception as e:
             print(f"❌ Error ensuring tables exist: {e}")
 
@@ -0,0 +1,276 @@
+"""
+Conversation Summary Service
+Keeps a rolling summary per conversation thread so chat prompts carry a bounded summary of
+older turns plus the last few messages, instead of a growing raw transcript. Older turns are
+folded into the summary in the background after a reply is stored.
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from config.dynamodb import get_dynamodb
+from config.settings import settings
+from services.conversation_memory_service import ConversationMessage, estimate_tokens
+from services.model_router import ModelRouter, ModelUnavailableError
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an AI policy assistant.
+Update the summary with the new messages. Keep the countries, policy areas, policies and facts discussed,
+the user's goals and any open questions; drop greetings and repetition. Answer with the updated summary
+only, in at most {max_words} words.
+
+Current summary:
+{summary}
+
+New messages:
+{transcript}"""
+
+
+@dataclass
+class ConversationContext:
+    """What a prompt needs from the conversation: the rolling summary and the messages after it"""
+    summary: str = ""
+    messages: List[ConversationMessage] = field(default_factory=list)
+    # Estimated tokens of the whole raw transcript, for accounting
+    history_tokens: int = 0
+
+
+class ConversationSummaryService:
+    """Rolling conversation summaries stored on conversation_threads"""
+
+    def __init__(self):
+        self.db = None
+        self.openai_api_key = os.getenv('OPENAI_API_KEY')
+        self.openai_api_url = "https://api.openai.com/v1/chat/completions"
+        self.groq_api_key = os.getenv('GROQ_API_KEY')
+        self.groq_api_url = os.getenv('GROQ_API_URL', "https://api.groq.com/openai/v1/chat/completions")
+        self.router = ModelRouter("summary", ["openai", "groq"])
+        self._running: Dict[str, asyncio.Task] = {}
+        self.stats = {
+            "prompts": 0,
+            "prompt_tokens": 0,
+            "history_tokens": 0,
+            "summaries_written": 0,
+            "messages_summarized": 0,
+            "extractive_summaries": 0,
+            "failures": 0
+        }
+
+    async def _table(self, name: str):
+        if self.db is None:
+            self.db = await get_dynamodb()
+        return self.db.dynamodb.Table(name)
+
+    async def _run(self, function, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: function(**kwargs))
+
+    # Reading
+
+    async def get_context(self, conversation_id: str) -> ConversationContext:
+        """Summary plus the messages it does not cover yet (at most recent + trigger messages)"""
+        try:
+            threads = await self._table('conversation_threads')
+            messages = await self._table('conversation_messages')
+            thread_response, message_response = await asyncio.gather(
+                self._run(threads.get_item, Key={'conversation_id': conversation_id}),
+                self._run(
+                    messages.query,
+                    IndexName='conversation-timestamp-index',
+                    KeyConditionExpression=Key('conversation_id').eq(conversation_id),
+                    ScanIndexForward=False,
+                    Limit=settings.CHAT_CONTEXT_RECENT_MESSAGES + settings.CHAT_SUMMARY_TRIGGER_MESSAGES
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Could not load context for conversation {conversation_id}: {str(e)}")
+            return ConversationContext()
+
+        thread = thread_response.get('Item') or {}
+        summarized_until = thread.get('summarized_until', '')
+        recent = [
+            ConversationMessage(
+                message_id=item['message_id'],
+                conversation_id=item['conversation_id'],
+                user_id=item.get('user_id'),
+                role=item['role'],
+                content=item['content'],
+                timestamp=datetime.fromisoformat(item['timestamp']),
+                metadata=item.get('metadata', {})
+            )
+            for item in reversed(message_response.get('Items', []))
+            if item['timestamp'] > summarized_until
+        ]
+        return ConversationContext(
+            summary=thread.get('summary', ''),
+            messages=recent,
+            history_tokens=int(thread.get('history_tokens', 0))
+        )
+
+    def record_prompt(self, context: ConversationContext, prompt: str) -> Dict[str, int]:
+        """Account a prompt built from context against sending the raw transcript"""
+        prompt_tokens = estimate_tokens(prompt)
+        # The raw alternative is the whole transcript followed by the same question
+        history_tokens = context.history_tokens + prompt_tokens - estimate_tokens(
+            "\n".join([context.summary] + [message.content for message in context.messages])
+        )
+        history_tokens = max(history_tokens, prompt_tokens)
+        self.stats["prompts"] += 1
+        self.stats["prompt_tokens"] += prompt_tokens
+        self.stats["history_tokens"] += history_tokens
+        return {"context_tokens": prompt_tokens, "history_tokens": history_tokens}
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["tokens_saved"] = stats["history_tokens"] - stats["prompt_tokens"]
+        stats["savings_ratio"] = round(stats["tokens_saved"] / stats["history_tokens"], 3) if stats["history_tokens"] else 0.0
+        stats["summarizing"] = len(self._running)
+        return stats
+
+    # Summarizing
+
+    def schedule(self, conversation_id: str):
+        """Fold older turns into the summary in the background (one run per conversation at a time)"""
+        if not settings.CHAT_SUMMARY_ENABLED or conversation_id in self._running:
+            return
+        task = asyncio.create_task(self._summarize_older_turns(conversation_id))
+        self._running[conversation_id] = task
+        task.add_done_callback(lambda _: self._running.pop(conversation_id, None))
+
+    async def _summarize_older_turns(self, conversation_id: str):
+        try:
+            threads = await self._table('conversation_threads')
+            thread = (await self._run(threads.get_item, Key={'conversation_id': conversation_id})).get('Item')
+            if not thread:
+                return
+
+            pending = (int(thread.get('message_count', 0)) - int(thread.get('summarized_count', 0))
+                       - settings.CHAT_CONTEXT_RECENT_MESSAGES)
+            if pending < settings.CHAT_SUMMARY_TRIGGER_MESSAGES:
+                return
+
+            previous_until = thread.get('summarized_until')
+            condition = Key('conversation_id').eq(conversation_id)
+            if previous_until:
+                condition = condition & Key('timestamp').gt(previous_until)
+            messages = await self._table('conversation_messages')
+            response = await self._run(
+                messages.query,
+                IndexName='conversation-timestamp-index',
+                KeyConditionExpression=condition,
+                ScanIndexForward=True,
+                Limit=pending
+            )
+            items = response.get('Items', [])
+            if not items:
+                return
+
+            summary = await self._summarize(thread.get('summary', ''), items)
+            update = {
+                'Key': {'conversation_id': conversation_id},
+                'UpdateExpression': ("SET summary = :summary, summarized_until = :until, "
+                                     "summary_tokens = :tokens, summary_updated_at = :now ADD summarized_count :count"),
+                'ExpressionAttributeValues': {
+                    ':summary': summary,
+                    ':until': items[-1]['timestamp'],
+                    ':tokens': estimate_tokens(summary),
+                    ':now': datetime.utcnow().isoformat(),
+                    ':count': len(items)
+                },
+                # Another instance may have folded the same turns meanwhile
+                'ConditionExpression': 'summarized_until = :previous' if previous_until else 'attribute_not_exists(summarized_until)'
+            }
+            if previous_until:
+                update['ExpressionAttributeValues'][':previous'] = previous_until
+            await self._run(threads.update_item, **update)
+
+            self.stats["summaries_written"] += 1
+            self.stats["messages_summarized"] += len(items)
+            logger.info(f"Summarized {len(items)} messages of conversation {conversation_id}")
+
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                self.stats["failures"] += 1
+                logger.warning(f"Could not summarize conversation {conversation_id}: {str(e)}")
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.warning(f"Could not summarize conversation {conversation_id}: {str(e)}")
+
+    async def _summarize(self, summary: str, items: List[Dict[str, Any]]) -> str:
+        """New summary covering summary and items; model-written when a provider is available"""
+        transcript = "\n".join(
+            f"{'User' if item['role'] == 'user' else 'Assistant'}: {item['content'][:1500]}" for item in items
+        )
+        prompt = SUMMARY_PROMPT.format(
+            max_words=int(settings.CHAT_SUMMARY_MAX_TOKENS * 0.75),
+            summary=summary or "(none yet)",
+            transcript=transcript
+        )
+
+        providers = [name for name, key in (("openai", self.openai_api_key), ("groq", self.groq_api_key)) if key]
+        if providers:
+            _, result = await self.router.call(lambda provider: self._complete(provider, prompt), allowed=providers)
+            if result:
+                return self._bound(result)
+
+        self.stats["extractive_summaries"] += 1
+        return self._extractive_summary(summary, items)
+
+    async def _complete(self, provider: str, prompt: str) -> Optional[str]:
+        if provider == "openai":
+            url, key, model = self.openai_api_url, self.openai_api_key, "gpt-3.5-turbo"
+        else:
+            url, key, model = self.groq_api_url, self.groq_api_key, "llama3-8b-8192"
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": settings.CHAT_SUMMARY_MAX_TOKENS,
+            "temperature": 0.2
+        }
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.post(url, headers={"Authorization": f"Bearer {key}"}, json=payload)
+        if response.status_code in (401, 403):
+            raise ModelUnavailableError(f"{provider} rejected the API key")
+        if response.status_code == 429 and "insufficient_quota" in response.text:
+            raise ModelUnavailableError(f"{provider} quota exceeded")
+        if response.status_code != 200:
+            return None
+        return response.json()['choices'][0]['message']['content'].strip()
+
+    def _extractive_summary(self, summary: str, items: List[Dict[str, Any]]) -> str:
+        """Without a model: one line per user question with the start of its answer"""
+        lines = [line for line in summary.splitlines() if line.strip()]
+        question = None
+        for item in items:
+            text = " ".join(item['content'].split())
+            if item['role'] == 'user':
+                question = text[:160]
+            elif question:
+                lines.append(f"- Asked: {question} | Answer: {text[:200]}")
+                question = None
+        if question:
+            lines.append(f"- Asked: {question}")
+        return self._bound("\n".join(lines), keep_end=True)
+
+    def _bound(self, text: str, keep_end: bool = False) -> str:
+        """Clip text to the summary token budget (keep_end drops the oldest lines first)"""
+        limit = settings.CHAT_SUMMARY_MAX_TOKENS * 4
+        if len(text) <= limit:
+            return text
+        if not keep_end:
+            return text[:limit].rsplit(" ", 1)[0]
+        lines = text.splitlines()
+        while lines and len("\n".join(lines)) > limit:
+            lines.pop(0)
+        return "\n".join(lines) or text[-limit:]
+
+
+# Create singleton instance
+conversation_summaries = ConversationSummaryService()
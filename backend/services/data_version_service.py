@@ -0,0 +1,32 @@
+"""
+Data versions
+Per-process counters for data domains ("policies", "map", ...). Writers bump a domain after a
+change; read caches remember the versions they were built from and drop anything older.
+"""
+from typing import Dict, Iterable, Tuple
+
+
+class DataVersionService:
+    """Monotonic version counter per data domain"""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+
+    def bump(self, *domains: str):
+        """Mark domains as changed"""
+        for domain in domains:
+            self._versions[domain] = self._versions.get(domain, 0) + 1
+
+    def get(self, domain: str) -> int:
+        return self._versions.get(domain, 0)
+
+    def snapshot(self, domains: Iterable[str]) -> Tuple[int, ...]:
+        """Current versions of several domains, comparable with an earlier snapshot"""
+        return tuple(self._versions.get(domain, 0) for domain in domains)
+
+    def get_all(self) -> Dict[str, int]:
+        return dict(self._versions)
+
+
+# Create singleton instance
+data_versions = DataVersionService()
@@ -0,0 +1,280 @@
+"""
+Email outbox
+Requests enqueue messages and return immediately; a background sender drains the queue in
+batches over pooled, already-authenticated SMTP sessions and retries transient failures with
+exponential backoff. Messages are held in memory only - OTP emails expire within minutes, so
+a lost message is re-requested by the user rather than persisted.
+
+To try it locally against a debug server:
+    python -m aiosmtpd -n -l localhost:1025
+    SMTP_SERVER=localhost SMTP_PORT=1025 SMTP_SECURITY=none
+"""
+import asyncio
+import logging
+import random
+import smtplib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed send is worth retrying - the connection, not the message, was the problem"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        # 4xx replies are temporary by definition, 5xx are permanent
+        return 400 <= error.smtp_code < 500
+    # SMTPException derives from OSError, so only plain socket errors are left here
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class SMTPConnectionPool:
+    """Reusable authenticated SMTP sessions shared by the sender threads"""
+
+    def __init__(self, size: int, idle_seconds: int):
+        self.size = size
+        self.idle_seconds = idle_seconds
+        self._idle: List[tuple] = []
+        self._lock = threading.Lock()
+        self.stats = {"connections_opened": 0, "connections_reused": 0}
+
+    @staticmethod
+    def security_mode() -> str:
+        """ssl, starttls or none - defaults follow the port as before (465 SSL, otherwise STARTTLS)"""
+        if settings.SMTP_SECURITY:
+            return settings.SMTP_SECURITY.lower()
+        return "ssl" if settings.SMTP_PORT == 465 else "starttls"
+
+    def _connect(self) -> smtplib.SMTP:
+        mode = self.security_mode()
+        timeout = settings.SMTP_TIMEOUT_SECONDS
+        if mode == "ssl":
+            server = smtplib.SMTP_SSL(settings.SMTP_SERVER, settings.SMTP_PORT, timeout=timeout)
+            server.ehlo()
+        else:
+            server = smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT, timeout=timeout)
+            server.ehlo()
+            if mode == "starttls":
+                server.starttls()
+                server.ehlo()
+
+        if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
+            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+
+        self.stats["connections_opened"] += 1
+        logger.info(f"📧 Opened SMTP session to {settings.SMTP_SERVER}:{settings.SMTP_PORT} ({mode})")
+        return server
+
+    def acquire(self) -> smtplib.SMTP:
+        """Return an idle session that still answers NOOP, or open a new one"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, last_used = self._idle.pop()
+
+            if time.monotonic() - last_used < self.idle_seconds:
+                try:
+                    if server.noop()[0] == 250:
+                        self.stats["connections_reused"] += 1
+                        return server
+                except (smtplib.SMTPException, OSError):
+                    pass
+            self.discard(server)
+
+        return self._connect()
+
+    def release(self, server: smtplib.SMTP):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((server, time.monotonic()))
+                return
+        self.discard(server)
+
+    @staticmethod
+    def discard(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self.discard(server)
+
+
+class EmailOutboxService:
+    """Bounded in-memory outbox with a batching background sender"""
+
+    def __init__(self):
+        self.pool_size = settings.EMAIL_SMTP_POOL_SIZE
+        self.batch_size = settings.EMAIL_BATCH_SIZE
+        self.batch_window = settings.EMAIL_BATCH_WINDOW_MS / 1000
+        self.max_attempts = settings.EMAIL_MAX_ATTEMPTS
+        self.retry_base_seconds = settings.EMAIL_RETRY_BASE_SECONDS
+        self.pool = SMTPConnectionPool(self.pool_size, settings.EMAIL_SMTP_IDLE_SECONDS)
+        self.executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="smtp")
+        self._queue: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+        self._batches: set = set()
+        self._retries: set = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.stats = {
+            "enqueued": 0, "sent": 0, "failed": 0, "retried": 0, "rejected": 0,
+            "batches": 0, "total_send_seconds": 0.0, "last_error": None
+        }
+
+    async def start(self):
+        """Start the background sender (idempotent)"""
+        if self._sender and not self._sender.done():
+            return
+        self._queue = asyncio.Queue(maxsize=settings.EMAIL_OUTBOX_QUEUE_SIZE)
+        self._slots = asyncio.Semaphore(self.pool_size)
+        self._sender = asyncio.create_task(self._run())
+        logger.info(f"Email outbox started ({self.pool_size} SMTP sessions, batches of {self.batch_size})")
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """Give queued messages a chance to go out, then stop the sender and close sessions"""
+        if not self._sender:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Email outbox stopped with {self._queue.qsize()} messages undelivered")
+
+        for task in [self._sender, *self._batches, *self._retries]:
+            task.cancel()
+        await asyncio.gather(self._sender, *self._batches, *self._retries, return_exceptions=True)
+        self._sender = None
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.pool.close_all)
+
+    async def enqueue(self, to_email: str, message: str) -> bool:
+        """Queue a fully rendered MIME message; returns False when the outbox is full"""
+        await self.start()
+        item = {
+            "id": str(uuid.uuid4()),
+            "to": to_email,
+            "message": message,
+            "attempts": 0,
+            "enqueued_at": time.monotonic()
+        }
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            logger.error(f"❌ Email outbox full, dropping message to {to_email}")
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Delivery metrics for monitoring"""
+        sent = self.stats["sent"]
+        return {
+            **{key: value for key, value in self.stats.items() if key != "total_send_seconds"},
+            **self.pool.stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "retry_pending": len(self._retries),
+            "avg_delivery_seconds": round(self.stats["total_send_seconds"] / sent, 3) if sent else None,
+            "running": bool(self._sender and not self._sender.done())
+        }
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            task = asyncio.create_task(self._deliver(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _deliver(self, batch: List[Dict[str, Any]]):
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self.executor, self._send_batch, batch)
+            self.stats["batches"] += 1
+
+            for item, error in zip(batch, results):
+                if error is None:
+                    self.stats["sent"] += 1
+                    self.stats["total_send_seconds"] += time.monotonic() - item["enqueued_at"]
+                    logger.info(f"✅ Email sent successfully to {item['to']}")
+                    continue
+
+                item["attempts"] += 1
+                self.stats["last_error"] = str(error)
+                if _is_transient(error) and item["attempts"] < self.max_attempts:
+                    self._schedule_retry(item)
+                else:
+                    self.stats["failed"] += 1
+                    logger.error(f"❌ Email to {item['to']} failed after {item['attempts']} attempt(s): {error}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+            self._slots.release()
+
+    def _send_batch(self, batch: List[Dict[str, Any]]) -> List[Optional[Exception]]:
+        """Send a batch over one pooled session (runs on the SMTP executor)"""
+        results: List[Optional[Exception]] = []
+        server = None
+        for item in batch:
+            try:
+                if server is None:
+                    server = self.pool.acquire()
+                server.sendmail(settings.FROM_EMAIL, [item["to"]], item["message"])
+                results.append(None)
+            except Exception as e:
+                results.append(e)
+                # A broken session is dropped; the next message opens a fresh one
+                if server is not None and not isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError)):
+                    self.pool.discard(server)
+                    server = None
+
+        if server is not None:
+            self.pool.release(server)
+        return results
+
+    def _schedule_retry(self, item: Dict[str, Any]):
+        delay = self.retry_base_seconds * (2 ** (item["attempts"] - 1))
+        delay += random.uniform(0, delay / 2)
+        self.stats["retried"] += 1
+        logger.warning(f"⚠️ Email to {item['to']} failed, retry {item['attempts']} in {delay:.1f}s")
+
+        async def requeue():
+            await asyncio.sleep(delay)
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.stats["failed"] += 1
+                logger.error(f"❌ Email outbox full, giving up on message to {item['to']}")
+
+        task = asyncio.create_task(requeue())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+
+# Create singleton instance
+email_outbox = EmailOutboxService()
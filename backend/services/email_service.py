@@ -2,7 +2,6 @@
 Email service for sending notifications and OTPs.
 """
 import logging
-import smtplib
 import re
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
@@ -10,6 +9,7 @@ from email.mime.multipart import MIMEMultipart
 from config.settings import settings
 from config.dynamodb import get_dynamodb
 from utils.helpers import generate_otp
+from services.email_outbox_service import email_outbox
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +22,7 @@ class EmailService:
         self.from_email = settings.FROM_EMAIL
     
     async def send_email(self, to_email: str, subject: str, body: str) -> bool:
-        """Send email with proper SMTP handling"""
+        """Queue an email on the outbox; delivery happens in the background"""
         try:
             # Extract OTP for logging
             otp_match = re.search(r'\b\d{6}\b', body)
@@ -33,16 +33,14 @@ class EmailService:
                 logger.info(f"🔑 OTP for {to_email}: {extracted_otp}")
                 print(f"🔑 DEVELOPMENT OTP for {to_email}: {extracted_otp}")
             
-            # Check credentials
-            if not self.smtp_username or not self.smtp_password:
+            # Check configuration (a local debug server needs no credentials)
+            has_credentials = self.smtp_username and self.smtp_password
+            if not self.smtp_server or (not has_credentials and settings.SMTP_SECURITY.lower() != "none"):
                 logger.warning("⚠️ SMTP credentials missing")
                 if extracted_otp:
                     print(f"🔑 USE THIS OTP: {extracted_otp}")
                 return False
             
-            logger.info(f"📧 Sending email to: {to_email}")
-            logger.info(f"📧 SMTP Config: {self.smtp_username} via {self.smtp_server}:{self.smtp_port}")
-            
             # Create message with proper encoding
             msg = MIMEMultipart('alternative')
             msg['From'] = f"AI Policy Tracker <{self.from_email}>"
@@ -58,83 +56,12 @@ class EmailService:
             msg.attach(text_part)
             msg.attach(html_part)
             
-            # Use proper SMTP connection with context manager
-            try:
-                # Create SMTP connection
-                logger.info(f"🔌 Connecting to {self.smtp_server}:{self.smtp_port}")
-                
-                # Use SMTP_SSL for port 465, SMTP + STARTTLS for port 587
-                if self.smtp_port == 465:
-                    logger.info("🔒 Using SMTP_SSL connection...")
-                    with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                        server.ehlo()
-                        logger.info(f"🔑 Authenticating as: {self.smtp_username}")
-                        server.login(self.smtp_username, self.smtp_password)
-                        
-                        logger.info("📤 Sending message...")
-                        text = msg.as_string()
-                        server.sendmail(self.from_email, [to_email], text)
-                        
-                        logger.info(f"✅ Email sent successfully to {to_email}")
-                        print(f"✅ EMAIL SENT SUCCESSFULLY to {to_email}")
-                        if extracted_otp:
-                            print(f"🔑 OTP delivered via email: {extracted_otp}")
-                        return True
-                else:
-                    logger.info("🔒 Using SMTP + STARTTLS connection...")
-                    with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                        server.ehlo()
-                        logger.info("🔒 Starting TLS...")
-                        server.starttls()
-                        server.ehlo()
-                        
-                        logger.info(f"🔑 Authenticating as: {self.smtp_username}")
-                        server.login(self.smtp_username, self.smtp_password)
-                        
-                        logger.info("📤 Sending message...")
-                        text = msg.as_string()
-                        server.sendmail(self.from_email, [to_email], text)
-                        
-                        logger.info(f"✅ Email sent successfully to {to_email}")
-                        print(f"✅ EMAIL SENT SUCCESSFULLY to {to_email}")
-                        if extracted_otp:
-                            print(f"🔑 OTP delivered via email: {extracted_otp}")
-                        return True
-                
-            except smtplib.SMTPAuthenticationError as e:
-                logger.error(f"❌ SMTP Authentication Error: {str(e)}")
-                print(f"❌ SMTP Authentication failed. Check username/password.")
-                if extracted_otp:
-                    print(f"🔑 USE THIS OTP: {extracted_otp}")
-                return False
-                
-            except smtplib.SMTPConnectError as e:
-                logger.error(f"❌ SMTP Connection Error: {str(e)}")
-                print(f"❌ Cannot connect to SMTP server {self.smtp_server}:{self.smtp_port}")
-                if extracted_otp:
-                    print(f"🔑 USE THIS OTP: {extracted_otp}")
-                return False
-                
-            except smtplib.SMTPRecipientsRefused as e:
-                logger.error(f"❌ Recipients Refused: {str(e)}")
-                print(f"❌ Email address {to_email} was refused by server")
-                if extracted_otp:
-                    print(f"🔑 USE THIS OTP: {extracted_otp}")
-                return False
-                
-            except smtplib.SMTPException as e:
-                logger.error(f"❌ SMTP Error: {str(e)}")
-                print(f"❌ SMTP Error: {str(e)}")
-                if extracted_otp:
-                    print(f"🔑 USE THIS OTP: {extracted_otp}")
-                return False
-                
-            except Exception as e:
-                logger.error(f"❌ Unexpected email error: {str(e)}")
-                print(f"❌ Unexpected error: {str(e)}")
-                if extracted_otp:
-                    print(f"🔑 USE THIS OTP: {extracted_otp}")
-                return False
+            queued = await email_outbox.enqueue(to_email, msg.as_string())
+            if queued:
+                logger.info(f"📧 Email to {to_email} queued for delivery")
+            elif extracted_otp:
+                print(f"🔑 USE THIS OTP: {extracted_otp}")
+            return queued
             
         except Exception as e:
             logger.error(f"❌ Email function error: {str(e)}")
@@ -0,0 +1,333 @@
+"""
+Map aggregate materializer
+Keeps one document per country in the map_aggregates table (approved policy counts per area,
+area points, color level and the most recent policies) and serves them as a single compact
+payload versioned by an ETag. Documents are recomputed for a country when its map policies
+change, so map requests never scan map_policies.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+
+from config.dynamodb import get_dynamodb
+from config.settings import settings
+from services.data_version_service import data_versions
+
+logger = logging.getLogger(__name__)
+
+COUNTRY_INDEX = 'country-approved-index'
+
+COLOR_LEGEND = {
+    "gray": "No approved areas (0 points)",
+    "red": "Low: 1-3 approved areas",
+    "yellow": "Medium: 4-7 approved areas",
+    "green": "High: 8-10 approved areas"
+}
+
+
+def area_point_level(area_points: int) -> Tuple[str, str]:
+    """Color and level from area points: 1-3 red, 4-7 yellow, 8-10 green"""
+    if area_points == 0:
+        return 'gray', 'no_approved_areas'
+    if area_points <= 3:
+        return 'red', 'low'
+    if area_points <= 7:
+        return 'yellow', 'medium'
+    return 'green', 'high'
+
+
+def policy_count_level(count: int) -> Tuple[str, str]:
+    """Color and level from the approved policy count, used by /api/policy/map-visualization"""
+    if 1 <= count <= 3:
+        return 'green', 'low'
+    if 4 <= count <= 7:
+        return 'yellow', 'medium'
+    if 8 <= count <= 10:
+        return 'red', 'high'
+    return 'blue', 'very_high'
+
+
+def _is_on_map(map_policy: Dict[str, Any]) -> bool:
+    return map_policy.get('status') == 'approved' and map_policy.get('visible_on_map', True) is not False
+
+
+def build_country_document(country: str, map_policies: List[Dict[str, Any]], top_per_area: int) -> Dict[str, Any]:
+    """Aggregate a country's map policies into its map document"""
+    areas: Dict[str, Dict[str, Any]] = {}
+    for policy in map_policies:
+        if not _is_on_map(policy):
+            continue
+        area = areas.setdefault(policy.get('policy_area', 'Unknown Area'), {"count": 0, "top_policies": []})
+        area["count"] += 1
+        area["top_policies"].append({
+            "policy_name": policy.get('policy_name', ''),
+            "policy_description": policy.get('policy_description', ''),
+            "approved_at": policy.get('approved_at', ''),
+            "map_policy_id": policy.get('map_policy_id', ''),
+            "parent_submission_id": policy.get('parent_submission_id', '')
+        })
+
+    for area in areas.values():
+        area["top_policies"].sort(key=lambda p: p["approved_at"], reverse=True)
+        del area["top_policies"][top_per_area:]
+
+    area_points = len(areas)
+    color, level = area_point_level(area_points)
+    return {
+        "country": country,
+        "total_approved_policies": sum(area["count"] for area in areas.values()),
+        "area_points": area_points,
+        "color": color,
+        "level": level,
+        "areas": areas,
+        "updated_at": datetime.utcnow().isoformat()
+    }
+
+
+def _from_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    # DynamoDB returns numbers as Decimal
+    return {
+        **item,
+        "total_approved_policies": int(item.get("total_approved_policies", 0)),
+        "area_points": int(item.get("area_points", 0)),
+        "areas": {
+            name: {"count": int(area.get("count", 0)), "top_policies": area.get("top_policies", [])}
+            for name, area in item.get("areas", {}).items()
+        }
+    }
+
+
+class MapAggregateService:
+    """Materialized per-country map documents with an ETag-versioned payload"""
+
+    def __init__(self):
+        self.reload_seconds = settings.MAP_AGGREGATE_RELOAD_SECONDS
+        self.top_per_area = settings.MAP_TOP_POLICIES_PER_AREA
+        self._countries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._loaded_at = 0.0
+        self._payload: Optional[Dict[str, Any]] = None
+        self._etag: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self.stats = {"loads": 0, "rebuilds": 0, "country_refreshes": 0}
+
+    async def _ensure_loaded(self):
+        """Load the country documents, re-reading them periodically to pick up other processes' writes"""
+        if self._countries is not None and time.monotonic() - self._loaded_at < self.reload_seconds:
+            return
+        async with self._lock:
+            if self._countries is not None and time.monotonic() - self._loaded_at < self.reload_seconds:
+                return
+            countries = await self._scan_aggregates(await get_dynamodb())
+            self.stats["loads"] += 1
+
+            if not countries and self._countries is None:
+                # First start against an existing map_policies table
+                await self._rebuild_locked()
+                return
+            self._set_countries(countries)
+
+    async def _scan_aggregates(self, db) -> Dict[str, Dict[str, Any]]:
+        """Every stored country document"""
+        countries = {}
+        start_key = None
+        while True:
+            page = await db.scan_page('map_aggregates', exclusive_start_key=start_key)
+            for item in page['items']:
+                countries[item['country']] = _from_item(item)
+            start_key = page['last_evaluated_key']
+            if not start_key:
+                return countries
+
+    def _set_countries(self, countries: Dict[str, Dict[str, Any]]):
+        self._countries = countries
+        self._loaded_at = time.monotonic()
+        self._render()
+
+    def _render(self):
+        """Build the compact payload and its ETag from the country documents"""
+        countries = []
+        for country in sorted(self._countries):
+            document = self._countries[country]
+            top = sorted(
+                ({"name": p["policy_name"], "area": area_name, "approved_at": p["approved_at"]}
+                 for area_name, area in document["areas"].items() for p in area["top_policies"]),
+                key=lambda p: p["approved_at"], reverse=True
+            )[:self.top_per_area]
+            countries.append({
+                "country": country,
+                "total": document["total_approved_policies"],
+                "area_points": document["area_points"],
+                "color": document["color"],
+                "level": document["level"],
+                "areas": {name: area["count"] for name, area in sorted(document["areas"].items())},
+                "top_policies": top
+            })
+
+        body = {
+            "countries": countries,
+            "total_countries": len(countries),
+            "total_approved_policies": sum(country["total"] for country in countries)
+        }
+        digest = hashlib.sha1(json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+        etag = f'"{digest[:20]}"'
+        if etag != self._etag:
+            data_versions.bump("map")
+        self._etag = etag
+        self._payload = {"version": self._etag.strip('"'), **body, "color_legend": COLOR_LEGEND}
+
+    # Updates
+
+    async def refresh_country(self, country: str):
+        """Recompute one country's document from its map policies after they change"""
+        try:
+            db = await get_dynamodb()
+            map_policies = []
+            start_key = None
+            while True:
+                page = await db.query_page('map_policies', Key('country').eq(country), index_name=COUNTRY_INDEX,
+                                           exclusive_start_key=start_key)
+                map_policies.extend(page['items'])
+                start_key = page['last_evaluated_key']
+                if not start_key:
+                    break
+
+            document = build_country_document(country, map_policies, self.top_per_area)
+            if document["total_approved_policies"]:
+                await db.insert_item('map_aggregates', document)
+            else:
+                await db.delete_item('map_aggregates', {'country': country})
+
+            self.stats["country_refreshes"] += 1
+            if self._countries is not None:
+                if document["total_approved_policies"]:
+                    self._countries[country] = document
+                else:
+                    self._countries.pop(country, None)
+                self._render()
+        except Exception as e:
+            # The periodic reload or the next rebuild catches up
+            logger.error(f"Error refreshing map aggregate for {country}: {str(e)}")
+
+    async def rebuild(self) -> Dict[str, Any]:
+        """Recompute every country document with one pass over map_policies"""
+        async with self._lock:
+            return await self._rebuild_locked()
+
+    async def _rebuild_locked(self) -> Dict[str, Any]:
+        db = await get_dynamodb()
+        by_country: Dict[str, List[Dict[str, Any]]] = {}
+        start_key = None
+        while True:
+            page = await db.scan_page('map_policies', exclusive_start_key=start_key)
+            for map_policy in page['items']:
+                by_country.setdefault(map_policy.get('country', 'Unknown'), []).append(map_policy)
+            start_key = page['last_evaluated_key']
+            if not start_key:
+                break
+
+        countries = {}
+        for country, map_policies in by_country.items():
+            document = build_country_document(country, map_policies, self.top_per_area)
+            if document["total_approved_policies"]:
+                countries[country] = document
+                await db.insert_item('map_aggregates', document)
+
+        # Read the stored documents rather than the in-memory ones: those are unset before the
+        # first load and may miss countries another process wrote
+        for stale_country in set(await self._scan_aggregates(db)) - set(countries):
+            await db.delete_item('map_aggregates', {'country': stale_country})
+
+        self._set_countries(countries)
+        self.stats["rebuilds"] += 1
+        logger.info(f"🗺️ Map aggregates rebuilt for {len(countries)} countries")
+        return {"countries": len(countries), "version": self._payload["version"]}
+
+    # Reads
+
+    async def get_payload(self) -> Tuple[Dict[str, Any], str]:
+        """Compact map payload and its ETag"""
+        await self._ensure_loaded()
+        return self._payload, self._etag
+
+    async def get_area_point_view(self) -> Dict[str, Any]:
+        """Country view with the area point system (admin map and dashboard)"""
+        await self._ensure_loaded()
+        countries_list = []
+        for country in sorted(self._countries):
+            document = self._countries[country]
+            countries_list.append({
+                'country': country,
+                'area_points': document["area_points"],  # Number of areas with approved policies
+                'total_approved_policies': document["total_approved_policies"],
+                'areas_with_approved_policies': list(document["areas"]),
+                'areas_detail': [
+                    {
+                        'area_name': area_name,
+                        'approved_policy_count': area["count"],
+                        'approved_policies': [
+                            {key: p[key] for key in ('policy_name', 'policy_description', 'approved_at')}
+                            for p in area["top_policies"]
+                        ],
+                        'has_approved': True
+                    }
+                    for area_name, area in document["areas"].items()
+                ],
+                'color': document["color"],
+                'level': document["level"],
+                'status': 'approved' if document["area_points"] > 0 else 'no_approved_policies'
+            })
+
+        return {
+            "success": True,
+            "countries": countries_list,
+            "total_countries": len(countries_list),
+            "total_approved_policies": sum(c['total_approved_policies'] for c in countries_list),
+            "area_point_system": {
+                "explanation": "Each area gets 1 point if it has at least one approved policy",
+                "color_coding": "Based on total area points per country"
+            },
+            "color_legend": COLOR_LEGEND,
+            "data_source": "Materialized map aggregates (approved policies from map_policies)",
+            "version": self._payload["version"]
+        }
+
+    async def get_policy_count_view(self) -> Dict[str, Any]:
+        """Country view colored by approved policy count (/api/policy/map-visualization)"""
+        payload, _ = await self.get_payload()
+        countries = []
+        for country in payload["countries"]:
+            color, level = policy_count_level(country["total"])
+            countries.append({
+                'country': country["country"],
+                'policy_count': country["total"],
+                'policies': [
+                    {'policy_name': p["name"], 'policy_area': p["area"], 'approved_at': p["approved_at"]}
+                    for p in country["top_policies"]
+                ],
+                'color': color,
+                'level': level
+            })
+        return {
+            "success": True,
+            "countries": countries,
+            "total_countries": len(countries),
+            "total_policies": payload["total_approved_policies"],
+            "version": payload["version"]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "countries": len(self._countries) if self._countries is not None else None,
+            "version": self._payload["version"] if self._payload else None
+        }
+
+
+# Create singleton instance
+map_aggregates = MapAggregateService()
@@ -0,0 +1,230 @@
+"""
+Adaptive Model Router
+Orders model/provider candidates by observed health and latency, caches negative
+results (access denied, unavailable model) for a TTL, and hedges slow calls
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelUnavailableError(Exception):
+    """Raised by an invoke function when a model cannot serve requests (no access, bad key, quota)"""
+
+
+class _ModelHealth:
+    """Rolling health statistics for one model"""
+
+    def __init__(self, latency_window: int):
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.latencies = deque(maxlen=latency_window)
+        self.blocked_until = 0.0
+        self.last_error: Optional[str] = None
+        self.calls = 0
+        self.failures = 0
+
+
+class ModelRouter:
+    """Routes calls across an ordered list of candidate models"""
+
+    def __init__(self, name: str, candidates: List[str],
+                 is_permanent_error: Callable[[Exception], bool] = None,
+                 negative_ttl_seconds: float = None, hedge_percentile: float = None,
+                 ewma_alpha: float = 0.3, max_error_rate: float = 0.5,
+                 latency_window: int = 50, min_hedge_samples: int = 5):
+        self.name = name
+        self.candidates = list(candidates)
+        self.is_permanent_error = is_permanent_error or (lambda error: isinstance(error, ModelUnavailableError))
+        self.negative_ttl_seconds = negative_ttl_seconds or settings.MODEL_ROUTER_NEGATIVE_TTL_SECONDS
+        self.hedge_percentile = hedge_percentile or settings.MODEL_ROUTER_HEDGE_PERCENTILE
+        self.ewma_alpha = ewma_alpha
+        self.max_error_rate = max_error_rate
+        self.min_hedge_samples = min_hedge_samples
+        self.hedged_calls = 0
+        self._health = {model: _ModelHealth(latency_window) for model in self.candidates}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # Health bookkeeping
+
+    def record_success(self, model: str, latency: float):
+        with self._lock:
+            health = self._health[model]
+            health.calls += 1
+            health.latencies.append(latency)
+            health.latency_ewma = latency if health.latency_ewma is None else (
+                self.ewma_alpha * latency + (1 - self.ewma_alpha) * health.latency_ewma
+            )
+            health.error_ewma = (1 - self.ewma_alpha) * health.error_ewma
+            health.blocked_until = 0.0
+
+    def record_failure(self, model: str, error: Optional[Exception] = None):
+        with self._lock:
+            health = self._health[model]
+            health.calls += 1
+            health.failures += 1
+            health.error_ewma = self.ewma_alpha + (1 - self.ewma_alpha) * health.error_ewma
+            health.last_error = str(error) if error else "invalid response"
+            if error is not None and self.is_permanent_error(error):
+                health.blocked_until = time.monotonic() + self.negative_ttl_seconds
+                logger.warning(f"[{self.name}] {model} unavailable, skipping for {self.negative_ttl_seconds:.0f}s")
+
+    def ordered_candidates(self, allowed: Optional[List[str]] = None) -> List[str]:
+        """
+        Healthy models fastest first, then untried models in preference order, then degraded
+        models. Models with a cached negative result are left out until their TTL expires.
+        """
+        now = time.monotonic()
+        measured, untried, degraded = [], [], []
+        with self._lock:
+            for model in self.candidates:
+                if allowed is not None and model not in allowed:
+                    continue
+                health = self._health[model]
+                if health.blocked_until > now:
+                    continue
+                if health.error_ewma >= self.max_error_rate:
+                    degraded.append(model)
+                elif health.latency_ewma is None:
+                    untried.append(model)
+                else:
+                    measured.append(model)
+            measured.sort(key=lambda model: self._health[model].latency_ewma)
+        return measured + untried + degraded
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Latency percentile after which a backup request is sent, or None with too few samples"""
+        with self._lock:
+            samples = sorted(self._health[model].latencies)
+        if len(samples) < self.min_hedge_samples:
+            return None
+        index = min(len(samples) - 1, int(self.hedge_percentile * len(samples)))
+        return samples[index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                model: {
+                    "latency_ewma_seconds": round(health.latency_ewma, 3) if health.latency_ewma is not None else None,
+                    "error_ewma": round(health.error_ewma, 3),
+                    "calls": health.calls,
+                    "failures": health.failures,
+                    "blocked_for_seconds": max(0, round(health.blocked_until - now)),
+                    "last_error": health.last_error
+                }
+                for model, health in self._health.items()
+            }
+        return {"router": self.name, "hedged_calls": self.hedged_calls, "models": models}
+
+    # Routing
+
+    def call_sync(self, invoke: Callable[[str], Optional[Any]],
+                  allowed: Optional[List[str]] = None) -> Tuple[Optional[str], Optional[Any]]:
+        """
+        Call invoke(model) for blocking clients (boto3). invoke returns a result, None for a
+        soft failure (e.g. unparseable output) or raises. Returns (model, result) or (None, None).
+        """
+        candidates = self.ordered_candidates(allowed)
+        if not candidates:
+            return None, None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix=f"{self.name}-router")
+
+        pending = {}
+        next_index = 0
+
+        def launch():
+            nonlocal next_index
+            model = candidates[next_index]
+            next_index += 1
+            pending[self._executor.submit(invoke, model)] = (model, time.monotonic())
+
+        while next_index < len(candidates) or pending:
+            if not pending:
+                launch()
+
+            timeout = self._pending_hedge_timeout(pending.values(), next_index < len(candidates))
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                self.hedged_calls += 1
+                launch()
+                continue
+
+            for future in done:
+                model, started = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.record_failure(model, e)
+                    continue
+                if result is None:
+                    self.record_failure(model)
+                    continue
+                self.record_success(model, time.monotonic() - started)
+                return model, result
+
+        return None, None
+
+    async def call(self, invoke: Callable[[str], Awaitable[Optional[Any]]],
+                   allowed: Optional[List[str]] = None) -> Tuple[Optional[str], Optional[Any]]:
+        """Async counterpart of call_sync; losing hedged requests are cancelled"""
+        candidates = self.ordered_candidates(allowed)
+        pending = {}
+        next_index = 0
+
+        def launch():
+            nonlocal next_index
+            model = candidates[next_index]
+            next_index += 1
+            pending[asyncio.ensure_future(invoke(model))] = (model, time.monotonic())
+
+        try:
+            while next_index < len(candidates) or pending:
+                if not pending:
+                    launch()
+
+                timeout = self._pending_hedge_timeout(pending.values(), next_index < len(candidates))
+                done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedged_calls += 1
+                    launch()
+                    continue
+
+                for task in done:
+                    model, started = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        self.record_failure(model, e)
+                        continue
+                    if result is None:
+                        self.record_failure(model)
+                        continue
+                    self.record_success(model, time.monotonic() - started)
+                    return model, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return None, None
+
+    def _pending_hedge_timeout(self, in_flight, can_hedge: bool) -> Optional[float]:
+        """Seconds to wait before hedging; only one backup request is sent at a time"""
+        in_flight = list(in_flight)
+        if not can_hedge or len(in_flight) > 1:
+            return None
+        model, started = in_flight[0]
+        delay = self.hedge_delay(model)
+        if delay is None:
+            return None
+        return max(0.0, delay - (time.monotonic() - started))
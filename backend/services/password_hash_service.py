@@ -0,0 +1,172 @@
+"""
+Password hashing service
+Runs bcrypt on a dedicated bounded thread pool so logins do not block the event loop,
+limits how much hashing work can queue up, and throttles repeated failed logins per account and IP
+"""
+import asyncio
+import ipaddress
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+
+from config.settings import settings
+from utils import security
+
+logger = logging.getLogger(__name__)
+
+
+class _SlidingWindow:
+    """Timestamps of recent events per key within a fixed window"""
+
+    # Expired keys are swept once this many keys are tracked
+    MAX_KEYS = 10000
+
+    def __init__(self, limit: int, window_seconds: int):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._events: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, key: str, now: float) -> deque:
+        events = self._events.get(key)
+        if events is None:
+            return deque()
+        while events and now - events[0] > self.window_seconds:
+            events.popleft()
+        if not events:
+            del self._events[key]
+        return events
+
+    def retry_after(self, key: str) -> int:
+        """Seconds until another event is allowed, 0 when under the limit"""
+        now = time.monotonic()
+        with self._lock:
+            events = self._prune(key, now)
+            if len(events) < self.limit:
+                return 0
+            return max(1, int(self.window_seconds - (now - events[0])) + 1)
+
+    def add(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._events) >= self.MAX_KEYS:
+                for stale_key in list(self._events):
+                    self._prune(stale_key, now)
+            self._events.setdefault(key, deque()).append(now)
+
+    def clear(self, key: str):
+        with self._lock:
+            self._events.pop(key, None)
+
+    def __len__(self):
+        return len(self._events)
+
+
+class PasswordHashService:
+    """bcrypt offloaded to a bounded executor with a concurrency governor and login throttling"""
+
+    def __init__(self):
+        self.workers = settings.PASSWORD_HASH_WORKERS
+        self.max_pending = settings.PASSWORD_HASH_MAX_PENDING
+        self.queue_timeout = settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        # One slot per worker - callers wait here instead of piling up on the executor queue
+        self._slots = asyncio.Semaphore(self.workers)
+        self._waiting = 0
+        self.account_failures = _SlidingWindow(settings.LOGIN_ACCOUNT_MAX_FAILURES, settings.LOGIN_ACCOUNT_WINDOW_SECONDS)
+        self.ip_failures = _SlidingWindow(settings.LOGIN_IP_MAX_FAILURES, settings.LOGIN_IP_WINDOW_SECONDS)
+        # "*" trusts every forwarder, so request.client is always the forwarded client
+        self.proxy_networks = [ipaddress.ip_network(host, strict=False)
+                               for host in settings.FORWARDED_ALLOW_IPS if host != "*"]
+        self.stats = {"hashes": 0, "verifications": 0, "rejected_busy": 0, "throttled": 0}
+
+    async def _run(self, func, *args):
+        """Run a bcrypt call on the executor once a slot is free, or fail fast with 503"""
+        if self._waiting >= self.max_pending:
+            self.stats["rejected_busy"] += 1
+            raise HTTPException(status_code=503, detail="Authentication service is busy, please retry shortly",
+                                headers={"Retry-After": "1"})
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected_busy"] += 1
+            raise HTTPException(status_code=503, detail="Authentication service is busy, please retry shortly",
+                                headers={"Retry-After": "1"})
+        finally:
+            self._waiting -= 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self._slots.release()
+
+    async def hash_password(self, password: str) -> str:
+        """Hash a password with bcrypt off the event loop"""
+        self.stats["hashes"] += 1
+        return await self._run(security.hash_password, password)
+
+    async def verify_password(self, password: str, hashed_password: Optional[str]) -> bool:
+        """Verify a password against its bcrypt hash off the event loop"""
+        if not hashed_password:
+            return False
+        self.stats["verifications"] += 1
+        return await self._run(security.verify_password, password, hashed_password)
+
+    # Throttling
+
+    def _throttled_ip(self, client_ip: Optional[str]) -> Optional[str]:
+        """client_ip, or None when unknown or a proxy's address (shared by everyone behind it)"""
+        if not client_ip:
+            return None
+        try:
+            address = ipaddress.ip_address(client_ip)
+        except ValueError:
+            return client_ip
+        if any(address in network for network in self.proxy_networks):
+            return None
+        return client_ip
+
+    def check_login_allowed(self, email: str, client_ip: Optional[str] = None):
+        """Raise 429 when the account or the IP has too many recent failed logins"""
+        retry_after = self.account_failures.retry_after(email.lower())
+        client_ip = self._throttled_ip(client_ip)
+        if client_ip:
+            retry_after = max(retry_after, self.ip_failures.retry_after(client_ip))
+
+        if retry_after:
+            self.stats["throttled"] += 1
+            logger.warning(f"Login throttled for {email} from {client_ip or 'unknown ip'} ({retry_after}s)")
+            raise HTTPException(status_code=429, detail=f"Too many login attempts. Try again in {retry_after} seconds",
+                                headers={"Retry-After": str(retry_after)})
+
+    def record_login_failure(self, email: str, client_ip: Optional[str] = None):
+        self.account_failures.add(email.lower())
+        client_ip = self._throttled_ip(client_ip)
+        if client_ip:
+            self.ip_failures.add(client_ip)
+
+    def record_login_success(self, email: str):
+        self.account_failures.clear(email.lower())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return governor and throttling counters"""
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "waiting": self._waiting,
+            "max_pending": self.max_pending,
+            "tracked_accounts": len(self.account_failures),
+            "tracked_ips": len(self.ip_failures)
+        }
+
+
+# Create singleton instance
+password_hash_service = PasswordHashService()
@@ -0,0 +1,152 @@
+"""
+Policy Quality Service
+Checks policies against the data-quality rules when they are submitted, approved or loaded
+into the chatbot cache, and stores the outcome on each policy (quality_ok, quality_issues) so
+readers such as the chatbot only test a flag. Also builds the admin quality report.
+"""
+import hashlib
+import json
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config.data_constants import POLICY_QUALITY_RULES
+from config.dynamodb import get_dynamodb
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Attributes the quality report reads
+QUALITY_REPORT_FIELDS = ('policy_id', 'country', 'status', 'policy_areas')
+
+
+@dataclass(frozen=True)
+class QualityRule:
+    """Flags a policy whose text contains one of `terms`, for the listed countries (empty: all)"""
+    id: str
+    reason: str
+    terms: Tuple[str, ...]
+    countries: Tuple[str, ...] = ()
+    fields: Tuple[str, ...] = ("policyName", "policyDescription")
+
+
+def load_rules(path: Optional[str] = None) -> List[QualityRule]:
+    """The rules of a JSON file, or the defaults from data_constants"""
+    definitions = POLICY_QUALITY_RULES
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            definitions = json.load(f)
+    return [
+        QualityRule(
+            id=definition['id'],
+            reason=definition['reason'],
+            terms=tuple(term.lower() for term in definition['terms']),
+            countries=tuple(country.lower() for country in definition.get('countries', [])),
+            fields=tuple(definition.get('fields', QualityRule.fields))
+        )
+        for definition in definitions
+    ]
+
+
+class PolicyQualityService:
+    """Evaluates the quality rules and records the result on policies"""
+
+    def __init__(self, rules: Optional[Sequence[QualityRule]] = None):
+        self.rules = list(rules) if rules is not None else load_rules(settings.POLICY_QUALITY_RULES_FILE)
+        # Policies checked under other rules are re-checked when next seen
+        self.version = hashlib.sha256(repr(self.rules).encode('utf-8')).hexdigest()[:12]
+        self._patterns = {
+            rule.id: re.compile("|".join(re.escape(term) for term in rule.terms)) for rule in self.rules if rule.terms
+        }
+
+    def evaluate(self, policy: Dict[str, Any], country: str) -> List[Dict[str, str]]:
+        """Issues of one policy of a submission filed under country"""
+        country = (country or '').strip().lower()
+        issues = []
+        for rule in self.rules:
+            pattern = self._patterns.get(rule.id)
+            if pattern is None or (rule.countries and country not in rule.countries):
+                continue
+            text = "\n".join(str(policy.get(field) or '') for field in rule.fields).lower()
+            if pattern.search(text):
+                issues.append({'rule': rule.id, 'reason': rule.reason})
+        return issues
+
+    def is_current(self, policy: Dict[str, Any]) -> bool:
+        return policy.get('quality_rules_version') == self.version and 'quality_ok' in policy
+
+    def check_policy(self, policy: Dict[str, Any], country: str) -> bool:
+        """Evaluate one policy and record the result on it; True when it passed"""
+        issues = self.evaluate(policy, country)
+        policy['quality_ok'] = not issues
+        policy['quality_issues'] = issues
+        policy['quality_rules_version'] = self.version
+        policy['quality_checked_at'] = datetime.utcnow().isoformat()
+        return not issues
+
+    def check_submission(self, submission: Dict[str, Any], force: bool = False) -> int:
+        """Record results on every policy of a submission (only stale ones unless force); returns the number flagged"""
+        flagged = 0
+        for area in submission.get('policy_areas', []):
+            for policy in area.get('policies', []):
+                if force or not self.is_current(policy):
+                    self.check_policy(policy, submission.get('country', ''))
+                if not policy.get('quality_ok', True):
+                    flagged += 1
+        if flagged:
+            logger.info(f"Submission {submission.get('policy_id')}: {flagged} policies flagged by quality rules")
+        return flagged
+
+    async def report(self, recheck: bool = False) -> Dict[str, Any]:
+        """
+        Flagged policies and counts per rule. Policies checked under older rules (or never) are
+        evaluated for the report; with recheck the results are also stored on their submissions.
+        """
+        db = await get_dynamodb()
+        submissions = await db.scan_table('policies', fields=QUALITY_REPORT_FIELDS)
+
+        totals = {'policies': 0, 'flagged': 0, 'stale': 0, 'updated_submissions': 0}
+        by_rule = {rule.id: 0 for rule in self.rules}
+        flagged = []
+        for submission in submissions:
+            stale = 0
+            for area in submission.get('policy_areas', []):
+                for index, policy in enumerate(area.get('policies', [])):
+                    totals['policies'] += 1
+                    if not self.is_current(policy):
+                        stale += 1
+                        self.check_policy(policy, submission.get('country', ''))
+                    if policy['quality_ok']:
+                        continue
+                    totals['flagged'] += 1
+                    for issue in policy['quality_issues']:
+                        by_rule[issue['rule']] = by_rule.get(issue['rule'], 0) + 1
+                    flagged.append({
+                        'submission_id': submission.get('policy_id'),
+                        'status': submission.get('status'),
+                        'country': submission.get('country'),
+                        'area_id': area.get('area_id'),
+                        'area_name': area.get('area_name'),
+                        'policy_index': index,
+                        'policy_name': policy.get('policyName', ''),
+                        'policy_status': policy.get('status'),
+                        'issues': policy['quality_issues']
+                    })
+            totals['stale'] += stale
+            if recheck and stale:
+                if await db.update_item('policies', {'policy_id': submission['policy_id']},
+                                        {'policy_areas': submission['policy_areas']}):
+                    totals['updated_submissions'] += 1
+
+        return {
+            'rules_version': self.version,
+            'rules': [{'id': rule.id, 'reason': rule.reason, 'flagged': by_rule.get(rule.id, 0)} for rule in self.rules],
+            'totals': totals,
+            'flagged': flagged
+        }
+
+
+# Create singleton instance
+policy_quality = PolicyQualityService()
@@ -9,6 +9,9 @@ import uuid
 from config.dynamodb import get_dynamodb
 from config.data_constants import POLICY_AREAS
 from utils.helpers import convert_objectid, calculate_policy_score, calculate_completeness_score
+from services.search_index_service import policy_search_index, submission_highlights
+from services.map_aggregate_service import map_aggregates
+from services.policy_quality_service import policy_quality
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +88,7 @@ class PolicyService:
             # Calculate scores
             submission_dict["score"] = calculate_policy_score(submission_dict)
             submission_dict["completeness_score"] = calculate_completeness_score(submission_dict)
+            policy_quality.check_submission(submission_dict)
             
             # Save to policies table
             success = await db.insert_item('policies', submission_dict)
@@ -92,6 +96,8 @@ class PolicyService:
             if not success:
                 raise HTTPException(status_code=500, detail="Failed to save submission")
             
+            policy_search_index.index_submission(submission_dict)
+            
             logger.info(f"✅ Submission saved with ID: {submission_dict['policy_id']}")
             
             return {
@@ -171,6 +177,10 @@ class PolicyService:
                 update_data["visible_on_map"] = True
                 update_data["approved_at"] = datetime.utcnow().isoformat()
                 
+                # Re-check quality with the current rules before the policies go live
+                policy_quality.check_submission(policy, force=True)
+                update_data["policy_areas"] = policy.get("policy_areas", [])
+                
                 # Create individual policy entries for map visualization
                 await self._create_map_policy_entries(policy, admin_user)
             else:
@@ -181,6 +191,8 @@ class PolicyService:
             if not success:
                 raise HTTPException(status_code=500, detail="Failed to update policy status")
             
+            policy_search_index.index_submission({**policy, **update_data})
+            
             logger.info(f"Policy {submission_id} status updated to {new_status} by {admin_user['email']}")
             
             return {
@@ -229,6 +241,7 @@ class PolicyService:
                     # Save to map_policies table
                     await db.insert_item('map_policies', map_policy_entry)
             
+            await map_aggregates.refresh_country(policy["country"])
             logger.info(f"Created map policy entries for submission {policy['policy_id']}")
             
         except Exception as e:
@@ -291,35 +304,21 @@ class PolicyService:
             raise HTTPException(status_code=500, detail="Failed to get country policies")
 
     async def search_policies(self, query: str, country: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
-        """Search policies by query"""
+        """Search approved policies by query, best matches first"""
         try:
             db = await self._get_db()
             
-            # Get all approved policies
-            all_policies = await db.scan_table('policies')
-            approved_policies = [p for p in all_policies if p.get('status') == 'approved']
+            _, hits = await policy_search_index.search(query, status="approved", country=country, limit=limit)
             
-            # Filter by country if specified
-            if country:
-                approved_policies = [p for p in approved_policies if p.get('country', '').lower() == country.lower()]
-            
-            # Simple text search
-            query_lower = query.lower()
             matching_policies = []
-            
-            for policy in approved_policies:
-                # Search in policy areas and policy names
-                policy_text = f"{policy.get('country', '')} ".lower()
-                for area in policy.get('policy_areas', []):
-                    policy_text += f"{area.get('area_name', '')} ".lower()
-                    for pol in area.get('policies', []):
-                        policy_text += f"{pol.get('policyName', '')} {pol.get('description', '')} ".lower()
-                
-                if query_lower in policy_text:
+            for hit in hits:
+                policy = await db.get_item('policies', {'policy_id': hit["id"]})
+                if policy:
+                    policy["search_score"] = hit["score"]
+                    policy["search_highlights"] = submission_highlights(policy, hit["terms"])
                     matching_policies.append(policy)
             
-            # Limit results
-            return matching_policies[:limit]
+            return matching_policies
             
         except Exception as e:
             logger.error(f"Error searching policies: {str(e)}")
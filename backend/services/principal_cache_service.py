@@ -0,0 +1,122 @@
+"""
+Authenticated principal cache
+Keeps the user record resolved for a JWT (keyed by its sub and iat) for a short TTL so
+authenticated requests skip the DynamoDB lookup, with negative caching and single-flight loads
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PrincipalKey = Tuple[str, str]
+
+
+class PrincipalCacheService:
+    """
+    Per-process cache of authenticated principals. Admin actions that change a user
+    call invalidate_user; other processes pick the change up once the TTL expires.
+    """
+
+    def __init__(self, ttl_seconds: int = None, negative_ttl_seconds: int = None, max_entries: int = None):
+        self.ttl_seconds = ttl_seconds or settings.PRINCIPAL_CACHE_TTL_SECONDS
+        self.negative_ttl_seconds = negative_ttl_seconds or settings.PRINCIPAL_CACHE_NEGATIVE_TTL_SECONDS
+        self.max_entries = max_entries or settings.PRINCIPAL_CACHE_MAX_ENTRIES
+        # key -> (expires_at, principal or None, user ids the entry is indexed under)
+        self._entries: "OrderedDict[PrincipalKey, Tuple[float, Optional[Dict[str, Any]], Set[str]]]" = OrderedDict()
+        self._user_keys: Dict[str, Set[PrincipalKey]] = {}
+        self._inflight: Dict[PrincipalKey, asyncio.Task] = {}
+        # Bumped on every invalidation so loads that started earlier are not cached
+        self._generation = 0
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+
+    async def get_principal(self, subject: str, issued_at: str,
+                            loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached user dict for a token, or load it with loader().
+        Returns None when the user does not exist (cached for the negative TTL). Errors
+        raised by loader propagate and are not cached.
+        """
+        key = (subject, str(issued_at))
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, principal, _ = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                if principal is None:
+                    self.stats["negative_hits"] += 1
+                    return None
+                self.stats["hits"] += 1
+                return dict(principal)
+            self._remove(key)
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+
+        # Shielded so a cancelled request does not cancel the load other requests wait on
+        principal = await asyncio.shield(task)
+        return dict(principal) if principal is not None else None
+
+    async def _load(self, key: PrincipalKey, loader) -> Optional[Dict[str, Any]]:
+        generation = self._generation
+        principal = await loader()
+        if generation == self._generation:
+            self._store(key, principal)
+        return principal
+
+    def _store(self, key: PrincipalKey, principal: Optional[Dict[str, Any]]):
+        self._remove(key)
+        ttl = self.ttl_seconds if principal is not None else self.negative_ttl_seconds
+
+        # Index under the token subject and the resolved user id (they differ after an email fallback)
+        user_ids = {key[0]}
+        if principal is not None and principal.get('user_id'):
+            user_ids.add(principal['user_id'])
+        for user_id in user_ids:
+            self._user_keys.setdefault(user_id, set()).add(key)
+
+        self._entries[key] = (time.monotonic() + ttl, principal, user_ids)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: PrincipalKey):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for user_id in entry[2]:
+            keys = self._user_keys.get(user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._user_keys[user_id]
+
+    def invalidate_user(self, user_id: str):
+        """Drop every cached token principal for a user after their record changes"""
+        self._generation += 1
+        self.stats["invalidations"] += 1
+        for key in list(self._user_keys.get(user_id, ())):
+            self._remove(key)
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+        self._user_keys.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        return {**self.stats, "entries": len(self._entries), "max_entries": self.max_entries}
+
+
+# Create singleton instance
+principal_cache = PrincipalCacheService()
@@ -15,12 +15,10 @@ Key Features:
 - Hybrid retrieval (keyword + semantic)
 - Context-aware response generation
 """
+from __future__ import annotations
 
 import asyncio
 import json
-import numpy as np
-import faiss
-import openai
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import hashlib
@@ -28,6 +26,12 @@ import os
 import pickle
 from dataclasses import dataclass
 from config.dynamodb import get_dynamodb, DynamoDBClient
+from utils.lazy_imports import lazy_import
+
+# Imported on first use so the RAG stack does not slow down startup
+np = lazy_import("numpy")
+faiss = lazy_import("faiss")
+openai = lazy_import("openai")
 
 @dataclass
 class ConversationEntry:
@@ -59,8 +63,6 @@ class RAGChatbotService:
         
         # OpenAI API setup
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        if self.openai_api_key:
-            openai.api_key = self.openai_api_key
         
         # GROQ backup
         self.groq_api_key = os.getenv('GROQ_API_KEY')
@@ -120,6 +122,8 @@ class RAGChatbotService:
                 return None
             
             # Use OpenAI embeddings API
+            if self.openai_api_key:
+                openai.api_key = self.openai_api_key
             response = await asyncio.get_event_loop().run_in_executor(
                 None,
                 lambda: openai.embeddings.create(
@@ -0,0 +1,220 @@
+"""
+Policy search index
+Full-text index over the policies table for admin and public policy search. Built from a
+projected scan on first use, kept current by the services that write submissions, and
+rebuilt in the background once it is older than SEARCH_INDEX_REFRESH_SECONDS so writes
+made by other processes show up.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.dynamodb import get_dynamodb
+from config.settings import settings
+from services.data_version_service import data_versions
+from utils.text_index import TextIndex, highlight
+
+logger = logging.getLogger(__name__)
+
+FIELD_WEIGHTS = {
+    "country": 3.0,
+    "policy_name": 3.0,
+    "area_name": 2.0,
+    "policy_id": 2.0,
+    "user_email": 2.0,
+    "description": 1.0
+}
+
+# Attributes read when building the index
+INDEX_FIELDS = ("policy_id", "user_id", "user_email", "country", "status", "created_at", "policy_areas",
+                "title", "content")
+
+
+def submission_document(submission: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Searchable fields and filter metadata for a policies item"""
+    # Items written through the Policy model carry a title and content instead of policy areas
+    area_names, policy_names, descriptions, policy_ids = [], [submission.get("title", "")], [submission.get("content", "")], []
+    for area in submission.get("policy_areas", []) or []:
+        area_names.append(area.get("area_name", ""))
+        for policy in area.get("policies", []) or []:
+            policy_names.append(policy.get("policyName", ""))
+            descriptions.append(policy.get("policyDescription") or policy.get("description") or "")
+            policy_ids.append(policy.get("policyId", ""))
+
+    fields = {
+        "country": submission.get("country", ""),
+        "policy_id": [submission.get("policy_id", "")] + policy_ids,
+        "user_email": submission.get("user_email", ""),
+        "area_name": area_names,
+        "policy_name": policy_names,
+        "description": descriptions
+    }
+    meta = {
+        "status": (submission.get("status") or "").lower(),
+        "country": (submission.get("country") or "").lower(),
+        "user_id": submission.get("user_id"),
+        "created_at": submission.get("created_at", "")
+    }
+    return fields, meta
+
+
+def submission_highlights(submission: Dict[str, Any], terms: List[str]) -> Dict[str, str]:
+    """Highlighted snippets for the fields of a submission that matched"""
+    if not terms:
+        return {}
+    highlights = {}
+    for field, key in (("country", "country"), ("user_email", "user_email"), ("policy_id", "policy_id"),
+                       ("policy_name", "title"), ("description", "content")):
+        snippet = highlight(submission.get(key) or "", terms)
+        if snippet:
+            highlights[field] = snippet
+
+    for area in submission.get("policy_areas", []) or []:
+        snippet = highlight(area.get("area_name", ""), terms)
+        if snippet:
+            highlights.setdefault("area_name", snippet)
+        for policy in area.get("policies", []) or []:
+            for field, key in (("policy_name", "policyName"), ("description", "policyDescription"),
+                               ("description", "description")):
+                if field in highlights:
+                    continue
+                snippet = highlight(policy.get(key) or "", terms)
+                if snippet:
+                    highlights[field] = snippet
+    return highlights
+
+
+class PolicySearchIndexService:
+    """Process-wide full-text index of policy submissions"""
+
+    def __init__(self):
+        self.refresh_seconds = settings.SEARCH_INDEX_REFRESH_SECONDS
+        self.index = TextIndex(FIELD_WEIGHTS)
+        self._built_at: Optional[float] = None
+        self._build_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Writes seen while a rebuild is running, replayed onto the new index
+        self._pending: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+        self.stats = {"builds": 0, "queries": 0, "updates": 0, "last_build_seconds": None}
+
+    async def ensure_ready(self):
+        """Build the index on first use and refresh it in the background once stale"""
+        if self._built_at is None:
+            async with self._build_lock:
+                if self._built_at is None:
+                    await self._rebuild()
+        elif time.monotonic() - self._built_at > self.refresh_seconds:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self):
+        async with self._build_lock:
+            try:
+                await self._rebuild()
+            except Exception as e:
+                logger.error(f"Search index refresh failed: {str(e)}")
+                # Keep serving the current index and try again after another interval
+                self._built_at = time.monotonic()
+
+    async def _rebuild(self):
+        started = time.perf_counter()
+        db = await get_dynamodb()
+        index = TextIndex(FIELD_WEIGHTS)
+        self._pending = {}
+        try:
+            start_key = None
+            while True:
+                page = await db.scan_page(
+                    'policies',
+                    fields=INDEX_FIELDS,
+                    exclusive_start_key=start_key
+                )
+                for submission in page['items']:
+                    if submission.get('policy_id'):
+                        index.add(submission['policy_id'], *submission_document(submission))
+                start_key = page['last_evaluated_key']
+                if not start_key:
+                    break
+                # Let requests run between pages
+                await asyncio.sleep(0)
+
+            for policy_id, submission in self._pending.items():
+                if submission is None:
+                    index.remove(policy_id)
+                else:
+                    index.add(policy_id, *submission_document(submission))
+        finally:
+            self._pending = None
+
+        self.index = index
+        self._built_at = time.monotonic()
+        self.stats["builds"] += 1
+        self.stats["last_build_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"🔎 Search index built: {len(index)} submissions, {index.vocabulary_size} terms "
+                    f"in {self.stats['last_build_seconds']}s")
+
+    # Incremental updates
+
+    def index_submission(self, submission: Dict[str, Any]):
+        """Add or replace a submission after it is written"""
+        policy_id = submission.get('policy_id')
+        if not policy_id:
+            return
+        self.stats["updates"] += 1
+        # Every policies write reaches the index, so it also marks cached policy responses stale
+        data_versions.bump("policies")
+        if self._pending is not None:
+            self._pending[policy_id] = submission
+        if self._built_at is not None:
+            self.index.add(policy_id, *submission_document(submission))
+
+    def remove_submission(self, policy_id: str):
+        """Drop a deleted submission"""
+        self.stats["updates"] += 1
+        data_versions.bump("policies")
+        if self._pending is not None:
+            self._pending[policy_id] = None
+        self.index.remove(policy_id)
+
+    # Queries
+
+    async def search(self, query: str, status: Optional[str] = None, country: Optional[str] = None,
+                     user_id: Optional[str] = None, page: int = 1, limit: int = 20,
+                     fuzzy: bool = True) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Return (total matches, hits) for a query; hits carry the policy_id as "id" and the
+        matched terms for submission_highlights. An empty query lists newest submissions first.
+        """
+        await self.ensure_ready()
+        self.stats["queries"] += 1
+
+        status = status.lower() if status and status != "all" else None
+        country = country.lower() if country else None
+
+        def doc_filter(meta: Dict[str, Any]) -> bool:
+            return ((status is None or meta["status"] == status) and
+                    (country is None or meta["country"] == country) and
+                    (user_id is None or meta["user_id"] == user_id))
+
+        use_filter = status is not None or country is not None or user_id is not None
+        return self.index.search(
+            query,
+            limit=limit,
+            offset=(page - 1) * limit,
+            fuzzy=fuzzy,
+            doc_filter=doc_filter if use_filter else None,
+            sort_key=lambda meta: meta["created_at"]
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "documents": len(self.index),
+            "terms": self.index.vocabulary_size,
+            "age_seconds": round(time.monotonic() - self._built_at, 1) if self._built_at is not None else None
+        }
+
+
+# Create singleton instance
+policy_search_index = PolicySearchIndexService()
@@ -6,11 +6,12 @@ This service provides conversation memory without requiring OpenAI embeddings.
 It uses the enhanced chatbot service with conversation context.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional
 from datetime import datetime
 import uuid
 
-from services.conversation_memory_service import conversation_memory_service, ConversationMessage
+from services.conversation_memory_service import conversation_memory_service
+from services.conversation_summary_service import conversation_summaries, ConversationContext
 from services.chatbot_service_enhanced import EnhancedChatbotService
 from models.chat import ChatRequest, ChatResponse
 
@@ -44,41 +45,53 @@ class SimpleConversationalService:
             user_id = request.user_id
             user_message = request.message
             
-            # 1. Get conversation context (previous messages)
-            conversation_context = await self.memory_service.get_conversation_context(
-                conversation_id=conversation_id,
-                include_messages=8  # Get last 8 messages for context
-            )
+            # 1. Get conversation context (rolling summary plus the messages after it)
+            context = await conversation_summaries.get_context(conversation_id)
+            conversation_context = context.messages
+            context_str = await self._format_context_for_ai(context, user_message)
+            token_usage = conversation_summaries.record_prompt(context, context_str)
             
-            # 2. Add current user message to conversation
-            current_message = await self.memory_service.add_message(
-                conversation_id=conversation_id,
-                role="user",
-                content=user_message,
-                user_id=user_id,
-                metadata={"timestamp": datetime.utcnow().isoformat()}
-            )
+            # 2. Note when the user message arrived; it is stored with the response below, or on
+            # its own if no response could be generated
+            received_at = datetime.utcnow()
             
             # 3. Generate context-aware response
-            response_text = await self._generate_response_with_context(
-                user_message=user_message,
-                conversation_context=conversation_context,
-                conversation_id=conversation_id,
+            try:
+                response_text = await self._generate_response_with_context(
+                    user_message=user_message,
+                    context_str=context_str,
+                    conversation_id=conversation_id,
+                    user_id=user_id
+                )
+            except Exception as e:
+                await self._store_failed_turn(conversation_id, user_message, received_at, user_id, e)
+                raise
+            
+            # 4. Store the user message and the assistant response in one write
+            current_message, _ = await self.memory_service.add_messages(
+                conversation_id,
+                [
+                    {
+                        "role": "user",
+                        "content": user_message,
+                        "timestamp": received_at,
+                        "metadata": {"timestamp": received_at.isoformat()}
+                    },
+                    {
+                        "role": "assistant",
+                        "content": response_text,
+                        "metadata": {
+                            "timestamp": datetime.utcnow().isoformat(),
+                            "context_used": len(conversation_context) > 0,
+                            "context_messages": len(conversation_context)
+                        }
+                    }
+                ],
                 user_id=user_id
             )
             
-            # 4. Add assistant response to conversation
-            await self.memory_service.add_message(
-                conversation_id=conversation_id,
-                role="assistant",
-                content=response_text,
-                user_id=user_id,
-                metadata={
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "context_used": len(conversation_context) > 0,
-                    "context_messages": len(conversation_context)
-                }
-            )
+            # Fold older turns into the summary once enough have piled up
+            conversation_summaries.schedule(conversation_id)
             
             # 5. Create response
             return ChatResponse(
@@ -89,6 +102,8 @@ class SimpleConversationalService:
                 metadata={
                     "conversation_context_used": len(conversation_context) > 0,
                     "context_messages_count": len(conversation_context),
+                    "conversation_summary_used": bool(context.summary),
+                    **token_usage,
                     "response_source": "simple_conversational",
                     "no_embeddings_required": True
                 }
@@ -105,18 +120,33 @@ class SimpleConversationalService:
                 metadata={"error": str(e), "response_source": "fallback"}
             )
     
+    async def _store_failed_turn(self, conversation_id: str, user_message: str, received_at: datetime,
+                                 user_id: Optional[str], error: Exception):
+        """Store the user message of a turn that got no response, marked as failed"""
+        try:
+            await self.memory_service.add_messages(
+                conversation_id,
+                [{
+                    "role": "user",
+                    "content": user_message,
+                    "timestamp": received_at,
+                    "metadata": {"timestamp": received_at.isoformat(), "failed_turn": True, "error": str(error)}
+                }],
+                user_id=user_id
+            )
+            conversation_summaries.schedule(conversation_id)
+        except Exception as e:
+            print(f"❌ Error storing failed turn: {e}")
+    
     async def _generate_response_with_context(
         self,
         user_message: str,
-        conversation_context: List[ConversationMessage],
+        context_str: str,
         conversation_id: str,
         user_id: Optional[str]
     ) -> str:
         """Generate response with conversation context using enhanced chatbot"""
         try:
-            # Format conversation context for AI
-            context_str = await self._format_context_for_ai(conversation_context, user_message)
-            
             # Create contextual request for enhanced chatbot
             contextual_request = ChatRequest(
                 message=context_str,
@@ -134,19 +164,26 @@ class SimpleConversationalService:
     
     async def _format_context_for_ai(
         self, 
-        conversation_context: List[ConversationMessage], 
+        context: ConversationContext, 
         current_message: str
     ) -> str:
-        """Format conversation context for AI consumption"""
-        if not conversation_context:
+        """Format conversation context (summary of older turns, then recent messages) for AI consumption"""
+        conversation_context = context.messages
+        if not conversation_context and not context.summary:
             return current_message
         
         context_parts = []
         
+        if context.summary:
+            context_parts.append("**Conversation Summary:**")
+            context_parts.append(context.summary)
+            if not conversation_context:
+                context_parts.append("\n**Current Question:**")
+        
         # Add conversation history
         if conversation_context:
             context_parts.append("**Previous Conversation:**")
-            for message in conversation_context[-6:]:  # Last 6 messages
+            for message in conversation_context:  # Messages the summary does not cover yet
                 role_label = "User" if message.role == "user" else "Assistant"
                 # Truncate long messages
                 content = message.content[:300] + "..." if len(message.content) > 300 else message.content
@@ -161,8 +198,9 @@ class SimpleConversationalService:
         
         # Ensure context doesn't exceed maximum length
         if len(full_context) > self.max_context_length:
-            # Keep current message and instructions, truncate history
-            truncated = f"""**Previous conversation context available**
+            # Keep the summary, current message and instructions, truncate history
+            history = f"**Conversation Summary:**\n{context.summary}" if context.summary else "**Previous conversation context available**"
+            truncated = f"""{history}
 
 **Current Question:**
 {current_message}
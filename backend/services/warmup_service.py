@@ -0,0 +1,130 @@
+"""
+Startup Warmup
+Runs the startup tasks (DynamoDB connection, S3 check, caches, background workers) in the
+background once the app is serving, concurrently where they don't depend on each other and
+each under a timeout. The state of every task is kept for the readiness probe.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+SKIPPED = "skipped"
+
+
+@dataclass
+class WarmupStep:
+    """A startup task. Required steps gate readiness; optional ones are only reported"""
+    name: str
+    run: Callable[[], Awaitable]
+    timeout: Optional[float]
+    required: bool = True
+    depends_on: Tuple[str, ...] = ()
+    state: str = PENDING
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    elapsed_seconds: Optional[float] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+
+class WarmupService:
+    """Background startup orchestrator"""
+
+    def __init__(self):
+        self._steps: Dict[str, WarmupStep] = {}
+        self.started_at: Optional[float] = None
+
+    def add(self, name: str, run: Callable[[], Awaitable],
+            timeout: Optional[float] = settings.WARMUP_TIMEOUT_SECONDS,
+            required: bool = True, depends_on: Tuple[str, ...] = ()):
+        """Register a step; `run` is called with no arguments and awaited (timeout=None: no limit)"""
+        self._steps[name] = WarmupStep(name, run, timeout, required, tuple(depends_on))
+
+    def start(self):
+        """Start every step in the background (returns immediately)"""
+        self.started_at = time.time()
+        for step in self._steps.values():
+            step.task = asyncio.create_task(self._run(step))
+
+    async def _run(self, step: WarmupStep):
+        for dependency in step.depends_on:
+            upstream = self._steps[dependency]
+            await asyncio.wait([upstream.task])
+            if upstream.state != READY:
+                step.state = SKIPPED
+                step.error = f"{dependency} is {upstream.state}"
+                logger.warning(f"Warmup step {step.name} skipped: {step.error}")
+                return
+
+        step.state = RUNNING
+        step.started_at = time.time()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(step.run(), timeout=step.timeout)
+            step.state = READY
+            logger.info(f"✅ Warmup step {step.name} ready")
+        except asyncio.TimeoutError:
+            step.state = TIMED_OUT
+            step.error = f"timed out after {step.timeout}s"
+            logger.warning(f"Warmup step {step.name} {step.error}")
+        except asyncio.CancelledError:
+            step.state = FAILED
+            step.error = "cancelled"
+            raise
+        except Exception as e:
+            step.state = FAILED
+            step.error = str(e)
+            logger.error(f"Warmup step {step.name} failed: {str(e)}")
+        finally:
+            step.elapsed_seconds = round(time.perf_counter() - started, 3)
+
+    async def stop(self):
+        """Cancel steps still running on shutdown"""
+        tasks = [step.task for step in self._steps.values() if step.task and not step.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def is_ready(self, name: Optional[str] = None) -> bool:
+        """Whether one step, or every required step, has completed"""
+        if name is not None:
+            step = self._steps.get(name)
+            return step is not None and step.state == READY
+        return bool(self._steps) and all(step.state == READY for step in self._steps.values() if step.required)
+
+    def status(self) -> Dict:
+        """Cached warm state of every step, for the readiness probe"""
+        steps: List[WarmupStep] = list(self._steps.values())
+        if self.is_ready():
+            overall = "ready"
+        elif any(step.state in (PENDING, RUNNING) for step in steps if step.required):
+            overall = "warming"
+        else:
+            overall = "unavailable"
+        return {
+            "status": overall,
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at else 0,
+            "dependencies": {
+                step.name: {
+                    "state": step.state,
+                    "required": step.required,
+                    "elapsed_seconds": step.elapsed_seconds,
+                    **({"error": step.error} if step.error else {})
+                }
+                for step in steps
+            }
+        }
+
+
+# Create singleton instance
+warmup_service = WarmupService()
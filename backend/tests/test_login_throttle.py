@@ -0,0 +1,72 @@
+"""
+Login throttling: only failed logins count against an address, and a proxy address is never
+throttled, so one busy load balancer cannot lock every user out
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from config.settings import settings
+from models.user import UserLogin
+from services import auth_service_dynamodb
+from services.auth_service_dynamodb import auth_service
+from services.password_hash_service import PasswordHashService
+
+CLIENT_IP = "203.0.113.7"
+
+
+class FakeUser:
+    user_id = "user-1"
+    email = "user@example.com"
+    name = "User"
+    firstName = "Test"
+    lastName = "User"
+    country = "Norway"
+    is_email_verified = True
+    is_active = True
+    role = "user"
+    login_count = 0
+
+    async def verify_password(self, password: str) -> bool:
+        return password == "correct-password"
+
+    async def update(self, update_data) -> bool:
+        return True
+
+
+@pytest.fixture
+def throttle(monkeypatch):
+    service = PasswordHashService()
+    monkeypatch.setattr(auth_service_dynamodb, "password_hash_service", service)
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", "test-secret")
+
+    async def find_by_email(email):
+        return FakeUser() if email == FakeUser.email else None
+    monkeypatch.setattr(auth_service_dynamodb.User, "find_by_email", find_by_email)
+    return service
+
+
+def login(email: str, password: str, client_ip: str = CLIENT_IP):
+    return asyncio.run(auth_service.login_user(UserLogin(email=email, password=password), client_ip=client_ip))
+
+
+def test_successful_logins_from_one_address_are_never_throttled(throttle):
+    for _ in range(settings.LOGIN_IP_MAX_FAILURES * 3):
+        assert login(FakeUser.email, "correct-password")["status"] == "success"
+    assert throttle.stats["throttled"] == 0
+
+
+def test_failed_logins_from_one_address_are_throttled(throttle):
+    for attempt in range(settings.LOGIN_IP_MAX_FAILURES):
+        assert login(f"nobody{attempt}@example.com", "wrong-password")["status"] == "error"
+    with pytest.raises(HTTPException) as error:
+        login(FakeUser.email, "correct-password")
+    assert error.value.status_code == 429
+
+
+def test_proxy_address_is_not_throttled(throttle):
+    proxy_ip = settings.FORWARDED_ALLOW_IPS[0]
+    for attempt in range(settings.LOGIN_IP_MAX_FAILURES * 2):
+        login(f"nobody{attempt}@example.com", "wrong-password", client_ip=proxy_ip)
+    assert login(FakeUser.email, "correct-password", client_ip=proxy_ip)["status"] == "success"
@@ -0,0 +1,40 @@
+"""
+Principal cache: a missing user is cached for the negative TTL, a failed lookup is not
+"""
+import asyncio
+
+import pytest
+
+from services.principal_cache_service import PrincipalCacheService
+
+
+def test_missing_user_is_negatively_cached():
+    cache = PrincipalCacheService()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return None
+
+    async def run():
+        assert await cache.get_principal("user-1", "1", loader) is None
+        assert await cache.get_principal("user-1", "1", loader) is None
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_lookup_error_is_not_cached():
+    cache = PrincipalCacheService()
+    results = [ConnectionError("DynamoDB unavailable"), {"user_id": "user-1", "role": "user"}]
+
+    async def loader():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await cache.get_principal("user-1", "1", loader)
+        return await cache.get_principal("user-1", "1", loader)
+    assert asyncio.run(run()) == {"user_id": "user-1", "role": "user"}
@@ -0,0 +1,38 @@
+"""
+Train the chat intent classifier
+
+Fits the hashed n-gram intent model on the fine-tuning export and the labeled intent examples
+(plus any labeled chat-log exports passed with --labeled, one {"text", "intent"} object per
+line) and writes it to INTENT_MODEL_FILE, where the chatbot loads it at startup.
+"""
+import argparse
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.append(str(backend_dir))
+
+from config.settings import settings
+from utils.intent_classifier import IntentClassifier, load_examples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labeled", nargs="*", default=[], metavar="FILE", help="extra labeled JSONL files")
+    parser.add_argument("--output", default=settings.INTENT_MODEL_FILE)
+    parser.add_argument("--features", type=int, default=2 ** 15, help="hash buckets")
+    args = parser.parse_args()
+
+    examples = load_examples(settings.INTENT_TRAINING_FILES + args.labeled)
+    counts = Counter(intent for _, intent in examples)
+    print(f"Training on {len(examples)} examples: " + ", ".join(f"{intent} {count}" for intent, count in sorted(counts.items())))
+
+    classifier = IntentClassifier.train(examples, n_features=args.features)
+    classifier.save(args.output)
+    print(f"Saved intent model to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+HTTP caching helpers.
+"""
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from utils.json_response import FastJSONResponse
+
+# Clients may keep the response but must revalidate it with If-None-Match before reuse
+REVALIDATE = "public, max-age=0, must-revalidate"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def conditional_json(request: Request, content: Dict[str, Any], etag: str,
+                     cache_control: str = REVALIDATE) -> Response:
+    """JSON response carrying an ETag, or 304 Not Modified when the client already has it"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(content=content, headers=headers)
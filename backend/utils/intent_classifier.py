@@ -0,0 +1,147 @@
+"""
+Intent Classification Utilities
+Routes chat messages (greeting, help, policy question, comparison, out of scope) with hashed
+n-gram features and a linear model. Training runs offline with scikit-learn; predicting is a
+lookup of a few weight rows in NumPy.
+"""
+import json
+import logging
+import math
+import os
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from utils.lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ("greeting", "help", "policy", "comparison", "out_of_scope")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _bucket(gram: str, n_features: int) -> int:
+    # crc32 rather than hash(): buckets must not change between processes
+    return zlib.crc32(gram.encode("utf-8")) % n_features
+
+
+@lru_cache(maxsize=50000)
+def _token_buckets(token: str, n_features: int) -> Tuple[int, ...]:
+    padded = "<" + token + ">"
+    grams = ["w:" + token] + ["c:" + padded[i:i + 3] for i in range(len(padded) - 2)]
+    return tuple(_bucket(gram, n_features) for gram in grams)
+
+
+def hashed_features(text: str, n_features: int) -> List[int]:
+    """Buckets of the words, word bigrams (with start/end markers) and in-word character trigrams"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    buckets = set()
+    for token in tokens:
+        buckets.update(_token_buckets(token, n_features))
+    for first, second in zip(["<s>"] + tokens, tokens + ["</s>"]):
+        buckets.add(_bucket("b:" + first + " " + second, n_features))
+    return sorted(buckets)
+
+
+def _label_finetuning_question(question: str) -> str:
+    # The fine-tuning export only asks for policy details and country comparisons
+    return "comparison" if question.lower().startswith("compare") else "policy"
+
+
+def load_examples(paths: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    (text, intent) pairs from JSONL files. Lines are either labeled messages
+    ({"text": ..., "intent": ...}, e.g. reviewed chat logs) or fine-tuning examples
+    ({"messages": [...]}, as written by export_training_data_for_finetuning), whose
+    user messages are labeled from the template that produced them.
+    """
+    examples = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if 'messages' in record:
+                    for message in record['messages']:
+                        if message.get('role') == 'user':
+                            examples.append((message['content'], _label_finetuning_question(message['content'])))
+                elif record.get('intent') in INTENTS:
+                    examples.append((record['text'], record['intent']))
+    return examples
+
+
+class IntentClassifier:
+    """Multinomial logistic regression over hashed n-grams"""
+
+    def __init__(self, weights: "np.ndarray", bias: "np.ndarray", intents: Sequence[str]):
+        self.weights = weights
+        self.bias = bias
+        self.intents = tuple(intents)
+        self.n_features = weights.shape[0]
+
+    @classmethod
+    def train(cls, examples: Sequence[Tuple[str, str]], n_features: int = 2 ** 15,
+              regularization: float = 10.0) -> "IntentClassifier":
+        """Fit on (text, intent) pairs (needs scikit-learn and scipy)"""
+        from scipy.sparse import csr_matrix
+        from sklearn.linear_model import LogisticRegression
+
+        rows, columns, values = [], [], []
+        for row, (text, _) in enumerate(examples):
+            features = hashed_features(text, n_features)
+            rows += [row] * len(features)
+            columns += features
+            values += [1.0 / max(len(features), 1) ** 0.5] * len(features)
+        matrix = csr_matrix((values, (rows, columns)), shape=(len(examples), n_features))
+        labels = [intent for _, intent in examples]
+
+        model = LogisticRegression(C=regularization, max_iter=2000)
+        model.fit(matrix, labels)
+        return cls(
+            np.ascontiguousarray(model.coef_.T, dtype=np.float32),
+            model.intercept_.astype(np.float32),
+            [str(intent) for intent in model.classes_]
+        )
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """Probability of every intent"""
+        features = hashed_features(text, self.n_features)
+        scores = self.bias
+        if features:
+            scores = scores + self.weights[features].sum(axis=0) / len(features) ** 0.5
+        # Five classes: the softmax is cheaper in plain Python than as more array operations
+        scores = scores.tolist()
+        top = max(scores)
+        exponentials = [math.exp(score - top) for score in scores]
+        total = sum(exponentials)
+        return {intent: value / total for intent, value in zip(self.intents, exponentials)}
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely intent and its probability"""
+        probabilities = self.predict_proba(text)
+        intent = max(probabilities, key=probabilities.get)
+        return intent, probabilities[intent]
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, weights=self.weights, bias=self.bias, intents=np.array(self.intents))
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with np.load(path) as data:
+            return cls(data['weights'], data['bias'], [str(intent) for intent in data['intents']])
+
+
+def load_or_train(model_path: str, training_files: Iterable[str]) -> IntentClassifier:
+    """The saved model, or one trained from training_files when none has been saved"""
+    if os.path.exists(model_path):
+        return IntentClassifier.load(model_path)
+    examples = load_examples(path for path in training_files if os.path.exists(path))
+    if not examples:
+        raise FileNotFoundError(f"No intent model at {model_path} and no training data")
+    logger.info(f"No intent model at {model_path}, training on {len(examples)} examples")
+    return IntentClassifier.train(examples)
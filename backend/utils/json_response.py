@@ -0,0 +1,44 @@
+"""
+JSON response helpers.
+Serializes DynamoDB items straight to bytes with orjson. Decimal, datetime and sets are
+handled during serialization, so hot routes can skip FastAPI's jsonable_encoder pass.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# Non-string dict keys (e.g. counts keyed by int) are written as strings, like the stdlib encoder
+DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not serialize natively"""
+    if isinstance(value, Decimal):
+        # boto3 returns every DynamoDB number as Decimal
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        # String and number sets
+        return list(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content (DynamoDB items included) to JSON bytes"""
+    return orjson.dumps(content, default=_default, option=DUMPS_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson.
+
+    Used as the app's default response class. Routes that return large DynamoDB payloads
+    return it directly (FastJSONResponse(content)) so FastAPI does not walk the payload with
+    jsonable_encoder first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
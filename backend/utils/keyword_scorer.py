@@ -0,0 +1,114 @@
+"""
+Keyword Scoring Utilities
+Single-pass keyword matcher for the TEA fallback analysis and corpus re-scoring
+"""
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+KEYWORD_PATTERN = re.compile(r"^[a-z]+$")
+
+
+class KeywordScorer:
+    """
+    Scores text against several keyword sets with one tokenization pass.
+
+    A keyword counts when it appears anywhere in the text, including inside a longer
+    word ('log' in 'technology'), the same as a plain `keyword in text` check. Keywords
+    are letters only, so every occurrence sits inside one alphabetic token: the text is
+    split into unique tokens once and each token is matched against all keyword sets
+    through a substring lookup that is memoized across documents.
+    """
+
+    def __init__(self, keyword_sets: Dict[str, List[str]], max_cached_tokens: int = 50000):
+        self.dimensions = list(keyword_sets)
+        self.max_cached_tokens = max_cached_tokens
+
+        keywords = []
+        for dimension, dimension_keywords in keyword_sets.items():
+            for keyword in dimension_keywords:
+                keyword = keyword.lower()
+                if not KEYWORD_PATTERN.match(keyword):
+                    raise ValueError(f"Keyword '{keyword}' in '{dimension}' must contain letters only")
+                keywords.append(keyword)
+
+        self.keywords = sorted(set(keywords))
+        self._keyword_ids = {keyword: index for index, keyword in enumerate(self.keywords)}
+        # Duplicates are kept so a keyword listed twice counts twice, as before
+        self._members = {
+            dimension: [self._keyword_ids[keyword.lower()] for keyword in dimension_keywords]
+            for dimension, dimension_keywords in keyword_sets.items()
+        }
+        lengths = [len(keyword) for keyword in self.keywords] or [1]
+        self._min_length = min(lengths)
+        self._max_length = max(lengths)
+        self._token_matches: Dict[str, Tuple[int, ...]] = {}
+
+    def _match_token(self, token: str) -> Tuple[int, ...]:
+        """Ids of every keyword contained in a token"""
+        matches = self._token_matches.get(token)
+        if matches is not None:
+            return matches
+
+        found = set()
+        token_length = len(token)
+        for start in range(token_length - self._min_length + 1):
+            longest = min(self._max_length, token_length - start)
+            for length in range(self._min_length, longest + 1):
+                keyword_id = self._keyword_ids.get(token[start:start + length])
+                if keyword_id is not None:
+                    found.add(keyword_id)
+
+        matches = tuple(found)
+        if len(self._token_matches) >= self.max_cached_tokens:
+            self._token_matches.clear()
+        self._token_matches[token] = matches
+        return matches
+
+    def matched_keywords(self, text: str) -> Set[int]:
+        """Ids of all keywords found in the text"""
+        found = set()
+        for token in set(TOKEN_PATTERN.findall(text.lower())):
+            found.update(self._match_token(token))
+        return found
+
+    @staticmethod
+    def normalize(count: int) -> int:
+        """Map a keyword hit count to the 0-10 scale"""
+        return min(10, max(0, count // 2))
+
+    def score(self, text: str) -> Dict[str, int]:
+        """Score one document against every keyword set"""
+        found = self.matched_keywords(text)
+        return {
+            dimension: self.normalize(sum(1 for keyword_id in members if keyword_id in found))
+            for dimension, members in self._members.items()
+        }
+
+    def score_batch(self, texts: Iterable[str]) -> List[Dict[str, int]]:
+        """
+        Score many documents at once. Builds a document x keyword hit matrix and
+        multiplies it by the keyword x dimension membership matrix.
+        """
+        import numpy as np
+
+        texts = list(texts)
+        if not texts:
+            return []
+
+        hits = np.zeros((len(texts), len(self.keywords)), dtype=np.int32)
+        for row, text in enumerate(texts):
+            found = self.matched_keywords(text)
+            if found:
+                hits[row, list(found)] = 1
+
+        membership = np.zeros((len(self.keywords), len(self.dimensions)), dtype=np.int32)
+        for column, dimension in enumerate(self.dimensions):
+            for keyword_id in self._members[dimension]:
+                membership[keyword_id, column] += 1
+
+        scores = np.clip((hits @ membership) // 2, 0, 10)
+        return [
+            {dimension: int(value) for dimension, value in zip(self.dimensions, row)}
+            for row in scores
+        ]
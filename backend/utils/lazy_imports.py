@@ -0,0 +1,78 @@
+"""
+Lazy Import Utilities
+Defers importing heavy optional dependencies (numpy, faiss, PyPDF2, PIL, ...) until first use,
+so the app starts serving requests before they are loaded. Modules registered here can be
+warmed in the background once the app is ready.
+"""
+import asyncio
+import importlib
+import logging
+import time
+from types import ModuleType
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lazily imported modules by name, in registration order
+_lazy_modules: Dict[str, "LazyModule"] = {}
+
+warmup_stats: Dict[str, Optional[float]] = {}
+
+
+class LazyModule(ModuleType):
+    """
+    Stand-in for a module that imports it on first attribute access and then forwards
+    attribute reads and writes to it. A missing dependency only fails when the subsystem
+    that needs it is used.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self) -> ModuleType:
+        module = object.__getattribute__(self, "_module")
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    @property
+    def loaded(self) -> bool:
+        return object.__getattribute__(self, "_module") is not None
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Module `name`, imported on first use. Name its types in annotations as strings."""
+    module = _lazy_modules.get(name)
+    if module is None:
+        module = _lazy_modules[name] = LazyModule(name)
+    return module
+
+
+def _load(module: LazyModule) -> float:
+    started = time.perf_counter()
+    module._load()
+    return time.perf_counter() - started
+
+
+async def warm_lazy_imports(delay_seconds: float = 0):
+    """Import every lazily imported module in a worker thread, one at a time"""
+    if delay_seconds:
+        await asyncio.sleep(delay_seconds)
+    loop = asyncio.get_running_loop()
+    for name, module in list(_lazy_modules.items()):
+        if module.loaded:
+            continue
+        try:
+            warmup_stats[name] = round(await loop.run_in_executor(None, _load, module), 3)
+        except Exception as e:
+            warmup_stats[name] = None
+            logger.warning(f"Could not warm {name}: {str(e)}")
+    logger.info(f"🔥 Warmed {len(warmup_stats)} deferred imports")
@@ -0,0 +1,32 @@
+"""
+Opaque pagination cursors.
+"""
+import base64
+import json
+from decimal import Decimal
+from typing import Any, Dict
+
+
+def _default(value: Any) -> Any:
+    # DynamoDB keys come back with numbers as Decimal
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Encode pagination state (e.g. DynamoDB LastEvaluatedKey values) as a URL-safe token"""
+    raw = json.dumps(state, separators=(",", ":"), sort_keys=True, default=_default)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Decode a token from encode_cursor; raises ValueError when it is malformed"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(state, dict):
+        raise ValueError("Invalid pagination cursor")
+    return state
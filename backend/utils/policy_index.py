@@ -0,0 +1,82 @@
+"""
+Policy Index Utilities
+Groups the chatbot's policy list by country and area once per cache refresh, so per-country
+and per-area lookups and counts don't rescan every policy
+"""
+from typing import Dict, List, Optional
+
+# Names users write for countries, matched against the cached country names
+COUNTRY_ALIASES = {
+    "usa": "united states",
+    "us": "united states",
+    "america": "united states",
+    "american": "united states",
+    "uk": "united kingdom",
+    "britain": "united kingdom",
+    "british": "united kingdom",
+}
+
+
+class PolicyIndex:
+    """country -> area -> positions in the policy list, with counts"""
+
+    def __init__(self, policies: List[Dict]):
+        self.policies = policies
+        self.by_country: Dict[str, Dict[str, List[int]]] = {}
+        self._by_area: Dict[str, List[int]] = {}
+        self._country_positions: Dict[str, List[int]] = {}
+
+        for position, policy in enumerate(policies):
+            country = policy.get('country') or ''
+            area = policy.get('area_name') or ''
+            self.by_country.setdefault(country, {}).setdefault(area, []).append(position)
+            self._by_area.setdefault(area, []).append(position)
+            self._country_positions.setdefault(country, []).append(position)
+
+        self._countries = {country.lower(): country for country in self.by_country if country}
+        self._areas = {area.lower(): area for area in self._by_area if area}
+        self.countries = sorted(self._countries.values())
+        self.areas = sorted(self._areas.values())
+
+    def resolve_country(self, name: str) -> Optional[str]:
+        """Cached spelling of a country name (case-insensitive, common aliases), or None"""
+        key = name.strip().lower()
+        return self._countries.get(key) or self._countries.get(COUNTRY_ALIASES.get(key, ''))
+
+    def resolve_area(self, name: str) -> Optional[str]:
+        return self._areas.get(name.strip().lower())
+
+    def positions(self, country: str = None, area: str = None) -> List[int]:
+        """Positions of the policies in country and/or area, in policy list order"""
+        if country is not None:
+            country = self.resolve_country(country)
+            if country is None:
+                return []
+        if area is not None:
+            area = self.resolve_area(area)
+            if area is None:
+                return []
+
+        if country is not None and area is not None:
+            return self.by_country[country].get(area, [])
+        if country is not None:
+            return self._country_positions[country]
+        if area is not None:
+            return self._by_area[area]
+        return list(range(len(self.policies)))
+
+    def policies_for(self, country: str = None, area: str = None, limit: int = None) -> List[Dict]:
+        positions = self.positions(country, area)
+        if limit is not None:
+            positions = positions[:limit]
+        return [self.policies[position] for position in positions]
+
+    def count(self, country: str = None, area: str = None) -> int:
+        return len(self.positions(country, area))
+
+    def breakdown(self) -> Dict[str, Dict[str, int]]:
+        """Number of policies per country and area"""
+        return {
+            country: {area: len(positions) for area, positions in areas.items()}
+            for country, areas in self.by_country.items()
+        }
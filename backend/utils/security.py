@@ -11,11 +11,11 @@ from typing import Optional, Dict
 from config.settings import settings
 
 def hash_password(password: str) -> str:
-    """Hash password with bcrypt"""
+    """Hash password with bcrypt (blocking - async code uses services.password_hash_service)"""
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 def verify_password(password: str, hashed: str) -> bool:
-    """Verify password against hash"""
+    """Verify password against hash (blocking - async code uses services.password_hash_service)"""
     try:
         return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
     except Exception:
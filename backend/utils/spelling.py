@@ -0,0 +1,135 @@
+"""
+Spelling Correction Utilities
+Precomputed typo corrector for chat input: known typos and phrases are replaced in one compiled
+regex pass, and other misspellings of domain words (countries, policy areas, policy vocabulary)
+are found through a symmetric-delete index instead of comparing against every word.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = r"\w+(?:['.]\w+)*"
+WORD_PATTERN = re.compile(r"^[a-z]+$")
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> Optional[int]:
+    """Optimal string alignment distance (adjacent transpositions count once), None above max_distance"""
+    if abs(len(source) - len(target)) > max_distance:
+        return None
+    previous_previous = None
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and source[i - 1] == target[j - 2] and source[i - 2] == target[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return None
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def _deletes(word: str, max_distance: int, prefix_length: int) -> Set[str]:
+    """The word's prefix and every string reachable from it by up to max_distance deletions"""
+    word = word[:prefix_length]
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier if len(candidate) > 1
+                    for i in range(len(candidate))}
+        results |= frontier
+    return results
+
+
+def _match_case(original: str, replacement: str) -> str:
+    if original.isupper() and len(original) > 1:
+        return replacement.upper()
+    if original[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+
+class SpellingCorrector:
+    """
+    Corrects chat messages with precomputed lookups.
+
+    `corrections` maps known typos (single words or phrases) to their fix and `phrases` adds
+    multi-word fixes; both are applied in a single regex pass, longest phrase first. Words of
+    `dictionary` (word -> frequency) are the targets of fuzzy correction: every entry is
+    indexed under the deletions of its prefix (SymSpell), so a misspelling is matched by
+    generating its own deletions and verifying the few candidates that share one. Words in
+    `dictionary` or `vocabulary` are never corrected. The dictionary is small, so correctly
+    spelled words outside it get close matches too ('these' -> 'there'): fuzzy matches are
+    meant as suggestions and are only applied by `correct` when asked for.
+    """
+
+    def __init__(self, corrections: Dict[str, str], phrases: Dict[str, str] = None,
+                 dictionary: Dict[str, int] = None, vocabulary: Iterable[str] = (),
+                 max_edit_distance: int = 2, prefix_length: int = 7, min_fuzzy_length: int = 5):
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.min_fuzzy_length = min_fuzzy_length
+
+        # Identity entries ('ok': 'ok') mark words as correct rather than correcting them
+        self.replacements = {
+            typo.lower(): fix for typo, fix in {**corrections, **(phrases or {})}.items() if typo.lower() != fix
+        }
+        self.dictionary = {word: count for word, count in (dictionary or {}).items() if WORD_PATTERN.match(word)}
+        self.vocabulary = set(self.dictionary) | {word.lower() for word in vocabulary}
+        self.vocabulary |= {typo.lower() for typo, fix in corrections.items() if typo.lower() == fix}
+
+        self._index: Dict[str, List[str]] = {}
+        for word in self.dictionary:
+            for delete in _deletes(word, max_edit_distance, prefix_length):
+                self._index.setdefault(delete, []).append(word)
+
+        multi_token = sorted((typo for typo in self.replacements if not re.fullmatch(TOKEN_PATTERN, typo)),
+                             key=len, reverse=True)
+        alternatives = [r"(?<!\w)" + re.escape(phrase) + r"(?!\w)" for phrase in multi_token] + [TOKEN_PATTERN]
+        self._pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def known(self, word: str) -> bool:
+        return word.lower() in self.vocabulary
+
+    def suggest(self, word: str) -> Optional[Tuple[str, int]]:
+        """Closest dictionary word within the edit distance allowed for its length, as (word, distance)"""
+        word = word.lower()
+        if word in self.vocabulary or not WORD_PATTERN.match(word):
+            return None
+        max_distance = min(self.max_edit_distance, 1 if len(word) < 8 else 2)
+
+        candidates = set()
+        for delete in _deletes(word, max_distance, self.prefix_length):
+            candidates.update(self._index.get(delete, ()))
+
+        best = None
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, max_distance)
+            if distance is None:
+                continue
+            rank = (distance, -self.dictionary[candidate], candidate)
+            if best is None or rank < best:
+                best = rank
+        return (best[2], best[0]) if best else None
+
+    def correct(self, text: str, fuzzy: bool = False) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        Text with the known typos and phrases replaced (and fuzzy matches, with fuzzy=True), and the
+        (original, replacement) pairs applied; untouched text keeps its case
+        """
+        corrections = []
+
+        def replace(match):
+            original = match.group(0)
+            lowered = original.lower()
+            replacement = self.replacements.get(lowered)
+            if replacement is None and fuzzy and len(lowered) >= self.min_fuzzy_length:
+                suggestion = self.suggest(lowered)
+                replacement = suggestion[0] if suggestion else None
+            if replacement is None:
+                return original
+            corrections.append((lowered, replacement))
+            return _match_case(original, replacement)
+
+        return self._pattern.sub(replace, text), corrections
@@ -0,0 +1,293 @@
+"""
+Text Index Utilities
+In-memory inverted index with BM25 ranking, prefix and fuzzy term expansion, and highlighting
+"""
+import bisect
+import heapq
+import html
+import math
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Weight of a query term match by how it was reached
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"^{term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_distance(a: str, b: str, max_distance: int) -> bool:
+    """Levenshtein distance <= max_distance, stopping early once a row exceeds it"""
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return False
+        previous = current
+    return previous[-1] <= max_distance
+
+
+class TextIndex:
+    """
+    Inverted index over documents made of weighted text fields.
+
+    Documents are added and removed one at a time, so the index can follow writes
+    incrementally. Query terms match exactly; the last term also matches as a prefix
+    (search-as-you-type), and a term that is not in the vocabulary matches terms within
+    one or two edits (found through a trigram index and verified with a bounded edit
+    distance). All query terms must match; documents are ranked by BM25 over the
+    field-weighted term frequencies.
+    """
+
+    def __init__(self, field_weights: Dict[str, float], max_expansions: int = 30):
+        self.field_weights = field_weights
+        self.max_expansions = max_expansions
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self._doc_lengths: Dict[str, float] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0.0
+        self._vocabulary: List[str] = []
+        self._grams: Dict[str, Set[str]] = {}
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: str):
+        return doc_id in self._doc_terms
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._vocabulary)
+
+    def meta(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        return self._meta.get(doc_id)
+
+    def add(self, doc_id: str, fields: Dict[str, Any], meta: Optional[Dict[str, Any]] = None):
+        """Index a document, replacing any earlier version with the same id"""
+        self.remove(doc_id)
+
+        frequencies: Dict[str, float] = {}
+        for field, value in fields.items():
+            weight = self.field_weights.get(field, 1.0)
+            texts = value if isinstance(value, (list, tuple)) else [value]
+            for text in texts:
+                if not text:
+                    continue
+                for term in tokenize(str(text)):
+                    frequencies[term] = frequencies.get(term, 0.0) + weight
+
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._add_term(term)
+            postings[doc_id] = frequency
+
+        length = sum(frequencies.values())
+        self._doc_terms[doc_id] = tuple(frequencies)
+        self._doc_lengths[doc_id] = length
+        self._meta[doc_id] = meta or {}
+        self._total_length += length
+
+    def remove(self, doc_id: str) -> bool:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                self._remove_term(term)
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        self._meta.pop(doc_id, None)
+        return True
+
+    def _add_term(self, term: str):
+        bisect.insort(self._vocabulary, term)
+        for gram in _trigrams(term):
+            self._grams.setdefault(gram, set()).add(term)
+
+    def _remove_term(self, term: str):
+        index = bisect.bisect_left(self._vocabulary, term)
+        if index < len(self._vocabulary) and self._vocabulary[index] == term:
+            del self._vocabulary[index]
+        for gram in _trigrams(term):
+            terms = self._grams.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._grams[gram]
+
+    # Query term expansion
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            if term != prefix:
+                terms.append(term)
+        return terms
+
+    def _fuzzy_terms(self, term: str) -> List[str]:
+        if len(term) < 4:
+            return []
+        max_distance = 1 if len(term) < 8 else 2
+        grams = _trigrams(term)
+        # Each edit touches at most three trigrams
+        required = max(1, len(grams) - 3 * max_distance)
+
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._grams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        return [
+            candidate for candidate, count in shared.items()
+            if count >= required and candidate != term and _within_distance(term, candidate, max_distance)
+        ]
+
+    def expand(self, term: str, prefix: bool = True, fuzzy: bool = True) -> Dict[str, float]:
+        """Index terms a query term matches, with their match weight"""
+        expansions: Dict[str, float] = {}
+        if term in self._postings:
+            expansions[term] = EXACT_WEIGHT
+
+        candidates: List[Tuple[str, float]] = []
+        if prefix:
+            candidates.extend((match, PREFIX_WEIGHT) for match in self._prefix_terms(term))
+        if fuzzy:
+            candidates.extend((match, FUZZY_WEIGHT) for match in self._fuzzy_terms(term))
+
+        # Keep the most common expansions so short prefixes stay cheap
+        candidates.sort(key=lambda candidate: len(self._postings[candidate[0]]), reverse=True)
+        for match, weight in candidates:
+            if len(expansions) >= self.max_expansions:
+                break
+            if weight > expansions.get(match, 0.0):
+                expansions[match] = weight
+        return expansions
+
+    # Search
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, prefix: bool = True, fuzzy: bool = True,
+               doc_filter: Optional[Callable[[Dict[str, Any]], bool]] = None,
+               sort_key: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Return (total matches, hits) where each hit is {"id", "score", "terms"} and terms are
+        the index terms that matched, for highlighting. An empty query matches every document
+        that passes doc_filter, ordered by sort_key (descending) when given.
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+
+        if not query_terms:
+            doc_ids = [doc_id for doc_id in self._doc_terms if not doc_filter or doc_filter(self._meta[doc_id])]
+            if sort_key:
+                doc_ids.sort(key=lambda doc_id: sort_key(self._meta[doc_id]), reverse=True)
+            page = doc_ids[offset:offset + limit]
+            return len(doc_ids), [{"id": doc_id, "score": 0.0, "terms": []} for doc_id in page]
+
+        last = len(query_terms) - 1
+        expansions = [
+            self.expand(term, prefix=prefix and i == last, fuzzy=fuzzy and term not in self._postings)
+            for i, term in enumerate(query_terms)
+        ]
+        if not all(expansions):
+            return 0, []
+
+        # Intersect on the rarest query term first
+        order = sorted(range(len(expansions)), key=lambda i: sum(len(self._postings[t]) for t in expansions[i]))
+        candidates: Optional[Set[str]] = None
+        for i in order:
+            matched = set()
+            for term in expansions[i]:
+                matched.update(self._postings[term])
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return 0, []
+
+        if doc_filter:
+            candidates = {doc_id for doc_id in candidates if doc_filter(self._meta[doc_id])}
+
+        document_count = len(self._doc_terms)
+        average_length = self._total_length / document_count if document_count else 1.0
+        idf = {
+            term: math.log(1 + (document_count - len(self._postings[term]) + 0.5) / (len(self._postings[term]) + 0.5))
+            for terms in expansions for term in terms
+        }
+
+        # Term-at-a-time: each posting list is walked once; a query term scores a document
+        # by its best-matching expansion
+        norms = {doc_id: K1 * (1 - B + B * self._doc_lengths[doc_id] / average_length) for doc_id in candidates}
+        scores = dict.fromkeys(candidates, 0.0)
+        for terms in expansions:
+            best: Dict[str, float] = {}
+            for term, weight in terms.items():
+                term_weight = weight * idf[term] * (K1 + 1)
+                for doc_id, frequency in self._postings[term].items():
+                    norm = norms.get(doc_id)
+                    if norm is None:
+                        continue
+                    value = term_weight * frequency / (frequency + norm)
+                    if value > best.get(doc_id, 0.0):
+                        best[doc_id] = value
+            for doc_id, value in best.items():
+                scores[doc_id] += value
+
+        ranked = heapq.nlargest(offset + limit, ((value, doc_id) for doc_id, value in scores.items()))
+        hits = []
+        for doc_score, doc_id in ranked[offset:]:
+            terms = [term for expansion in expansions for term in expansion if doc_id in self._postings[term]]
+            hits.append({"id": doc_id, "score": round(doc_score, 4), "terms": terms})
+        return len(candidates), hits
+
+
+def highlight(text: str, terms: Iterable[str], max_length: int = 160,
+              tags: Tuple[str, str] = ("<mark>", "</mark>")) -> Optional[str]:
+    """
+    Snippet of text around the first matched term with every match wrapped in tags,
+    or None when no term occurs in the text. The text is HTML-escaped; the tags are not.
+    """
+    if not text:
+        return None
+    wanted = set(terms)
+    matches = [match for match in TOKEN_PATTERN.finditer(text.lower()) if match.group() in wanted]
+    if not matches:
+        return None
+
+    start = max(0, matches[0].start() - max_length // 4)
+    end = min(len(text), start + max_length)
+    parts = ["…" if start > 0 else ""]
+    position = start
+    for match in matches:
+        if match.start() < start:
+            continue
+        if match.end() > end:
+            break
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"{tags[0]}{html.escape(text[match.start():match.end()])}{tags[1]}")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)